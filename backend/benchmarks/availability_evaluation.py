@@ -0,0 +1,168 @@
+"""
+Measures evaluating availability conditions over windows of several months.
+
+Compares the union of the daily time spans with the former quadratic algorithm
+against the sweep-line union, and evaluating whole conditions with the interpreter
+of the condition tree against the compiled conditions on datetimes and on epoch integers.
+
+Usage: ./bin/benchmark.sh availability_evaluation [months ...]
+"""
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from dateutil.tz import gettz
+
+import availability
+from models import (
+    AvailabilityCondition,
+    AvailabilityConditionTimeSpanDuringDay,
+    EmergencyTimesOverview,
+    OpeningHoursInformation,
+    TimeDuringDay,
+    TimeSpan,
+)
+
+_DEFAULT_MONTHS = [1, 3, 6, 12]
+_TIMEZONE = "Europe/Berlin"
+_WINDOW_START = datetime(2026, 1, 1, tzinfo=gettz(_TIMEZONE))
+
+
+def main(months: list[int]) -> None:
+    opening_hours_condition = availability.convert_opening_hours_to_condition(
+        {
+            weekday: OpeningHoursInformation(from_="08:00", to="18:00")
+            for weekday in ["Mon", "Tue", "Wed", "Thu", "Fri"]
+        },
+        _TIMEZONE,
+    )
+    emergency_times_condition = availability.convert_emergency_times_to_condition(
+        [
+            EmergencyTimesOverview(
+                start_date=f"2026-{month:0>2}-01",
+                end_date=f"2026-{month + 1:0>2}-01",
+                from_time="18:00",
+                to_time="08:00",
+                days=["Mon", "Wed", "Fri"] if month % 2 == 0 else ["Tue", "Thu", "Sat", "Sun"],
+            )
+            for month in range(1, 12)
+        ],
+        _TIMEZONE,
+    )
+    daily_condition = AvailabilityConditionTimeSpanDuringDay(
+        start_time=TimeDuringDay(hour=8, minute=0),
+        end_time=TimeDuringDay(hour=18, minute=0),
+        timezone=_TIMEZONE,
+    )
+
+    print(
+        f"{'months':>6} {'spans':>6} {'union (quadratic)':>18} {'union (sweep)':>14} "
+        f"{'opening hours (tree)':>21} {'(compiled)':>11} {'(epoch)':>9} "
+        f"{'emergency (tree)':>17} {'(compiled)':>11} {'(epoch)':>9}"
+    )
+
+    for month_count in months:
+        lower_bound = _WINDOW_START
+        upper_bound = _WINDOW_START + timedelta(days=30 * month_count)
+
+        # Overlapping copies of every daily time span, as produced by or-ing similar conditions
+        daily_time_spans = list(availability._get_time_spans_from_condition(
+            lower_bound,
+            upper_bound,
+            daily_condition,
+        ))
+        time_spans = sorted(
+            daily_time_spans + [
+                availability.Interval(start=time_span.start + timedelta(hours=1), end=time_span.end + timedelta(hours=1))
+                for time_span in daily_time_spans
+            ],
+        )
+
+        quadratic_union_seconds = _measure_seconds(
+            lambda: _quadratic_union(lower_bound, upper_bound, time_spans)
+        )
+        sweep_union_seconds = _measure_seconds(
+            lambda: availability._or_operation(lower_bound, upper_bound, time_spans)
+        )
+
+        print(
+            f"{month_count:>6} "
+            f"{len(time_spans):>6} "
+            f"{quadratic_union_seconds:>17.4f}s "
+            f"{sweep_union_seconds:>13.4f}s "
+            f"{_measure_tree_seconds(lower_bound, upper_bound, opening_hours_condition):>20.4f}s "
+            f"{_measure_compiled_seconds(lower_bound, upper_bound, opening_hours_condition, 'datetime'):>10.4f}s "
+            f"{_measure_compiled_seconds(lower_bound, upper_bound, opening_hours_condition, 'epoch'):>8.4f}s "
+            f"{_measure_tree_seconds(lower_bound, upper_bound, emergency_times_condition):>16.4f}s "
+            f"{_measure_compiled_seconds(lower_bound, upper_bound, emergency_times_condition, 'datetime'):>10.4f}s "
+            f"{_measure_compiled_seconds(lower_bound, upper_bound, emergency_times_condition, 'epoch'):>8.4f}s"
+        )
+
+
+def _measure_tree_seconds(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: AvailabilityCondition,
+) -> float:
+    return _measure_seconds(
+        lambda: list(availability._get_time_spans_from_condition(lower_bound, upper_bound, condition))
+    )
+
+
+def _measure_compiled_seconds(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: AvailabilityCondition,
+        backend: availability.EvaluationBackend,
+) -> float:
+    return _measure_seconds(
+        lambda: list(availability.get_time_spans(lower_bound, upper_bound, condition, backend=backend))
+    )
+
+
+def _quadratic_union(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        time_spans: list[availability.Interval],
+) -> list[TimeSpan]:
+    """
+    The former union, which rebuilt the result list of pydantic time spans for every time span.
+    """
+    result: list[TimeSpan] = []
+
+    for time_span in time_spans:
+        time_span = TimeSpan(
+            start=max(lower_bound, time_span.start),
+            end=min(time_span.end, upper_bound),
+        )
+        new_result: list[TimeSpan] = []
+
+        for existing_time_span in result:
+            if time_span.start <= existing_time_span.end and existing_time_span.start <= time_span.end:
+                time_span = TimeSpan(
+                    start=min(existing_time_span.start, time_span.start),
+                    end=max(existing_time_span.end, time_span.end),
+                )
+            else:
+                new_result.append(existing_time_span)
+
+        new_result.append(time_span)
+        result = new_result
+
+    return result
+
+
+def _measure_seconds(func: Callable[[], object], repetitions: int = 3) -> float:
+    best = float("inf")
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or _DEFAULT_MONTHS)
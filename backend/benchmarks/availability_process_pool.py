@@ -0,0 +1,89 @@
+"""
+Measures evaluating the emergency availability of many vets serially
+against evaluating it in `availability.process_pool.ProcessPool` with an increasing number of workers.
+
+Usage: ./bin/benchmark.sh availability_process_pool [vet count] [months]
+"""
+import os
+import sys
+import time
+from collections.abc import Callable
+from datetime import timedelta, datetime
+
+from dateutil.tz import gettz
+
+import availability
+from availability.process_pool import ProcessPool
+from models import AvailabilityCondition, EmergencyTimesOverview
+from types_ import Weekday
+
+_DEFAULT_VET_COUNT = 400
+_DEFAULT_MONTHS = 6
+_TIMEZONE = "Europe/Berlin"
+_WINDOW_START = datetime(2026, 1, 1, tzinfo=gettz(_TIMEZONE))
+_WEEKDAYS: list[Weekday] = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def main(vet_count: int, month_count: int) -> None:
+    conditions = [_create_emergency_times_condition(vet_index) for vet_index in range(vet_count)]
+
+    lower_bound = _WINDOW_START
+    upper_bound = _WINDOW_START + timedelta(days=30 * month_count)
+
+    serial_seconds = _measure_seconds(
+        lambda: [list(availability.get_time_spans(lower_bound, upper_bound, condition)) for condition in conditions]
+    )
+
+    print(f"{vet_count} vets, {month_count} months, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'seconds':>8} {'speedup':>8}")
+    print(f"{'serial':>7} {serial_seconds:>7.3f}s {1:>7.2f}x")
+
+    worker_count = 1
+    while worker_count <= (os.cpu_count() or 1):
+        process_pool = ProcessPool(worker_count)
+
+        try:
+            pool_seconds = _measure_seconds(
+                lambda: process_pool.get_time_spans(lower_bound, upper_bound, conditions)
+            )
+        finally:
+            process_pool.shutdown()
+
+        print(f"{worker_count:>7} {pool_seconds:>7.3f}s {serial_seconds / pool_seconds:>7.2f}x")
+
+        worker_count *= 2
+
+
+def _create_emergency_times_condition(vet_index: int) -> AvailabilityCondition:
+    # Every vet gets different emergency times, so no evaluation can be shared
+    return availability.convert_emergency_times_to_condition(
+        [
+            EmergencyTimesOverview(
+                start_date=f"2026-{month:0>2}-01",
+                end_date=f"2026-{month + 1:0>2}-01",
+                from_time=f"{16 + vet_index % 4}:{vet_index % 60:0>2}",
+                to_time=f"0{6 + vet_index % 3}:00",
+                days=_WEEKDAYS[(vet_index + month) % 7:] or _WEEKDAYS,
+            )
+            for month in range(1, 12)
+        ],
+        _TIMEZONE,
+    )
+
+
+def _measure_seconds(func: Callable[[], object], repetitions: int = 3) -> float:
+    best = float("inf")
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_VET_COUNT,
+        int(sys.argv[2]) if len(sys.argv) > 2 else _DEFAULT_MONTHS,
+    )
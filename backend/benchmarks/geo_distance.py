@@ -0,0 +1,69 @@
+"""
+Compares computing the distances from a ring center to n synthetic vets
+using geopy (one geodesic solve per vet) with the vectorized `utils.geo_distance` kernels.
+
+Usage: ./bin/benchmark.sh geo_distance [n ...]
+"""
+import random
+import sys
+import time
+from collections.abc import Callable
+
+import geopy.distance
+
+from utils.geo_distance import Points
+
+_DEFAULT_VET_COUNTS = [10_000, 100_000, 1_000_000]
+# geopy is too slow to run for a million vets,
+# so its time is extrapolated from a sample
+_MAX_GEOPY_SAMPLE_SIZE = 10_000
+_CENTER = (52.52437, 13.41053)
+
+
+def main(vet_counts: list[int]) -> None:
+    rng = random.Random(0)
+
+    print(f"{'vets':>10} {'geopy':>12} {'spherical':>12} {'geodesic':>12} {'speedup (spherical)':>20} {'speedup (geodesic)':>20}")
+
+    for vet_count in vet_counts:
+        # Roughly the area of Germany
+        lat_lon_pairs = [
+            (rng.uniform(47, 55), rng.uniform(6, 15))
+            for _ in range(vet_count)
+        ]
+        points = Points.from_lat_lon_pairs(lat_lon_pairs)
+
+        geopy_sample = lat_lon_pairs[:_MAX_GEOPY_SAMPLE_SIZE]
+        geopy_seconds = _measure_seconds(
+            lambda: [geopy.distance.distance(_CENTER, pair).km for pair in geopy_sample]
+        ) * vet_count / len(geopy_sample)
+        spherical_seconds = _measure_seconds(
+            lambda: points.distances_to(*_CENTER, mode="spherical")
+        )
+        geodesic_seconds = _measure_seconds(
+            lambda: points.distances_to(*_CENTER, mode="geodesic")
+        )
+
+        print(
+            f"{vet_count:>10} "
+            f"{geopy_seconds:>11.4f}s "
+            f"{spherical_seconds:>11.4f}s "
+            f"{geodesic_seconds:>11.4f}s "
+            f"{geopy_seconds / spherical_seconds:>19.1f}x "
+            f"{geopy_seconds / geodesic_seconds:>19.1f}x"
+        )
+
+
+def _measure_seconds(func: Callable[[], object], repetitions: int = 3) -> float:
+    best = float("inf")
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or _DEFAULT_VET_COUNTS)
@@ -0,0 +1,93 @@
+"""
+Measures the throughput of concurrent reads of verified vets with an increasing maximum pool size,
+and how long the reading threads waited for a connection (see `utils.mongo_pool_metrics`).
+
+Replaces the vets of the 'software_test' visibility in the database of the environment.
+
+Usage: ./bin/benchmark.sh mongo_pool [thread count] [pool size ...]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import MongoClient
+
+import db
+import db_queries
+from models import VetCreateOrOverwrite
+from utils.mongo_pool_metrics import PoolMetricsListener
+
+_DEFAULT_THREAD_COUNT = 32
+_DEFAULT_POOL_SIZES = [1, 4, 16, 64]
+_VET_COUNT = 200
+_READS_PER_THREAD = 20
+_VISIBILITY = "software_test"
+_CENTER = (52.52437, 13.41053)
+
+
+def main(thread_count: int, pool_sizes: list[int]) -> None:
+    db.delete_vet_collections(_VISIBILITY)
+    for vet_index in range(_VET_COUNT):
+        db.create_or_overwrite_vet(_VISIBILITY, "verified", f"vet{vet_index}", _create_vet(vet_index))
+
+    collection_name = db_queries.get_vet_collection_name(_VISIBILITY, "verified")
+    query = db_queries.create_vet_query(_VISIBILITY, "verified", {})
+
+    print(f"{thread_count} threads, {_READS_PER_THREAD} reads of {_VET_COUNT} vets each")
+    print(f"{'pool':>5} {'reads/s':>8} {'max out':>8} {'mean wait':>10} {'max wait':>9} {'failed':>7}")
+
+    try:
+        for pool_size in pool_sizes:
+            listener = PoolMetricsListener()
+            client = MongoClient(
+                db_queries.get_connection_string(),
+                event_listeners=[listener],
+                **{**db_queries.get_mongo_client_options(), "maxPoolSize": pool_size, "minPoolSize": 0},
+            )
+            collection = client["db"][collection_name]
+
+            def read_vets() -> None:
+                for _ in range(_READS_PER_THREAD):
+                    list(collection.find(query, projection=db_queries.create_vet_projection()))
+
+            # Open the first connection before measuring
+            collection.find_one()
+            listener.reset()
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(thread_count) as executor:
+                for future in [executor.submit(read_vets) for _ in range(thread_count)]:
+                    future.result()
+            seconds = time.perf_counter() - start
+
+            metrics = listener.get_metrics()
+            client.close()
+
+            print(
+                f"{pool_size:>5} {thread_count * _READS_PER_THREAD / seconds:>8.1f} "
+                f"{metrics.max_checked_out_connections:>8} {metrics.mean_wait_seconds * 1000:>8.2f}ms "
+                f"{metrics.max_wait_seconds * 1000:>7.2f}ms {metrics.failed_check_out_count:>7}"
+            )
+    finally:
+        db.delete_vet_collections(_VISIBILITY)
+
+
+def _create_vet(vet_index: int) -> VetCreateOrOverwrite:
+    return VetCreateOrOverwrite(
+        clinic_name=f"Clinic {vet_index}",
+        name_information={"first_name": "Erika", "last_name": "Mustermann"},
+        location={
+            "address": {"street": "Alexanderplatz", "number": str(vet_index), "zip_code": 10178, "city": "Berlin"},
+            "lat": _CENTER[0],
+            "lon": _CENTER[1],
+        },
+        contacts=[{"type": "tel:landline", "value": f"+49 30 {vet_index:0>7}"}],
+        treatments=["dogs", "cats"],
+    )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_THREAD_COUNT,
+        [int(arg) for arg in sys.argv[2:]] or _DEFAULT_POOL_SIZES,
+    )
@@ -0,0 +1,130 @@
+"""
+Measures the latency of `/vets/` requests returning the availability of an increasing number of vets,
+and converting the vet documents to responses with validation against the trusted construction of the read path.
+
+Replaces the vets of the 'software_test' visibility in the database of the environment.
+
+Usage: ./bin/benchmark.sh vets_request [vet count ...]
+"""
+import random
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+from fastapi.testclient import TestClient
+
+import api
+import availability
+import db
+import db_queries
+import vet_visibility
+from models import EmergencyTimesOverview, OpeningHoursInformation, Vet, VetCreateOrOverwrite, VetResponse
+from types_ import Weekday
+from utils import pydantic_
+
+_DEFAULT_VET_COUNTS = [10, 100, 1000]
+_VISIBILITY = "software_test"
+_TIMEZONE = "Europe/Berlin"
+_WEEKDAYS: list[Weekday] = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+_CENTER = (52.52437, 13.41053)
+
+
+def main(vet_counts: list[int]) -> None:
+    rng = random.Random(0)
+    client = TestClient(api.api)
+    headers = {"Authorization": f"Bearer {vet_visibility.generate_visibility_jwt(_VISIBILITY)}"}
+
+    availability_from = datetime.now(timezone.utc)
+    availability_to = availability_from + timedelta(weeks=1)
+    url = (
+        f"/vets/?c_lat={_CENTER[0]}&c_lon={_CENTER[1]}&r_inner=0&r_outer=1000"
+        f"&availability_from={quote(availability_from.isoformat())}"
+        f"&availability_to={quote(availability_to.isoformat())}"
+    )
+
+    print(f"{'vets':>6} {'request':>9} {'validated':>10} {'trusted':>9} {'speedup':>8}")
+
+    try:
+        for vet_count in vet_counts:
+            db.delete_vet_collections(_VISIBILITY)
+            for vet_index in range(vet_count):
+                db.create_or_overwrite_vet(_VISIBILITY, "verified", f"vet{vet_index}", _create_vet(rng, vet_index))
+
+            # The first request builds caches (e.g. the weekly overviews), which later requests share
+            client.get(url, headers=headers).raise_for_status()
+            request_seconds = _measure_seconds(lambda: client.get(url, headers=headers).raise_for_status())
+
+            vet_documents = [
+                db._convert_vet_model_to_mongo_document(vet)
+                for vet in db.get_all_verified_vets(_VISIBILITY)
+            ]
+            validated_seconds = _measure_seconds(lambda: [
+                VetResponse(distance=0, **Vet(id=document["_id"], **document).dict())
+                for document in vet_documents
+            ])
+            trusted_seconds = _measure_seconds(lambda: [
+                VetResponse.construct(distance=0, **db_queries.convert_vet_mongo_document_to_model(document).__dict__)
+                for document in vet_documents
+            ])
+
+            print(
+                f"{vet_count:>6} {request_seconds:>8.3f}s {validated_seconds:>9.3f}s {trusted_seconds:>8.3f}s "
+                f"{validated_seconds / trusted_seconds:>7.2f}x"
+            )
+    finally:
+        db.delete_vet_collections(_VISIBILITY)
+
+
+def _create_vet(rng: random.Random, vet_index: int) -> VetCreateOrOverwrite:
+    opening_hours = {
+        weekday: OpeningHoursInformation(from_=f"0{7 + vet_index % 3}:00", to=f"1{7 + vet_index % 3}:30")
+        for weekday in _WEEKDAYS[:5 + vet_index % 2]
+    }
+    emergency_times = [
+        EmergencyTimesOverview(
+            start_date=f"2026-{month:0>2}-01",
+            end_date=f"2026-{month + 1:0>2}-01",
+            from_time=f"{18 + vet_index % 4}:00",
+            to_time="08:00",
+            days=_WEEKDAYS[(vet_index + month) % 7:] or _WEEKDAYS,
+        )
+        for month in range(1, 12)
+    ]
+
+    vet = VetCreateOrOverwrite(
+        clinic_name=f"Clinic {vet_index}",
+        name_information={"first_name": "Erika", "last_name": "Mustermann"},
+        location={
+            "address": {"street": "Alexanderplatz", "number": str(vet_index), "zip_code": 10178, "city": "Berlin"},
+            "lat": _CENTER[0] + rng.uniform(-1, 1),
+            "lon": _CENTER[1] + rng.uniform(-1, 1),
+        },
+        contacts=[{"type": "tel:landline", "value": f"+49 30 {vet_index:0>7}"}],
+        opening_hours=opening_hours,
+        emergency_times=emergency_times,
+        treatments=["dogs", "cats"],
+    )
+    vet.availability_condition = availability.convert_opening_hours_to_condition(opening_hours, _TIMEZONE)
+    vet.emergency_availability_condition = availability.convert_emergency_times_to_condition(
+        emergency_times,
+        _TIMEZONE,
+    )
+
+    return vet
+
+
+def _measure_seconds(func: Callable[[], object], repetitions: int = 3) -> float:
+    best = float("inf")
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or _DEFAULT_VET_COUNTS)
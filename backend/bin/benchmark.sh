@@ -0,0 +1,13 @@
+#!/bin/bash
+
+SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+SRC_DIR="$(realpath "$SCRIPT_DIR/../src")"
+BENCHMARKS_DIR="$(realpath "$SCRIPT_DIR/../benchmarks")"
+
+. "$SCRIPT_DIR/_python.sh"
+
+benchmark_name="$1"
+shift
+
+echo_information "Running benchmark '$benchmark_name'"
+echo_and_run "ENV=dev PYTHONPATH=${SRC_DIR} $(venv_python_executable) $BENCHMARKS_DIR/$benchmark_name.py $*"
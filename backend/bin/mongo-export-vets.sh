@@ -0,0 +1,13 @@
+#!/bin/bash
+
+SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+SRC_DIR="$(realpath "$SCRIPT_DIR/../src")"
+
+. "$SCRIPT_DIR/_python.sh"
+. "$SCRIPT_DIR/_mongo.sh"
+
+env_context="$(validate_env_context "$1")"
+shift
+
+echo_information "Exporting vets"
+echo_and_run "ENV=${env_context} PYTHONPATH=${SRC_DIR} $(venv_python_executable) ${SRC_DIR}/vet_bulk_transfer.py export $*"
@@ -1,3 +1,4 @@
+import asyncio
 from typing import NoReturn
 
 from fastapi import FastAPI, Request, status
@@ -5,10 +6,12 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+import availability_materialization
 import db
 import normalization
 import utils.string_
 import vet_management
+import vet_submission_queue
 import vet_visibility
 from models import Treatments
 from . import vets
@@ -35,6 +38,7 @@ api.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[vets.NEXT_CURSOR_HEADER_NAME],
 )
 
 api.include_router(vets.router)
@@ -42,6 +46,37 @@ api.include_router(form.router)
 api.include_router(content_management.router)
 
 
+@api.on_event("startup")
+async def start_availability_materialization_scheduler() -> None:
+    event_loop = asyncio.get_running_loop()
+
+    availability_materialization.create_scheduler(event_loop).start()
+
+    # E.g. if no API process was running at night or the vets were migrated
+    availability_materialization.materialize_all_in_background(event_loop)
+
+
+@api.on_event("startup")
+async def start_vet_submission_queue_workers() -> None:
+    vet_submission_queue.start_workers(asyncio.get_running_loop())
+
+
+@api.on_event("shutdown")
+async def stop_vet_submission_queue_workers() -> None:
+    vet_submission_queue.stop_workers()
+
+
+@api.on_event("startup")
+def start_availability_process_pool() -> None:
+    # Starting the worker processes takes a while, which should not delay the first request
+    availability_materialization.get_process_pool()
+
+
+@api.on_event("shutdown")
+def stop_availability_process_pool() -> None:
+    availability_materialization.shutdown_process_pool()
+
+
 @api.exception_handler(vet_visibility.AccessDenied)
 @api.exception_handler(vet_management.AccessDenied)
 async def vet_management_access_denied_error_handler(
@@ -55,9 +90,10 @@ async def vet_management_access_denied_error_handler(
 
 
 @api.exception_handler(db.VetDoesNotExist)
+@api.exception_handler(db.VetSubmissionDoesNotExist)
 async def vet_management_access_denied_error_handler(
         request: Request,
-        err: db.VetDoesNotExist
+        err: db.VetDoesNotExist | db.VetSubmissionDoesNotExist
 ) -> NoReturn:
     return JSONResponse(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -3,7 +3,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 import email_
 import vet_management
-from models import Vet, RegistrationEmailInfo, VetCreateOrOverwrite
+import vet_submission_queue
+from models import Vet, RegistrationEmailInfo, VetCreateOrOverwrite, VetSubmission
 
 
 router = APIRouter(prefix="/form")
@@ -33,12 +34,12 @@ def send_registration_email(
 
 
 @router.get("/vet")
-def get_vet(
+async def get_vet(
         credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> Vet:
     access_token = credentials.credentials
 
-    return vet_management.get_vet_by_form_user(access_token)
+    return await vet_management.get_vet_by_form_user(access_token)
 
 
 @router.put("/create-or-overwrite-vet")
@@ -52,3 +53,33 @@ def create_or_overwrite_vet(
         access_token,
         vet,
     )
+
+
+@router.put("/submit-vet", status_code=status.HTTP_202_ACCEPTED)
+def submit_vet(
+        vet: VetCreateOrOverwrite,
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> VetSubmission:
+    """
+    Like `PUT /form/create-or-overwrite-vet`, but returns once the vet is queued.
+    Poll `GET /form/vet-submission/{submission_id}` until the submission succeeded or failed.
+    """
+    access_token = credentials.credentials
+
+    return vet_submission_queue.submit_vet_by_form_user(
+        access_token,
+        vet,
+    )
+
+
+@router.get("/vet-submission/{submission_id}")
+def get_vet_submission(
+        submission_id: str,
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> VetSubmission:
+    access_token = credentials.credentials
+
+    return vet_submission_queue.get_vet_submission_by_form_user(
+        access_token,
+        submission_id,
+    )
@@ -1,24 +1,43 @@
+import base64
+import contextlib
+import json
 import logging
-from collections.abc import Iterable
-from datetime import datetime
-from typing import TypeVar, ParamSpec, NoReturn, cast
+import math
+from collections.abc import AsyncIterator, Iterable, Callable
+from datetime import datetime, timezone
+from typing import TypeVar, NoReturn, Any, Literal, cast
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 import vet_visibility
-from models import VetResponse, Vet
+from models import VetResponse, Vet, TimeSpan
 import db
+import db_async
 import availability
-from types_ import VetVisibility, Timezone
+import availability_materialization
+import vets_response_cache
+from types_ import VetVisibility, Timezone, AvailabilityKind
 from utils.human_readable import human_readable
+from utils import asyncio_, json_
 
 _T = TypeVar('_T')
-_P = ParamSpec('_P')
 
 
 router = APIRouter(prefix="/vets")
 
+NEXT_CURSOR_HEADER_NAME = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_EMERGENCY_NOW_DEFAULT_COUNT = 5
+_EMERGENCY_NOW_DEFAULT_R_OUTER = 100
+
+# The number of vets fetched at once while skipping vets that are filtered out
+_FILTERED_PAGE_SIZE = 50
+# The number of vets whose availability is evaluated at once while streaming responses
+_STREAMED_BATCH_SIZE = 50
+
 security = HTTPBearer()
 
 
@@ -26,10 +45,18 @@ security = HTTPBearer()
     "/",
     response_model=list[VetResponse],
     description=(
-            "Returns vets in a ring around a central coordinate."
+            "Returns vets in a ring around a central coordinate, ordered by increasing distance. "
+            f"If a page is limited and more vets may follow, the '{NEXT_CURSOR_HEADER_NAME}' response header "
+            "contains the cursor for the next page. "
+            "Unless 'open_now' is true, the ring center may be rounded and the availability window "
+            "may be extended to full hours, so nearby requests can share a cached response. "
+            f"With 'format=ndjson' or an 'Accept: {NDJSON_MEDIA_TYPE}' header, the vets are streamed "
+            "as one JSON object per line while they are read and evaluated. Since the headers are sent "
+            f"before the vets are known, streamed responses have no '{NEXT_CURSOR_HEADER_NAME}' header "
+            "and 'limit' and 'cursor' cannot be used with them."
     ),
 )
-def get_vets(
+async def get_vets(
         c_lat: float | None = Query(
             default=None,
             description="The latitude of the ring center.",
@@ -70,12 +97,51 @@ def get_vets(
             ),
             example="2022-09-23T11:04:07.252439+02:00"
         ),
+        open_now: bool = Query(
+            default=False,
+            description="If true, only vets that are open at the moment are returned.",
+        ),
+        only_available: bool = Query(
+            default=False,
+            description=(
+                    "If true, only vets whose emergency service is available at some point "
+                    "between 'availability_from' and 'availability_to' are returned. "
+                    "Can only be used together with the availability parameters."
+            ),
+        ),
+        limit: int | None = Query(
+            default=None,
+            description=(
+                    "The maximum number of vets returned. "
+                    "Can only be used together with the ring parameters and not with streamed responses."
+            ),
+            example=20,
+        ),
+        cursor: str | None = Query(
+            default=None,
+            description=(
+                    f"Continue after the last vet of the previous page. The value is taken from the "
+                    f"'{NEXT_CURSOR_HEADER_NAME}' header of the previous response. "
+                    "Can only be used together with the ring parameters and not with streamed responses."
+            ),
+        ),
+        format_: Literal["json", "ndjson"] | None = Query(
+            default=None,
+            alias="format",
+            description=(
+                    "'ndjson' streams the vets as newline-delimited JSON. "
+                    "Takes precedence over the 'Accept' header."
+            ),
+        ),
+        accept: str | None = Header(default=None),
         credentials: HTTPAuthorizationCredentials = Depends(security),
-) -> list[VetResponse]:
+) -> Response:
     access_token = credentials.credentials
 
     visbility = vet_visibility.get_visibility_from_jwt(access_token)
 
+    ndjson_is_requested = _ndjson_is_requested(format_, accept)
+
     _validate_get_vets_query_parameters(
         c_lat,
         c_lon,
@@ -83,9 +149,67 @@ def get_vets(
         r_outer,
         availability_from,
         availability_to,
+        limit,
+        cursor,
+        only_available,
+        ndjson_is_requested,
     )
 
-    return _get_vets_after_validation(
+    if ndjson_is_requested:
+        return StreamingResponse(
+            _stream_vets_responses(
+                visbility,
+                c_lat,
+                c_lon,
+                r_inner,
+                r_outer,
+                availability_from,
+                availability_to,
+                datetime.now(timezone.utc) if open_now else None,
+                db.AvailabilityWindow(
+                    kind="emergency_availability",
+                    start=availability_from,
+                    end=availability_to,
+                ) if only_available else None,
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    # Whether vets are open now changes all the time, so these responses are not worth caching
+    use_response_cache = vets_response_cache.is_enabled() and not open_now
+
+    if use_response_cache:
+        # Every request of a bucket is answered for the same ring center and availability window
+        if c_lat is not None and c_lon is not None:
+            c_lat = vets_response_cache.round_coordinate(c_lat)
+            c_lon = vets_response_cache.round_coordinate(c_lon)
+        if availability_from is not None and availability_to is not None:
+            availability_from, availability_to = vets_response_cache.snap_window(availability_from, availability_to)
+
+        response_cache_key = vets_response_cache.Key(
+            visibility=visbility,
+            c_lat=c_lat,
+            c_lon=c_lon,
+            r_inner=r_inner,
+            r_outer=r_outer,
+            availability_from=availability_from,
+            availability_to=availability_to,
+            limit=limit,
+            cursor=cursor,
+            only_available=only_available,
+            iso_year_and_week=datetime.now().isocalendar()[:2],
+        )
+
+        if (cached_response := vets_response_cache.get(response_cache_key)) is not None:
+            return Response(
+                content=cached_response.body,
+                headers=cached_response.headers,
+                media_type=json_.JsonResponse.media_type,
+            )
+
+        response_cache_generation = vets_response_cache.get_generation(visbility)
+
+    vet_responses = await _get_vets_after_validation(
         visbility,
         c_lat,
         c_lon,
@@ -93,10 +217,142 @@ def get_vets(
         r_outer,
         availability_from,
         availability_to,
+        limit,
+        _decode_cursor(cursor) if cursor is not None else None,
+        datetime.now(timezone.utc) if open_now else None,
+        db.AvailabilityWindow(
+            kind="emergency_availability",
+            start=availability_from,
+            end=availability_to,
+        ) if only_available else None,
+    )
+
+    response = _create_vets_json_response(vet_responses)
+
+    if limit is not None and len(vet_responses) == limit:
+        last_vet_response = vet_responses[-1]
+
+        response.headers[NEXT_CURSOR_HEADER_NAME] = _encode_cursor(db.RingPosition(
+            distance=last_vet_response.distance,
+            id=last_vet_response.id,
+        ))
+
+    if use_response_cache:
+        vets_response_cache.store(
+            response_cache_key,
+            response.body,
+            {
+                name: response.headers[name]
+                for name in [NEXT_CURSOR_HEADER_NAME]
+                if name in response.headers
+            },
+            response_cache_generation,
+        )
+
+    return response
+
+
+@router.get(
+    "/emergency-now",
+    response_model=list[VetResponse],
+    description=(
+            "Returns the nearest vets whose emergency service is available at the moment, "
+            "ordered by increasing distance."
+    ),
+)
+async def get_emergency_vets_available_now(
+        c_lat: float = Query(
+            description="The latitude of the center.",
+            example=52.52437,
+        ),
+        c_lon: float = Query(
+            description="The longitude of the center.",
+            example=13.41053,
+        ),
+        r_outer: float = Query(
+            default=_EMERGENCY_NOW_DEFAULT_R_OUTER,
+            description="The maximum distance of the vets in km.",
+            example=_EMERGENCY_NOW_DEFAULT_R_OUTER,
+        ),
+        count: int = Query(
+            default=_EMERGENCY_NOW_DEFAULT_COUNT,
+            description="The maximum number of vets returned.",
+            example=_EMERGENCY_NOW_DEFAULT_COUNT,
+        ),
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> json_.JsonResponse:
+    access_token = credentials.credentials
+
+    visbility = vet_visibility.get_visibility_from_jwt(access_token)
+
+    _validate_get_emergency_vets_available_now_query_parameters(
+        c_lat,
+        c_lon,
+        r_outer,
+        count,
     )
 
+    return _create_vets_json_response([
+        _create_vet_response(vet_with_distance.vet, distance=vet_with_distance.distance)
+        for vet_with_distance in await _get_nearest_emergency_vets_available_at(
+            visbility,
+            c_lat,
+            c_lon,
+            r_outer,
+            count,
+            datetime.now(timezone.utc),
+        )
+    ])
+
+
+async def _get_nearest_emergency_vets_available_at(
+        visibility: VetVisibility,
+        c_lat: float,
+        c_lon: float,
+        r_outer: float,
+        count: int,
+        dt: datetime,
+) -> list[db.VetWithDistance]:
+    """
+    Walks the vets in increasing distance and stops as soon as `count` available vets were found,
+    so the availability of farther vets is never evaluated.
+    """
+    result: list[db.VetWithDistance] = []
+    batch: list[db.VetWithDistance] = []
+
+    def is_available(vet_with_distance: db.VetWithDistance) -> bool:
+        condition = vet_with_distance.vet.emergency_availability_condition
+
+        return condition is not None and availability.is_available_at(condition, dt)
+
+    # Closing the iterator releases the database cursor when we stop early
+    async with contextlib.aclosing(db_async.iter_verified_vets_in_ring_by_distance(
+        visibility,
+        c_lat,
+        c_lon,
+        0,
+        r_outer,
+        batch_size=count,
+    )) as vets_with_distance:
+        async for vet_with_distance in vets_with_distance:
+            batch.append(vet_with_distance)
+
+            if len(batch) < count:
+                continue
+
+            result += await asyncio_.run_in_executor(_filter_included, batch, is_available)
+            batch = []
 
-def _get_vets_after_validation(
+            if len(result) >= count:
+                return result[:count]
+
+    if batch:
+        result += await asyncio_.run_in_executor(_filter_included, batch, is_available)
+
+    return result[:count]
+
+
+async def _get_vets_after_validation(
         visibility: VetVisibility,
         c_lat: float | None,
         c_lon: float | None,
@@ -104,29 +360,48 @@ def _get_vets_after_validation(
         r_outer: float | None,
         availability_from: datetime | None,
         availability_to: datetime | None,
+        limit: int | None = None,
+        after: db.RingPosition | None = None,
+        open_at: datetime | None = None,
+        available_during: db.AvailabilityWindow | None = None,
 ) -> list[VetResponse]:
-    vets_in_db = _get_vets_filtered_by_query_parameters(
+    vets_in_db = await _get_vets_filtered_by_query_parameters(
         visibility,
         c_lat,
         c_lon,
         r_inner,
-        r_outer
+        r_outer,
+        limit,
+        after,
+        open_at,
+        available_during,
     )
 
-    return _create_vets_responses(
+    return await _create_vets_responses(
+        visibility,
         vets_in_db,
         availability_from,
         availability_to,
     )
 
 
-def _get_vets_filtered_by_query_parameters(
+async def _get_vets_filtered_by_query_parameters(
         visibility: VetVisibility,
         c_lat: float | None,
         c_lon: float | None,
         r_inner: float | None,
         r_outer: float | None,
-) -> Iterable[Vet]:
+        limit: int | None,
+        after: db.RingPosition | None,
+        open_at: datetime | None = None,
+        available_during: db.AvailabilityWindow | None = None,
+) -> list[tuple[Vet, float | None]]:
+    """
+    Returns vets together with their distance from the ring center (if a ring was queried).
+
+    :param open_at: If set, only vets that are available at this instant are returned.
+    :param available_during: If set, only vets that are available during the window are returned.
+    """
     use_radius_query_pagination = not (
             c_lat is None
             or c_lon is None
@@ -134,20 +409,217 @@ def _get_vets_filtered_by_query_parameters(
             or r_outer is None
     )
 
-    if use_radius_query_pagination:
-        return db.get_all_verified_vets_in_ring(
+    available_during, evaluated_available_during = await _split_available_during(visibility, available_during)
+
+    def is_included(vet: Vet) -> bool:
+        return _is_vet_available(vet, open_at, evaluated_available_during)
+
+    if use_radius_query_pagination and (open_at is not None or evaluated_available_during is not None):
+        result: list[tuple[Vet, float | None]] = []
+
+        async with contextlib.aclosing(_iter_vets_in_ring_filtered(
+                visibility,
+                c_lat,
+                c_lon,
+                r_inner,
+                r_outer,
+                after,
+                available_during,
+                is_included,
+        )) as vets_with_distance:
+            async for vet_with_distance in vets_with_distance:
+                result.append((vet_with_distance.vet, vet_with_distance.distance))
+
+                if len(result) == limit:
+                    break
+
+        return result
+    elif use_radius_query_pagination:
+        return [
+            (vet_with_distance.vet, vet_with_distance.distance)
+            for vet_with_distance in await db_async.get_verified_vets_in_ring_by_distance(
+                visibility,
+                c_lat,
+                c_lon,
+                r_inner,
+                r_outer,
+                limit=limit,
+                after=after,
+                available_during=available_during,
+            )
+        ]
+
+    return [
+        (vet, None)
+        async for vet in _iter_included_vets(
+            db_async.get_all_verified_vets(visibility, available_during=available_during),
+            is_included,
+        )
+    ]
+
+
+async def _iter_vets_filtered_by_query_parameters(
+        visibility: VetVisibility,
+        c_lat: float | None,
+        c_lon: float | None,
+        r_inner: float | None,
+        r_outer: float | None,
+        open_at: datetime | None = None,
+        available_during: db.AvailabilityWindow | None = None,
+) -> AsyncIterator[tuple[Vet, float | None]]:
+    """
+    Yields the vets of `_get_vets_filtered_by_query_parameters`,
+    holding no more than a page of vets or a database cursor at a time.
+    """
+    available_during, evaluated_available_during = await _split_available_during(visibility, available_during)
+
+    def is_included(vet: Vet) -> bool:
+        return _is_vet_available(vet, open_at, evaluated_available_during)
+
+    if c_lat is None or c_lon is None or r_inner is None or r_outer is None:
+        async with contextlib.aclosing(_iter_included_vets(
+                db_async.get_all_verified_vets(visibility, available_during=available_during),
+                is_included,
+        )) as vets:
+            async for vet in vets:
+                yield vet, None
+
+        return
+
+    async with contextlib.aclosing(_iter_vets_in_ring_filtered(
             visibility,
             c_lat,
             c_lon,
             r_inner,
-            r_outer
+            r_outer,
+            None,
+            available_during,
+            is_included,
+    )) as vets_with_distance:
+        async for vet_with_distance in vets_with_distance:
+            yield vet_with_distance.vet, vet_with_distance.distance
+
+
+async def _split_available_during(
+        visibility: VetVisibility,
+        available_during: db.AvailabilityWindow | None,
+) -> tuple[db.AvailabilityWindow | None, db.AvailabilityWindow | None]:
+    """
+    Returns the window the database can filter by and the window whose availability must be evaluated,
+    at most one of which is not None.
+    """
+    # The database can only filter by availability once the window is materialized for all vets,
+    # e.g. not for windows beyond the materialization horizon
+    if available_during is not None and not await db_async.availability_is_materialized_for_all_verified_vets(
+            visibility,
+            available_during.start,
+            available_during.end,
+    ):
+        return None, available_during
+
+    return available_during, None
+
+
+def _is_vet_available(
+        vet: Vet,
+        open_at: datetime | None,
+        available_during: db.AvailabilityWindow | None,
+) -> bool:
+    if open_at is not None:
+        condition = availability.get_conditions_by_kind(vet).get("availability")
+
+        # A vet without opening hours is never open
+        if condition is None or not availability.is_available_at(condition, open_at):
+            return False
+
+    if available_during is not None:
+        condition = availability.get_conditions_by_kind(vet).get(available_during.kind)
+
+        if condition is None:
+            return False
+
+        time_spans = availability.get_time_spans(available_during.start, available_during.end, condition)
+
+        return next(iter(time_spans), None) is not None
+
+    return True
+
+
+async def _iter_vets_in_ring_filtered(
+        visibility: VetVisibility,
+        c_lat: float,
+        c_lon: float,
+        r_inner: float,
+        r_outer: float,
+        after: db.RingPosition | None,
+        available_during: db.AvailabilityWindow | None,
+        is_included: Callable[[Vet], bool],
+) -> AsyncIterator[db.VetWithDistance]:
+    """
+    Fetches the vets in the ring page by page and skips the vets that are not included,
+    so the returned vets can still be limited before the whole ring is loaded.
+    """
+    while True:
+        vets_with_distance = await db_async.get_verified_vets_in_ring_by_distance(
+            visibility,
+            c_lat,
+            c_lon,
+            r_inner,
+            r_outer,
+            limit=_FILTERED_PAGE_SIZE,
+            after=after,
+            available_during=available_during,
         )
 
-    return db.get_all_verified_vets(visibility)
+        for vet_with_distance in await asyncio_.run_in_executor(
+                _filter_included,
+                vets_with_distance,
+                lambda candidate: is_included(candidate.vet),
+        ):
+            yield vet_with_distance
+
+        if len(vets_with_distance) < _FILTERED_PAGE_SIZE:
+            return
 
+        last_vet_with_distance = vets_with_distance[-1]
+        after = db.RingPosition(
+            distance=last_vet_with_distance.distance,
+            id=last_vet_with_distance.vet.id,
+        )
 
-def _create_vets_responses(
-        vets_in_db: Iterable[Vet],
+
+async def _iter_included_vets(
+        vets: AsyncIterator[Vet],
+        is_included: Callable[[Vet], bool],
+) -> AsyncIterator[Vet]:
+    """
+    Yields the included vets, deciding for a page of vets at a time whether they are included.
+    Closing the iterator closes `vets`.
+    """
+    page: list[Vet] = []
+
+    async with contextlib.aclosing(vets):
+        async for vet in vets:
+            page.append(vet)
+
+            if len(page) == _FILTERED_PAGE_SIZE:
+                for included_vet in await asyncio_.run_in_executor(_filter_included, page, is_included):
+                    yield included_vet
+
+                page = []
+
+    if page:
+        for included_vet in await asyncio_.run_in_executor(_filter_included, page, is_included):
+            yield included_vet
+
+
+def _filter_included(items: list[_T], is_included: Callable[[_T], bool]) -> list[_T]:
+    return [item for item in items if is_included(item)]
+
+
+async def _create_vets_responses(
+        visibility: VetVisibility,
+        vets_in_db: list[tuple[Vet, float | None]],
         availability_from: datetime | None,
         availability_to: datetime | None,
 ) -> list[VetResponse]:
@@ -157,32 +629,139 @@ def _create_vets_responses(
     )
 
     if return_availability_in_response:
-        return [
-            VetResponse(
-                availability=list(availability.get_time_spans(
-                    lower_bound=availability_from,
-                    upper_bound=availability_to,
-                    availability_condition=vet.availability_condition,
-                )),
-                emergency_availability=list(availability.get_time_spans(
-                    lower_bound=availability_from,
-                    upper_bound=availability_to,
-                    availability_condition=vet.emergency_availability_condition,
-                )) if vet.emergency_availability_condition else None,
-                availability_during_week=availability.get_times_during_current_week_24_hour_clock(
-                    vet.availability_condition,
-                    vet.timezone,
-                ),
-                emergency_availability_during_week=availability.get_times_during_current_week_24_hour_clock(
-                    vet.emergency_availability_condition,
-                    vet.timezone,
-                ) if vet.emergency_availability_condition else None,
-                **vet.dict()
-            )
-            for vet in vets_in_db
-        ]
+        time_spans_by_vet_id = await availability_materialization.get_time_spans_by_vet_id(
+            visibility,
+            (vet for vet, _ in vets_in_db),
+            availability_from,
+            availability_to,
+        )
+
+        # Computing the weekly overviews that are not cached yet must not block the event loop
+        return await asyncio_.run_in_executor(
+            _create_vets_responses_with_availability,
+            vets_in_db,
+            time_spans_by_vet_id,
+        )
+
+    return [
+        _create_vet_response(vet, distance=distance)
+        for vet, distance in vets_in_db
+    ]
+
+
+def _create_vets_responses_with_availability(
+        vets_in_db: list[tuple[Vet, float | None]],
+        time_spans_by_vet_id: dict[str, dict[AvailabilityKind, list[availability.Interval]]],
+) -> list[VetResponse]:
+    return [
+        _create_vet_response(
+            vet,
+            availability=_convert_intervals_to_time_spans(
+                time_spans_by_vet_id[vet.id].get("availability", []),
+            ),
+            emergency_availability=_convert_intervals_to_time_spans(
+                time_spans_by_vet_id[vet.id]["emergency_availability"],
+            ) if vet.emergency_availability_condition else None,
+            availability_during_week=availability.get_times_during_current_week_24_hour_clock(
+                vet.availability_condition,
+                vet.timezone,
+                condition_hash=db.get_availability_condition_hash(vet, "availability"),
+            ) if vet.availability_condition else None,
+            emergency_availability_during_week=availability.get_times_during_current_week_24_hour_clock(
+                vet.emergency_availability_condition,
+                vet.timezone,
+                condition_hash=db.get_availability_condition_hash(vet, "emergency_availability"),
+            ) if vet.emergency_availability_condition else None,
+            distance=distance,
+        )
+        for vet, distance in vets_in_db
+    ]
+
+
+async def _stream_vets_responses(
+        visibility: VetVisibility,
+        c_lat: float | None,
+        c_lon: float | None,
+        r_inner: float | None,
+        r_outer: float | None,
+        availability_from: datetime | None,
+        availability_to: datetime | None,
+        open_at: datetime | None,
+        available_during: db.AvailabilityWindow | None,
+) -> AsyncIterator[bytes]:
+    """
+    Yields the responses of `_get_vets_after_validation` as newline-delimited JSON,
+    evaluating the availability of a batch of vets at a time.
+    """
+    batch: list[tuple[Vet, float | None]] = []
+
+    async with contextlib.aclosing(_iter_vets_filtered_by_query_parameters(
+            visibility,
+            c_lat,
+            c_lon,
+            r_inner,
+            r_outer,
+            open_at,
+            available_during,
+    )) as vets_in_db:
+        async for vet_in_db in vets_in_db:
+            batch.append(vet_in_db)
+
+            if len(batch) == _STREAMED_BATCH_SIZE:
+                yield await _create_vets_ndjson(visibility, batch, availability_from, availability_to)
+                batch = []
+
+    if batch:
+        yield await _create_vets_ndjson(visibility, batch, availability_from, availability_to)
+
+
+async def _create_vets_ndjson(
+        visibility: VetVisibility,
+        vets_in_db: list[tuple[Vet, float | None]],
+        availability_from: datetime | None,
+        availability_to: datetime | None,
+) -> bytes:
+    vet_responses = await _create_vets_responses(visibility, vets_in_db, availability_from, availability_to)
+
+    return b"".join(
+        json_.dumps(vet_response) + b"\n"
+        for vet_response in vet_responses
+    )
+
 
-    return [VetResponse(**vet.dict()) for vet in vets_in_db]
+def _ndjson_is_requested(format_: Literal["json", "ndjson"] | None, accept: str | None) -> bool:
+    if format_ is not None:
+        return format_ == "ndjson"
+
+    if accept is None:
+        return False
+
+    return any(
+        media_range.split(";")[0].strip() == NDJSON_MEDIA_TYPE
+        for media_range in accept.split(",")
+    )
+
+
+def _create_vet_response(vet: Vet, **fields: Any) -> VetResponse:
+    # The vet was validated before it was stored and the other fields are created by us,
+    # so the response is created without validating everything once more
+    return VetResponse.construct(**vet.__dict__, **fields)
+
+
+def _create_vets_json_response(vet_responses: list[VetResponse]) -> json_.JsonResponse:
+    # Returning the models would make FastAPI convert them to dicts and validate them against
+    # the response model, which repeats the validation of every nested availability condition
+    return json_.JsonResponse(vet_responses)
+
+
+def _convert_intervals_to_time_spans(intervals: Iterable[availability.Interval]) -> list[TimeSpan]:
+    return [
+        TimeSpan.construct(
+            start=interval.start,
+            end=interval.end,
+        )
+        for interval in intervals
+    ]
 
 
 def _validate_get_vets_query_parameters(
@@ -192,6 +771,10 @@ def _validate_get_vets_query_parameters(
         r_outer: float,
         availability_from: datetime,
         availability_to: datetime,
+        limit: int | None = None,
+        cursor: str | None = None,
+        only_available: bool = False,
+        ndjson_is_requested: bool = False,
 ) -> None:
     error_strings: list[str] = []
 
@@ -207,6 +790,51 @@ def _validate_get_vets_query_parameters(
         availability_from,
         availability_to
     )
+    _add_error_strings_get_vets_page_query_parameters(
+        error_strings,
+        c_lat,
+        c_lon,
+        r_inner,
+        r_outer,
+        limit,
+        cursor,
+        ndjson_is_requested,
+    )
+    _add_error_strings_get_vets_only_available_query_parameter(
+        error_strings,
+        availability_from,
+        availability_to,
+        only_available,
+    )
+
+    if error_strings:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_strings,
+        )
+
+
+def _validate_get_emergency_vets_available_now_query_parameters(
+        c_lat: float,
+        c_lon: float,
+        r_outer: float,
+        count: int,
+) -> None:
+    error_strings: list[str] = []
+
+    _add_error_strings_get_vets_ring_center_coordinate_query_parameters(
+        error_strings,
+        c_lat,
+        c_lon,
+    )
+    _add_error_strings_get_vets_ring_radii_query_parameters(
+        error_strings,
+        0,
+        r_outer,
+    )
+
+    if count < 1:
+        error_strings.append(f"{count=} is not greater than 0")
 
     if error_strings:
         raise HTTPException(
@@ -308,3 +936,83 @@ def _add_error_strings_get_vets_availability_query_parameters(
             f"must be earlier than availability_from='{availability_from}'"
         )
 
+
+def _add_error_strings_get_vets_only_available_query_parameter(
+        error_strings: list[str],
+        availability_from: datetime | None,
+        availability_to: datetime | None,
+        only_available: bool,
+) -> None:
+    if only_available and (availability_from is None or availability_to is None):
+        error_strings.append(
+            "If query parameter 'only_available' is true, "
+            "'availability_from' and 'availability_to' must be provided"
+        )
+
+
+def _add_error_strings_get_vets_page_query_parameters(
+        error_strings: list[str],
+        c_lat: float | None,
+        c_lon: float | None,
+        r_inner: float | None,
+        r_outer: float | None,
+        limit: int | None,
+        cursor: str | None,
+        ndjson_is_requested: bool,
+) -> None | NoReturn:
+    ring_parameters_are_unset = (
+            c_lat is None
+            or c_lon is None
+            or r_inner is None
+            or r_outer is None
+    )
+
+    if ring_parameters_are_unset:
+        if limit is not None:
+            error_strings.append("Query parameter 'limit' can only be used together with the ring parameters")
+        if cursor is not None:
+            error_strings.append("Query parameter 'cursor' can only be used together with the ring parameters")
+
+    # The next cursor would be known only after the headers of the streamed response were sent
+    if ndjson_is_requested:
+        if limit is not None:
+            error_strings.append("Query parameter 'limit' cannot be used with streamed responses")
+        if cursor is not None:
+            error_strings.append("Query parameter 'cursor' cannot be used with streamed responses")
+
+    if limit is not None and limit < 1:
+        error_strings.append(f"{limit=} is not greater than 0")
+
+    if cursor is not None:
+        try:
+            _decode_cursor(cursor)
+        except ValueError:
+            error_strings.append(f"cursor='{cursor}' is invalid")
+
+
+def _encode_cursor(position: db.RingPosition) -> str:
+    cursor_json = json.dumps([position.distance, position.id])
+
+    return base64.urlsafe_b64encode(cursor_json.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> db.RingPosition | NoReturn:
+    try:
+        distance, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Invalid cursor '{cursor}'") from err
+
+    # bool is a subclass of int
+    distance_is_invalid = (
+            isinstance(distance, bool)
+            or not isinstance(distance, (int, float))
+            or not math.isfinite(distance)
+    )
+
+    if distance_is_invalid or not isinstance(id_, str):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+    return db.RingPosition(
+        distance=float(distance),
+        id=id_,
+    )
@@ -1,16 +1,20 @@
+import hashlib
+import itertools
 import logging
 from datetime import datetime, timedelta, tzinfo
 from functools import wraps
-from typing import Iterable, TypeVar, Callable
+from typing import Iterable, TypeVar, Callable, Literal
 
 import dateutil.parser
+import numpy as np
+import numpy.typing as npt
+import pydantic
 from dateutil.tz import gettz
 
 from constants import WEEKDAYS
 from utils import cache, validate
 from models import (
     AvailabilityCondition,
-    TimeSpan,
     TimesDuringWeek24HourClock,
     TimeSpan24HourClock,
     Time24HourClock,
@@ -18,15 +22,18 @@ from models import (
     AvailabilityConditionWeekdaysSpan,
     AvailabilityConditionAnd,
     AvailabilityConditionTimeSpanDuringDay, TimeDuringDay, EmergencyTimesOverview, AvailabilityConditionOr,
-    AvailabilityConditionTimeSpan, EmergencyTimes,
+    AvailabilityConditionTimeSpan, EmergencyTimes, VetCreateOrOverwrite,
 )
-from types_ import Timezone, Weekday
+from types_ import Timezone, Weekday, AvailabilityKind
 
-from . import time_spans_from_non_primitive_conditions
+from . import time_spans_from_non_primitive_conditions, is_available_at_non_primitive_conditions, compiler, epoch
+from .interval import Interval
 
 
 _T = TypeVar("_T")
 
+EvaluationBackend = Literal["datetime", "epoch"]
+
 
 # We don't use UTC because it's easier to debug
 # when stuff is in your local timezone
@@ -47,21 +54,82 @@ _PRIMITIVE_CONDITIONS = {
     "or",
     "all",
 }
+_COMPILED_CONDITIONS_CACHE_MAX_SIZE = 10_000
+_WEEKLY_OVERVIEWS_CACHE_MAX_SIZE = 10_000
+_SWEEP_EVENT_START = 0
+_SWEEP_EVENT_END = 1
+
+# Compiled conditions by the hash of the condition JSON
+_compiled_conditions: cache.LruCache[bytes, compiler.CompiledCondition] = cache.LruCache(
+    max_size=_COMPILED_CONDITIONS_CACHE_MAX_SIZE,
+)
+# Weekly overviews by the hash of the condition JSON, the timezone and the ISO year and week
+_weekly_overviews: cache.LruCache[tuple[bytes, Timezone, int, int], TimesDuringWeek24HourClock] = cache.LruCache(
+    max_size=_WEEKLY_OVERVIEWS_CACHE_MAX_SIZE,
+)
 
 
 def get_times_during_current_week_24_hour_clock(
         availability_condition: AvailabilityCondition,
         timezone: Timezone,
+        *,
+        condition_hash: bytes | None = None,
 ) -> TimesDuringWeek24HourClock:
+    """
+    Returns the time spans of the current week by weekday.
+
+    The overview only changes when the week changes,
+    so it is computed once per condition content, timezone and ISO week.
+
+    :param condition_hash: See `get_condition_hash`. Computing it serializes the whole condition,
+        which costs more than looking up the cached overview, so pass the hash stored with the condition if there is one.
+    """
+    now = datetime.now()
+    iso_year, iso_week, _ = now.isocalendar()
+
+    if condition_hash is None:
+        condition_hash = get_condition_hash(availability_condition)
+
+    key = (condition_hash, timezone, iso_year, iso_week)
+
+    times_during_week = _weekly_overviews.get_or_create(
+        key,
+        lambda: {
+            weekday: list(_get_times_spans_during_weekday_in_current_week_24_hour_clock(
+                weekday,
+                availability_condition,
+                timezone,
+                now,
+            )) for weekday in WEEKDAYS
+        },
+    )
+
+    # Callers must not be able to modify the cached lists
     return {
-        weekday: list(_get_times_spans_during_weekday_in_current_week_24_hour_clock(
-            weekday,
-            availability_condition,
-            timezone,
-        )) for weekday in WEEKDAYS
+        weekday: list(time_spans)
+        for weekday, time_spans in times_during_week.items()
     }
 
 
+def invalidate_cached_weekly_overviews(
+        availability_condition: AvailabilityCondition,
+        *,
+        condition_hash: bytes | None = None,
+) -> int:
+    """
+    Removes the cached weekly overviews of the condition for all timezones and weeks.
+    Returns the number of removed overviews.
+
+    :param condition_hash: See `get_times_during_current_week_24_hour_clock`. Pass the same hash the overviews
+        were cached with, e.g. the hash stored with the condition, since a condition read back from the database
+        can serialize differently (e.g. naive instead of aware datetimes).
+    """
+    if condition_hash is None:
+        condition_hash = get_condition_hash(availability_condition)
+
+    return _weekly_overviews.invalidate_where(lambda key: key[0] == condition_hash)
+
+
 def convert_opening_hours_to_condition(
         opening_hours: OpeningHours,
         timezone: Timezone,
@@ -144,11 +212,19 @@ def get_time_spans(
         lower_bound: datetime,
         upper_bound: datetime,
         availability_condition: AvailabilityCondition,
-) -> Iterable[TimeSpan]:
+        *,
+        backend: EvaluationBackend = "datetime",
+) -> Iterable[Interval]:
     """
     Returns a list of time spans generated from the `vet.available` decision tree.
 
     The time spans fit in the half-open interval [lower_bound,upper_bound).
+
+    :param backend:
+        `"datetime"` evaluates on datetimes.
+        `"epoch"` evaluates on integer microseconds since the epoch and returns
+        sorted and disjoint time spans in the reference timezone.
+        It only pays off for long intervals, where the NumPy overhead is amortized.
     """
     validate.datetime_is_timezone_aware(lower_bound)
     validate.datetime_is_timezone_aware(upper_bound)
@@ -156,31 +232,157 @@ def get_time_spans(
     lower_bound = _datetime_in_reference_tz(lower_bound)
     upper_bound = _datetime_in_reference_tz(upper_bound)
 
-    return _get_time_spans_from_condition(
-        lower_bound,
-        upper_bound,
+    compiled_condition = get_compiled_condition(availability_condition)
+
+    if backend == "epoch":
+        return epoch.get_time_spans(
+            lower_bound,
+            upper_bound,
+            compiled_condition,
+            _REFERENCE_TIMEZONE,
+        )
+    elif backend == "datetime":
+        return _get_time_spans_from_compiled_condition(
+            lower_bound,
+            upper_bound,
+            compiled_condition,
+        )
+
+    raise ValueError(f"Invalid evaluation backend '{backend}'")
+
+
+def get_time_span_instants(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition_json: str,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Like `get_time_spans` with the `"epoch"` backend, but takes the condition as JSON
+    and returns the starts and ends of the time spans in microseconds since the epoch.
+
+    Both are cheap to send to and from other processes.
+    Convert the result with `create_time_spans_from_instants`.
+    """
+    validate.datetime_is_timezone_aware(lower_bound)
+    validate.datetime_is_timezone_aware(upper_bound)
+
+    return epoch.get_time_span_instants(
+        _datetime_in_reference_tz(lower_bound),
+        _datetime_in_reference_tz(upper_bound),
+        get_compiled_condition_from_json(condition_json),
+    )
+
+
+def create_time_spans_from_instants(
+        starts: npt.NDArray[np.int64],
+        ends: npt.NDArray[np.int64],
+) -> list[Interval]:
+    return epoch.create_time_spans(starts, ends, _REFERENCE_TIMEZONE)
+
+
+def get_compiled_condition(
+        availability_condition: AvailabilityCondition,
+) -> compiler.CompiledCondition:
+    """
+    Returns the compiled condition, which is only compiled once for the same condition content.
+    """
+    return _compiled_conditions.get_or_create(
+        get_condition_hash(availability_condition),
+        lambda: compiler.compile_condition(availability_condition),
+    )
+
+
+def get_compiled_condition_from_json(condition_json: str) -> compiler.CompiledCondition:
+    """
+    Like `get_compiled_condition`, but only parses the JSON if the condition was not compiled yet.
+    """
+    return _compiled_conditions.get_or_create(
+        hashlib.sha256(condition_json.encode()).digest(),
+        lambda: compiler.compile_condition(pydantic.parse_raw_as(AvailabilityCondition, condition_json)),
+    )
+
+
+def get_condition_hash(availability_condition: AvailabilityCondition) -> bytes:
+    """
+    Returns a hash of the condition content, which identifies the condition in the caches of this module.
+    """
+    return hashlib.sha256(availability_condition.json().encode()).digest()
+
+
+def is_available_at(
+        availability_condition: AvailabilityCondition,
+        dt: datetime,
+) -> bool:
+    """
+    Returns whether the `vet.available` decision tree is fulfilled at the instant `dt`.
+
+    Equivalent to checking whether `dt` is in one of the time spans returned by `get_time_spans`,
+    but walks the decision tree directly and stops evaluating "and"/"or" children once the result is known.
+    """
+    validate.datetime_is_timezone_aware(dt)
+
+    return _is_available_at_condition(
+        _datetime_in_reference_tz(dt),
         availability_condition,
     )
 
 
+def get_conditions_by_kind(vet: VetCreateOrOverwrite) -> dict[AvailabilityKind, AvailabilityCondition]:
+    """
+    Returns the availability conditions of the vet. Kinds without a condition are left out.
+    """
+    kind_to_condition: dict[AvailabilityKind, AvailabilityCondition] = {}
+
+    if vet.availability_condition is not None:
+        kind_to_condition["availability"] = vet.availability_condition
+    if vet.emergency_availability_condition is not None:
+        kind_to_condition["emergency_availability"] = vet.emergency_availability_condition
+
+    return kind_to_condition
+
+
+def trim_time_spans(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        time_spans: Iterable[Interval],
+) -> Iterable[Interval]:
+    """
+    Trims sorted time spans to the half-open interval [lower_bound,upper_bound).
+
+    Like `get_time_spans`, the trimmed time spans are in the reference timezone.
+    Used for time spans that were computed by `get_time_spans` for wider bounds.
+    """
+    validate.datetime_is_timezone_aware(lower_bound)
+    validate.datetime_is_timezone_aware(upper_bound)
+
+    for time_span in time_spans:
+        start = max(time_span.start, lower_bound)
+        end = min(time_span.end, upper_bound)
+
+        if start < end:
+            yield Interval(
+                start=_datetime_in_reference_tz(start),
+                end=_datetime_in_reference_tz(end),
+            )
+
+
 def _get_times_spans_during_weekday_in_current_week_24_hour_clock(
         weekday: Weekday,
         availability_condition: AvailabilityCondition,
         timezone: Timezone,
+        now: datetime,
 ) -> Iterable[TimeSpan24HourClock]:
-    now = datetime.now()
-
     weekday_index = WEEKDAYS.index(weekday)
 
     days_offset = weekday_index - now.weekday()
 
-    weekday_start = (now - timedelta(days=days_offset)).replace(
+    weekday_start = (now + timedelta(days=days_offset)).replace(
         hour=0,
         minute=0,
         second=0,
         microsecond=0,
     )
-    weekday_end = (now - timedelta(days=days_offset - 1)).replace(
+    weekday_end = (now + timedelta(days=days_offset + 1)).replace(
         hour=0,
         minute=0,
         second=0,
@@ -238,7 +440,7 @@ def _get_time_spans_from_condition(
         lower_bound: datetime,
         upper_bound: datetime,
         condition: AvailabilityCondition,
-) -> Iterable[TimeSpan]:
+) -> Iterable[Interval]:
     if condition.type == "not":
         yield from _not_operation(
             lower_bound,
@@ -253,7 +455,7 @@ def _get_time_spans_from_condition(
         yield from _or_operation(
             lower_bound,
             upper_bound,
-            _chain_and_sort_timespans(
+            itertools.chain.from_iterable(
                 _get_time_spans_from_condition(
                     lower_bound,
                     upper_bound,
@@ -263,29 +465,20 @@ def _get_time_spans_from_condition(
             ),
         )
     elif condition.type == "and":
-        # We use de morgan's laws
-        yield from _not_operation(
+        yield from _and_operation(
             lower_bound,
             upper_bound,
-            _or_operation(
-                lower_bound,
-                upper_bound,
-                _chain_and_sort_timespans(
-                    _not_operation(
-                        lower_bound,
-                        upper_bound,
-                        _get_time_spans_from_condition(
-                            lower_bound,
-                            upper_bound,
-                            child_condition
-                        ),
-                    )
-                    for child_condition in condition.children
+            [
+                _get_time_spans_from_condition(
+                    lower_bound,
+                    upper_bound,
+                    child_condition
                 )
-            )
+                for child_condition in condition.children
+            ],
         )
     elif condition.type == "all":
-        yield TimeSpan(
+        yield Interval(
             start=lower_bound,
             end=upper_bound,
         )
@@ -297,19 +490,103 @@ def _get_time_spans_from_condition(
         )
 
 
+def _get_time_spans_from_compiled_condition(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: compiler.CompiledCondition,
+) -> Iterable[Interval]:
+    if isinstance(condition, compiler.Constant):
+        if condition.value:
+            yield Interval(
+                start=lower_bound,
+                end=upper_bound,
+            )
+    elif isinstance(condition, compiler.Not):
+        yield from _not_operation(
+            lower_bound,
+            upper_bound,
+            _get_time_spans_from_compiled_condition(
+                lower_bound,
+                upper_bound,
+                condition.child,
+            )
+        )
+    elif isinstance(condition, compiler.Or):
+        yield from _or_operation(
+            lower_bound,
+            upper_bound,
+            itertools.chain.from_iterable(
+                _get_time_spans_from_compiled_condition(
+                    lower_bound,
+                    upper_bound,
+                    child_condition,
+                )
+                for child_condition in condition.children
+            ),
+        )
+    elif isinstance(condition, compiler.And):
+        # Exceptions like the validity of emergency times limit where the other children need to be evaluated
+        for child_condition in condition.children:
+            if isinstance(child_condition, compiler.TimeSpans) and child_condition.time_spans:
+                lower_bound = max(lower_bound, child_condition.time_spans[0][0])
+                upper_bound = min(upper_bound, child_condition.time_spans[-1][1])
+
+        if lower_bound >= upper_bound:
+            return
+
+        yield from _and_operation(
+            lower_bound,
+            upper_bound,
+            [
+                _get_time_spans_from_compiled_condition(
+                    lower_bound,
+                    upper_bound,
+                    child_condition,
+                )
+                for child_condition in condition.children
+            ],
+        )
+    else:
+        yield from condition.get_time_spans(lower_bound, upper_bound)
+
+
+def _is_available_at_condition(
+        dt: datetime,
+        condition: AvailabilityCondition,
+) -> bool:
+    if condition.type == "not":
+        return not _is_available_at_condition(dt, condition.child)
+    elif condition.type == "or":
+        return any(
+            _is_available_at_condition(dt, child_condition)
+            for child_condition in condition.children
+        )
+    elif condition.type == "and":
+        return all(
+            _is_available_at_condition(dt, child_condition)
+            for child_condition in condition.children
+        )
+    elif condition.type == "all":
+        return True
+
+    condition_type_to_is_available_at_func = _get_non_primitive_condition_type_to_is_available_at_funcs_map()
+
+    return condition_type_to_is_available_at_func[condition.type](dt, condition)
+
+
 def _not_operation(
         lower_bound: datetime,
         upper_bound: datetime,
-        time_spans: Iterable[TimeSpan],
-) -> Iterable[TimeSpan]:
-    last_time_span = TimeSpan(start=lower_bound, end=lower_bound)
+        time_spans: Iterable[Interval],
+) -> Iterable[Interval]:
+    last_time_span = Interval(start=lower_bound, end=lower_bound)
 
     for time_span in time_spans:
         start = last_time_span.end
         end = time_span.start
 
         if end - start > timedelta(milliseconds=0):
-            yield TimeSpan(
+            yield Interval(
                 start=last_time_span.end,
                 end=time_span.start,
             )
@@ -320,7 +597,7 @@ def _not_operation(
     end = upper_bound
 
     if end - start > timedelta(milliseconds=0):
-        yield TimeSpan(
+        yield Interval(
             start=last_time_span.end,
             end=upper_bound,
         )
@@ -329,59 +606,89 @@ def _not_operation(
 def _or_operation(
         lower_bound: datetime,
         upper_bound: datetime,
-        time_spans: Iterable[TimeSpan],
-) -> Iterable[TimeSpan]:
-    result: list[TimeSpan] = []
+        time_spans: Iterable[Interval],
+) -> list[Interval]:
+    """
+    Returns the union of the time spans as sorted and disjoint time spans within the bounds.
 
-    for time_span in time_spans:
-        result = _apply_or_single(
-            lower_bound,
-            upper_bound,
-            result,
-            time_span,
-        )
+    Sorting dominates, so this is O(n log n) in the number of time spans.
+    """
+    result: list[Interval] = []
+
+    for time_span in sorted(time_spans):
+        start = max(lower_bound, time_span.start)
+        end = min(time_span.end, upper_bound)
+
+        if start >= end:
+            continue
+
+        if result and start <= (last_time_span := result[-1]).end:
+            if end > last_time_span.end:
+                result[-1] = Interval(
+                    start=last_time_span.start,
+                    end=end,
+                )
+        else:
+            result.append(Interval(
+                start=start,
+                end=end,
+            ))
 
     return result
 
 
-def _apply_or_single(
+def _and_operation(
         lower_bound: datetime,
         upper_bound: datetime,
-        time_spans: list[TimeSpan],
-        time_span: TimeSpan
-) -> list[TimeSpan]:
-    time_span = _trim_time_span_to_bounds(
-        lower_bound,
-        upper_bound,
-        time_span
-    )
-
-    new_time_spans: list[TimeSpan] = []
-
-    for existing_ts in time_spans:
-        is_joined = (
-                time_span.start <= existing_ts.start <= time_span.end
-                or time_span.start <= existing_ts.end <= time_span.end
-        )
+        time_spans_per_operand: list[Iterable[Interval]],
+) -> list[Interval]:
+    """
+    Returns the intersection of the operands as sorted and disjoint time spans within the bounds.
 
-        if is_joined:
-            time_span = TimeSpan(
-                start=min(existing_ts.start, time_span.start),
-                end=max(existing_ts.end, time_span.end),
-            )
+    Sweeps over the start and end points of all time spans
+    and keeps the sections where every operand has a time span.
+    """
+    if not time_spans_per_operand:
+        return [Interval(start=lower_bound, end=upper_bound)]
+
+    # Start points are sorted before end points at the same instant,
+    # so time spans that only touch each other produce empty sections that are skipped
+    events: list[tuple[datetime, int]] = []
+    for time_spans in time_spans_per_operand:
+        for time_span in _or_operation(lower_bound, upper_bound, time_spans):
+            events.append((time_span.start, _SWEEP_EVENT_START))
+            events.append((time_span.end, _SWEEP_EVENT_END))
+
+    events.sort()
+
+    result: list[Interval] = []
+    operands_count = len(time_spans_per_operand)
+    active_count = 0
+    section_start: datetime | None = None
+
+    for instant, event in events:
+        if event == _SWEEP_EVENT_START:
+            active_count += 1
+
+            if active_count == operands_count:
+                section_start = instant
         else:
-            new_time_spans.append(existing_ts)
+            if active_count == operands_count and section_start < instant:
+                result.append(Interval(
+                    start=section_start,
+                    end=instant,
+                ))
 
-    new_time_spans.append(time_span)
+            active_count -= 1
 
-    return new_time_spans
+    return result
 
 
 def _get_time_spans_from_non_primitive_condition(
         lower_bound: datetime,
         upper_bound: datetime,
         condition: AvailabilityCondition,
-) -> Iterable[TimeSpan]:
+) -> Iterable[Interval]:
     condition_type_to_get_func = _get_non_primitive_condition_type_to_get_funcs_map()
 
     yield from condition_type_to_get_func[condition.type](
@@ -392,37 +699,41 @@ def _get_time_spans_from_non_primitive_condition(
 
 
 def _apply_trim_yielded_time_spans(
-        func: Callable[[datetime, datetime, AvailabilityCondition], Iterable[TimeSpan]]
-) -> Callable[[datetime, datetime, AvailabilityCondition], Iterable[TimeSpan]]:
+        func: Callable[[datetime, datetime, AvailabilityCondition], Iterable[Interval]]
+) -> Callable[[datetime, datetime, AvailabilityCondition], Iterable[Interval]]:
 
     @wraps(func)
     def wrapped_func(
             lower_bound: datetime,
             upper_bound: datetime,
             condition: AvailabilityCondition,
-    ) -> Iterable[TimeSpan]:
+    ) -> Iterable[Interval]:
         for time_span in func(
                 lower_bound,
                 upper_bound,
                 condition,
         ):
-            yield _trim_time_span_to_bounds(
+            trimmed_time_span = _trim_time_span_to_bounds(
                 lower_bound,
                 upper_bound,
                 time_span
             )
 
+            # Time spans outside the bounds are empty after trimming
+            if trimmed_time_span.start < trimmed_time_span.end:
+                yield trimmed_time_span
+
     return wrapped_func
 
 
 @cache.return_singleton
 def _get_non_primitive_condition_type_to_get_funcs_map() -> dict[
     str,
-    Callable[[datetime, datetime, AvailabilityCondition], Iterable[TimeSpan]]
+    Callable[[datetime, datetime, AvailabilityCondition], Iterable[Interval]]
 ]:
     result: dict[
         str,
-        Callable[[datetime, datetime, AvailabilityCondition], Iterable[TimeSpan]]
+        Callable[[datetime, datetime, AvailabilityCondition], Iterable[Interval]]
     ] = {}
     for condition_type in _CONDITIONS - _PRIMITIVE_CONDITIONS:
         original_func = time_spans_from_non_primitive_conditions.__dict__[condition_type]
@@ -432,12 +743,23 @@ def _get_non_primitive_condition_type_to_get_funcs_map() -> dict[
     return result
 
 
+@cache.return_singleton
+def _get_non_primitive_condition_type_to_is_available_at_funcs_map() -> dict[
+    str,
+    Callable[[datetime, AvailabilityCondition], bool]
+]:
+    return {
+        condition_type: is_available_at_non_primitive_conditions.__dict__[condition_type]
+        for condition_type in _CONDITIONS - _PRIMITIVE_CONDITIONS
+    }
+
+
 def _trim_time_span_to_bounds(
         lower_bound: datetime,
         upper_bound: datetime,
-        time_span: TimeSpan,
-) -> TimeSpan:
-    return TimeSpan(
+        time_span: Interval,
+) -> Interval:
+    return Interval(
         start=max(lower_bound, time_span.start),
         end=min(time_span.end, upper_bound),
     )
@@ -451,18 +773,3 @@ def _datetime_in_reference_tz(dt: datetime) -> datetime:
         _reference_tz_object = gettz(_REFERENCE_TIMEZONE)
 
     return dt.astimezone(_reference_tz_object)
-
-
-def _chain_and_sort_timespans(
-        iters: Iterable[Iterable[TimeSpan]]
-) -> Iterable[_T]:
-    unsorted_timespans: set[TimeSpan] = set()
-
-    for iter_ in iters:
-        for time_span in iter_:
-            unsorted_timespans.add(time_span)
-
-    def sort_key_func(time_span: TimeSpan) -> datetime:
-        return time_span.start
-
-    return sorted(unsorted_timespans, key=sort_key_func)
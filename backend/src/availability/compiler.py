@@ -0,0 +1,348 @@
+"""
+Compiles `AvailabilityCondition` trees into a normalized form that is cheap to evaluate.
+
+All conditions that repeat every week (`time_span_during_day`, `weekdays` and combinations of them)
+are folded into `WeeklyIntervals`, sorted minute offsets into the week of a timezone.
+What remains are the exceptions to the weekly pattern (`time_span` and `holidays`)
+combined by flat and/or/not nodes.
+"""
+import itertools
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from dateutil.tz import gettz
+
+from constants import WEEKDAYS
+from models import AvailabilityCondition
+from types_ import Timezone, Region
+
+from .holidays import get_by_region as get_holidays_by_region
+from .interval import Interval
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Half-open interval of minutes since monday 00:00
+_MinuteInterval = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Constant:
+    value: bool
+
+
+@dataclass(frozen=True)
+class WeeklyIntervals:
+    timezone: Timezone
+    # Sorted, disjoint and non-adjacent intervals within [0, MINUTES_PER_WEEK]
+    intervals: tuple[_MinuteInterval, ...]
+
+    def get_time_spans(self, lower_bound: datetime, upper_bound: datetime) -> Iterable[Interval]:
+        tz_obj = gettz(self.timezone)
+
+        local_lower_bound = lower_bound.astimezone(tz_obj)
+        monday = local_lower_bound.date() - timedelta(days=local_lower_bound.weekday())
+        week_start = datetime.combine(monday, time(), tzinfo=tz_obj)
+
+        last_time_span: Interval | None = None
+
+        while week_start < upper_bound:
+            for start_minute, end_minute in self.intervals:
+                # Adding a timedelta keeps the wall clock time, just like `datetime.replace` does
+                start = max(week_start + timedelta(minutes=start_minute), lower_bound)
+                end = min(week_start + timedelta(minutes=end_minute), upper_bound)
+
+                if start >= end:
+                    continue
+
+                if last_time_span is not None and start <= last_time_span.end:
+                    # The interval continues the interval at the end of the previous week
+                    last_time_span = Interval(start=last_time_span.start, end=end)
+                    continue
+
+                if last_time_span is not None:
+                    yield last_time_span
+
+                last_time_span = Interval(start=start, end=end)
+
+            week_start += timedelta(weeks=1)
+
+        if last_time_span is not None:
+            yield last_time_span
+
+
+@dataclass(frozen=True)
+class TimeSpans:
+    # Sorted and disjoint
+    time_spans: tuple[tuple[datetime, datetime], ...]
+
+    def get_time_spans(self, lower_bound: datetime, upper_bound: datetime) -> Iterable[Interval]:
+        for start, end in self.time_spans:
+            start = max(start, lower_bound)
+            end = min(end, upper_bound)
+
+            if start < end:
+                yield Interval(start=start, end=end)
+
+
+@dataclass(frozen=True)
+class Holidays:
+    regions: tuple[Region, ...]
+
+    def get_time_spans(self, lower_bound: datetime, upper_bound: datetime) -> Iterable[Interval]:
+        days = sorted({
+            day
+            for region in self.regions
+            for day in get_holidays_by_region(lower_bound, upper_bound, region)
+        })
+
+        for day in days:
+            start = max(_get_day_start(day), lower_bound)
+            end = min(_get_day_start(day + timedelta(days=1)), upper_bound)
+
+            if start < end:
+                yield Interval(start=start, end=end)
+
+
+@dataclass(frozen=True)
+class Not:
+    child: "CompiledCondition"
+
+
+@dataclass(frozen=True)
+class And:
+    children: tuple["CompiledCondition", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    children: tuple["CompiledCondition", ...]
+
+
+CompiledCondition = Constant | WeeklyIntervals | TimeSpans | Holidays | Not | And | Or
+
+_TRUE = Constant(value=True)
+_FALSE = Constant(value=False)
+
+
+def compile_condition(condition: AvailabilityCondition) -> CompiledCondition:
+    if condition.type == "all":
+        return _TRUE
+    elif condition.type == "not":
+        return _compile_not(compile_condition(condition.child))
+    elif condition.type == "and":
+        return _compile_and([compile_condition(child) for child in condition.children])
+    elif condition.type == "or":
+        return _compile_or([compile_condition(child) for child in condition.children])
+    elif condition.type == "time_span":
+        tz_obj = gettz(condition.timezone)
+        start = condition.start.astimezone(tz_obj)
+        end = condition.end.astimezone(tz_obj)
+
+        return TimeSpans(time_spans=((start, end),)) if start < end else _FALSE
+    elif condition.type == "time_span_during_day":
+        return _create_weekly_intervals(
+            condition.timezone,
+            _get_time_span_during_day_minute_intervals(
+                condition.start_time.hour * 60 + condition.start_time.minute,
+                condition.end_time.hour * 60 + condition.end_time.minute,
+            ),
+        )
+    elif condition.type == "weekdays":
+        start_index = WEEKDAYS.index(condition.start_day)
+        end_index = WEEKDAYS.index(condition.end_day)
+
+        return _create_weekly_intervals(
+            condition.timezone,
+            [(start_index * MINUTES_PER_DAY, (end_index + 1) * MINUTES_PER_DAY)],
+        )
+    elif condition.type == "holidays":
+        return Holidays(regions=(condition.region,))
+
+    raise ValueError(f"Unknown condition type '{condition.type}'")
+
+
+def _compile_not(child: CompiledCondition) -> CompiledCondition:
+    if isinstance(child, Constant):
+        return Constant(value=not child.value)
+    elif isinstance(child, Not):
+        return child.child
+    elif isinstance(child, WeeklyIntervals):
+        return _create_weekly_intervals(child.timezone, _complement(child.intervals))
+
+    return Not(child=child)
+
+
+def _compile_and(children: Iterable[CompiledCondition]) -> CompiledCondition:
+    flat_children: list[CompiledCondition] = []
+
+    for child in _flatten(children, And):
+        if child == _FALSE:
+            return _FALSE
+        elif child != _TRUE:
+            flat_children.append(child)
+
+    timezone_to_intervals: dict[Timezone, Sequence[_MinuteInterval]] = {}
+    other_children: list[CompiledCondition] = []
+
+    for child in flat_children:
+        if isinstance(child, WeeklyIntervals):
+            timezone_to_intervals[child.timezone] = _intersection(
+                timezone_to_intervals.get(child.timezone, [(0, MINUTES_PER_WEEK)]),
+                child.intervals,
+            )
+        else:
+            other_children.append(child)
+
+    merged_children = [
+        _create_weekly_intervals(timezone, intervals)
+        for timezone, intervals in timezone_to_intervals.items()
+    ] + other_children
+
+    return _create_n_ary(And, merged_children, neutral=_TRUE, absorbing=_FALSE)
+
+
+def _compile_or(children: Iterable[CompiledCondition]) -> CompiledCondition:
+    flat_children: list[CompiledCondition] = []
+
+    for child in _flatten(children, Or):
+        if child == _TRUE:
+            return _TRUE
+        elif child != _FALSE:
+            flat_children.append(child)
+
+    timezone_to_intervals: dict[Timezone, list[_MinuteInterval]] = {}
+    time_spans: list[tuple[datetime, datetime]] = []
+    regions: set[Region] = set()
+    other_children: list[CompiledCondition] = []
+
+    for child in flat_children:
+        if isinstance(child, WeeklyIntervals):
+            timezone_to_intervals.setdefault(child.timezone, []).extend(child.intervals)
+        elif isinstance(child, TimeSpans):
+            time_spans.extend(child.time_spans)
+        elif isinstance(child, Holidays):
+            regions.update(child.regions)
+        else:
+            other_children.append(child)
+
+    merged_children: list[CompiledCondition] = [
+        _create_weekly_intervals(timezone, intervals)
+        for timezone, intervals in timezone_to_intervals.items()
+    ]
+    if time_spans:
+        merged_children.append(TimeSpans(time_spans=tuple(_union(time_spans))))
+    if regions:
+        merged_children.append(Holidays(regions=tuple(sorted(regions))))
+
+    return _create_n_ary(Or, merged_children + other_children, neutral=_FALSE, absorbing=_TRUE)
+
+
+def _flatten(
+        children: Iterable[CompiledCondition],
+        node_type: type[And] | type[Or],
+) -> Iterable[CompiledCondition]:
+    for child in children:
+        if isinstance(child, node_type):
+            yield from child.children
+        else:
+            yield child
+
+
+def _create_n_ary(
+        node_type: type[And] | type[Or],
+        children: list[CompiledCondition],
+        *,
+        neutral: Constant,
+        absorbing: Constant,
+) -> CompiledCondition:
+    # Merging weekly intervals may have produced constants
+    if absorbing in children:
+        return absorbing
+
+    children = [child for child in children if child != neutral]
+
+    if not children:
+        return neutral
+    elif len(children) == 1:
+        return children[0]
+
+    return node_type(children=tuple(children))
+
+
+def _create_weekly_intervals(
+        timezone: Timezone,
+        intervals: Iterable[_MinuteInterval],
+) -> WeeklyIntervals | Constant:
+    merged_intervals = tuple(_union(intervals))
+
+    if not merged_intervals:
+        return _FALSE
+    elif merged_intervals == ((0, MINUTES_PER_WEEK),):
+        return _TRUE
+
+    return WeeklyIntervals(timezone=timezone, intervals=merged_intervals)
+
+
+def _get_time_span_during_day_minute_intervals(
+        start_minute: int,
+        end_minute: int,
+) -> Iterable[_MinuteInterval]:
+    if end_minute < start_minute:
+        # The time span ends on the next day
+        end_minute += MINUTES_PER_DAY
+
+    for day_offset in range(0, MINUTES_PER_WEEK, MINUTES_PER_DAY):
+        start = day_offset + start_minute
+        end = day_offset + end_minute
+
+        if end > MINUTES_PER_WEEK:
+            # The time span of sunday ends on monday
+            yield start, MINUTES_PER_WEEK
+            yield 0, end - MINUTES_PER_WEEK
+        else:
+            yield start, end
+
+
+_Comparable = int | datetime
+
+
+def _union(intervals: Iterable[tuple[_Comparable, _Comparable]]) -> list[tuple[_Comparable, _Comparable]]:
+    result: list[tuple[_Comparable, _Comparable]] = []
+
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+
+        if result and start <= result[-1][1]:
+            result[-1] = (result[-1][0], max(result[-1][1], end))
+        else:
+            result.append((start, end))
+
+    return result
+
+
+def _intersection(
+        intervals_a: Sequence[_MinuteInterval],
+        intervals_b: Sequence[_MinuteInterval],
+) -> list[_MinuteInterval]:
+    return _union(
+        (max(start_a, start_b), min(end_a, end_b))
+        for (start_a, end_a), (start_b, end_b) in itertools.product(intervals_a, intervals_b)
+    )
+
+
+def _complement(intervals: Sequence[_MinuteInterval]) -> list[_MinuteInterval]:
+    boundaries = [0, *itertools.chain.from_iterable(intervals), MINUTES_PER_WEEK]
+
+    return _union(zip(boundaries[::2], boundaries[1::2]))
+
+
+def _get_day_start(dt: datetime) -> datetime:
+    return dt.replace(
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
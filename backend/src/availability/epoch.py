@@ -0,0 +1,401 @@
+"""
+Evaluates compiled conditions on integer microseconds since the epoch instead of datetimes.
+
+Weekly intervals are expanded with NumPy int64 arithmetic on wall clock times.
+Wall clock times are converted to UTC with a table of the UTC offset transitions of the timezone,
+which is built once per timezone and range of years. Datetimes are only created for the result.
+
+The UTC offset of a wall clock time matches `datetime(..., tzinfo=gettz(timezone)).utcoffset()`,
+so non-existent and ambiguous wall clock times around DST transitions resolve like in the datetime evaluation.
+"""
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+
+import numpy as np
+import numpy.typing as npt
+from dateutil.tz import gettz
+
+from types_ import Timezone
+from utils import cache
+
+from . import compiler
+from .interval import Interval
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+_MICROSECONDS_PER_SECOND = 1_000_000
+_MICROSECONDS_PER_MINUTE = 60 * _MICROSECONDS_PER_SECOND
+_MICROSECONDS_PER_DAY = 24 * 60 * _MICROSECONDS_PER_MINUTE
+_MICROSECONDS_PER_WEEK = 7 * _MICROSECONDS_PER_DAY
+# The epoch is a thursday
+_FIRST_MONDAY_SINCE_EPOCH = 4 * _MICROSECONDS_PER_DAY
+
+_OFFSET_TABLES_CACHE_MAX_SIZE = 256
+
+_IntArray = npt.NDArray[np.int64]
+# Sorted, disjoint and non-adjacent intervals as arrays of starts and ends
+_Intervals = tuple[_IntArray, _IntArray]
+
+
+@dataclass(frozen=True)
+class _OffsetTable:
+    # UTC offsets[i] applies from utc_transitions[i - 1] (or wall_transitions[i - 1]) on
+    utc_transitions: _IntArray
+    wall_transitions: _IntArray
+    offsets: _IntArray
+
+    def get_offsets_at_utc(self, instants: _IntArray) -> _IntArray:
+        return self.offsets[np.searchsorted(self.utc_transitions, instants, side="right")]
+
+    def get_offsets_at_wall(self, wall_instants: _IntArray) -> _IntArray:
+        return self.offsets[np.searchsorted(self.wall_transitions, wall_instants, side="right")]
+
+
+# Offset tables by timezone, first year and last year
+_offset_tables: cache.LruCache[tuple[Timezone, int, int], _OffsetTable] = cache.LruCache(
+    max_size=_OFFSET_TABLES_CACHE_MAX_SIZE,
+)
+
+
+def get_time_spans(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: compiler.CompiledCondition,
+        timezone_: Timezone,
+) -> list[Interval]:
+    """
+    Returns the time spans of the compiled condition in the half-open interval [lower_bound,upper_bound).
+
+    The time spans are sorted, disjoint and in `timezone_`.
+    """
+    starts, ends = get_time_span_instants(lower_bound, upper_bound, condition)
+
+    return create_time_spans(starts, ends, timezone_)
+
+
+def get_time_span_instants(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: compiler.CompiledCondition,
+) -> tuple[_IntArray, _IntArray]:
+    """
+    Returns the starts and ends of the time spans of the compiled condition
+    in microseconds since the epoch, without creating any datetimes.
+    """
+    lower = to_epoch_microseconds(lower_bound)
+    upper = to_epoch_microseconds(upper_bound)
+
+    return _evaluate(lower_bound, upper_bound, lower, upper, condition)
+
+
+def create_time_spans(
+        starts: _IntArray,
+        ends: _IntArray,
+        timezone_: Timezone,
+) -> list[Interval]:
+    """
+    Creates the time spans in `timezone_` from the starts and ends returned by `get_time_span_instants`.
+    """
+    if len(starts) == 0:
+        return []
+
+    tz_obj = gettz(timezone_)
+    start_datetimes = _create_datetimes(starts, timezone_, tz_obj)
+    end_datetimes = _create_datetimes(ends, timezone_, tz_obj)
+
+    return [
+        Interval(start=start, end=end)
+        for start, end in zip(start_datetimes, end_datetimes)
+    ]
+
+
+def to_epoch_microseconds(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_epoch_microseconds(microseconds: int, tz_obj: tzinfo | None) -> datetime:
+    return (_EPOCH + timedelta(microseconds=microseconds)).astimezone(tz_obj)
+
+
+def _create_datetimes(instants: _IntArray, timezone_: Timezone, tz_obj: tzinfo) -> list[datetime]:
+    """
+    Creates the datetimes from the wall clock times,
+    which is a lot faster than converting every UTC datetime with `datetime.astimezone`.
+    """
+    offset_table = _get_offset_table(timezone_, int(instants[0]), int(instants[-1]))
+
+    offsets = offset_table.get_offsets_at_utc(instants)
+    wall_instants = instants + offsets
+    # The second occurrence of an ambiguous wall clock time has a different offset than the first one
+    folds = offset_table.get_offsets_at_wall(wall_instants) != offsets
+
+    return [
+        (_NAIVE_EPOCH + timedelta(microseconds=wall_instant)).replace(tzinfo=tz_obj, fold=fold)
+        for wall_instant, fold in zip(wall_instants.tolist(), folds.tolist())
+    ]
+
+
+def _evaluate(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        lower: int,
+        upper: int,
+        condition: compiler.CompiledCondition,
+) -> _Intervals:
+    if isinstance(condition, compiler.Constant):
+        if condition.value and lower < upper:
+            return _create_intervals([lower], [upper])
+
+        return _create_intervals([], [])
+    elif isinstance(condition, compiler.Not):
+        return _complement(
+            lower,
+            upper,
+            _evaluate(lower_bound, upper_bound, lower, upper, condition.child),
+        )
+    elif isinstance(condition, compiler.Or):
+        return _union(
+            lower,
+            upper,
+            [
+                _evaluate(lower_bound, upper_bound, lower, upper, child_condition)
+                for child_condition in condition.children
+            ],
+        )
+    elif isinstance(condition, compiler.And):
+        # Exceptions like the validity of emergency times limit where the other children need to be evaluated
+        for child_condition in condition.children:
+            if isinstance(child_condition, compiler.TimeSpans) and child_condition.time_spans:
+                lower_bound = max(lower_bound, child_condition.time_spans[0][0])
+                upper_bound = min(upper_bound, child_condition.time_spans[-1][1])
+
+        if lower_bound >= upper_bound:
+            return _create_intervals([], [])
+
+        lower = to_epoch_microseconds(lower_bound)
+        upper = to_epoch_microseconds(upper_bound)
+
+        return _intersection(
+            lower,
+            upper,
+            [
+                _evaluate(lower_bound, upper_bound, lower, upper, child_condition)
+                for child_condition in condition.children
+            ],
+        )
+    elif isinstance(condition, compiler.WeeklyIntervals):
+        return _evaluate_weekly_intervals(lower, upper, condition)
+
+    # Time spans and holidays are few, so they are expanded as datetimes
+    return _union(
+        lower,
+        upper,
+        [_convert_time_spans_to_intervals(condition.get_time_spans(lower_bound, upper_bound))],
+    )
+
+
+def _evaluate_weekly_intervals(
+        lower: int,
+        upper: int,
+        condition: compiler.WeeklyIntervals,
+) -> _Intervals:
+    if lower >= upper:
+        return _create_intervals([], [])
+
+    offset_table = _get_offset_table(condition.timezone, lower, upper)
+
+    wall_lower = lower + int(offset_table.get_offsets_at_utc(np.array([lower]))[0])
+    first_week_start = wall_lower - (wall_lower - _FIRST_MONDAY_SINCE_EPOCH) % _MICROSECONDS_PER_WEEK
+
+    # Wall clock times can be at most a day ahead of UTC
+    week_starts = np.arange(
+        first_week_start,
+        upper + _MICROSECONDS_PER_DAY,
+        _MICROSECONDS_PER_WEEK,
+        dtype=np.int64,
+    )
+    minute_intervals = np.array(condition.intervals, dtype=np.int64).reshape(-1, 2)
+
+    wall_starts = (week_starts[:, np.newaxis] + minute_intervals[:, 0] * _MICROSECONDS_PER_MINUTE).ravel()
+    wall_ends = (week_starts[:, np.newaxis] + minute_intervals[:, 1] * _MICROSECONDS_PER_MINUTE).ravel()
+
+    return _union(
+        lower,
+        upper,
+        [(
+            wall_starts - offset_table.get_offsets_at_wall(wall_starts),
+            wall_ends - offset_table.get_offsets_at_wall(wall_ends),
+        )],
+    )
+
+
+def _get_offset_table(timezone_: Timezone, lower: int, upper: int) -> _OffsetTable:
+    # One year of margin covers week starts before the lower bound and wall clock times after the upper bound
+    first_year = from_epoch_microseconds(lower, timezone.utc).year - 1
+    last_year = from_epoch_microseconds(upper, timezone.utc).year + 1
+
+    return _offset_tables.get_or_create(
+        (timezone_, first_year, last_year),
+        lambda: _create_offset_table(timezone_, first_year, last_year),
+    )
+
+
+def _create_offset_table(timezone_: Timezone, first_year: int, last_year: int) -> _OffsetTable:
+    tz_obj = gettz(timezone_)
+
+    def get_offset_at_utc(seconds: int) -> int:
+        return _get_microseconds(
+            (_EPOCH + timedelta(seconds=seconds)).astimezone(tz_obj).utcoffset()
+        )
+
+    def get_offset_at_wall(seconds: int) -> int:
+        return _get_microseconds(
+            (_NAIVE_EPOCH + timedelta(seconds=seconds)).replace(tzinfo=tz_obj).utcoffset()
+        )
+
+    start = to_epoch_microseconds(datetime(first_year, 1, 1, tzinfo=timezone.utc)) // _MICROSECONDS_PER_SECOND
+    end = to_epoch_microseconds(datetime(last_year + 1, 1, 1, tzinfo=timezone.utc)) // _MICROSECONDS_PER_SECOND
+    day = _MICROSECONDS_PER_DAY // _MICROSECONDS_PER_SECOND
+
+    utc_transitions: list[int] = []
+    wall_transitions: list[int] = []
+    offsets = [get_offset_at_utc(start)]
+
+    # UTC offsets change at most once a day
+    for day_start in range(start, end, day):
+        day_end = day_start + day
+        new_offset = get_offset_at_utc(day_end)
+        old_offset = offsets[-1]
+
+        if new_offset == old_offset:
+            continue
+
+        utc_transition = _find_first_second(
+            day_start,
+            day_end,
+            lambda seconds: get_offset_at_utc(seconds) == new_offset,
+        )
+        wall_transition = _find_first_second(
+            utc_transition + min(old_offset, new_offset) // _MICROSECONDS_PER_SECOND - 1,
+            utc_transition + max(old_offset, new_offset) // _MICROSECONDS_PER_SECOND + 1,
+            lambda seconds: get_offset_at_wall(seconds) == new_offset,
+        )
+
+        utc_transitions.append(utc_transition * _MICROSECONDS_PER_SECOND)
+        wall_transitions.append(wall_transition * _MICROSECONDS_PER_SECOND)
+        offsets.append(new_offset)
+
+    return _OffsetTable(
+        utc_transitions=np.array(utc_transitions, dtype=np.int64),
+        wall_transitions=np.array(wall_transitions, dtype=np.int64),
+        offsets=np.array(offsets, dtype=np.int64),
+    )
+
+
+def _find_first_second(
+        lower: int,
+        upper: int,
+        is_after_transition: Callable[[int], bool],
+) -> int:
+    """
+    Binary search for the first second in (lower, upper] for which `is_after_transition` is true.
+    """
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+
+        if is_after_transition(middle):
+            upper = middle
+        else:
+            lower = middle
+
+    return upper
+
+
+def _union(lower: int, upper: int, operands: list[_Intervals]) -> _Intervals:
+    if not operands:
+        return _create_intervals([], [])
+
+    starts = np.maximum(np.concatenate([starts for starts, _ in operands]), lower)
+    ends = np.minimum(np.concatenate([ends for _, ends in operands]), upper)
+
+    is_not_empty = starts < ends
+    starts = starts[is_not_empty]
+    ends = ends[is_not_empty]
+
+    if len(starts) == 0:
+        return starts, ends
+
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    max_ends = np.maximum.accumulate(ends[order])
+
+    # Intervals that overlap or touch the intervals before them are merged
+    is_first_of_group = np.empty(len(starts), dtype=bool)
+    is_first_of_group[0] = True
+    is_first_of_group[1:] = starts[1:] > max_ends[:-1]
+
+    first_indices = np.flatnonzero(is_first_of_group)
+    last_indices = np.append(first_indices[1:] - 1, len(starts) - 1)
+
+    return starts[first_indices], max_ends[last_indices]
+
+
+def _intersection(lower: int, upper: int, operands: list[_Intervals]) -> _Intervals:
+    if not operands:
+        return _create_intervals([lower], [upper]) if lower < upper else _create_intervals([], [])
+
+    normalized_operands = [_union(lower, upper, [operand]) for operand in operands]
+
+    times = np.concatenate([
+        array
+        for starts, ends in normalized_operands
+        for array in (starts, ends)
+    ])
+    changes = np.concatenate([
+        array
+        for starts, ends in normalized_operands
+        for array in (np.ones(len(starts), dtype=np.int64), -np.ones(len(ends), dtype=np.int64))
+    ])
+
+    # Starts are sorted before ends at the same instant
+    order = np.lexsort((-changes, times))
+    times = times[order]
+    active_counts = np.cumsum(changes[order])
+
+    is_section_start = active_counts[:-1] == len(operands)
+    starts = times[:-1][is_section_start]
+    ends = times[1:][is_section_start]
+
+    return _union(lower, upper, [(starts, ends)])
+
+
+def _complement(lower: int, upper: int, intervals: _Intervals) -> _Intervals:
+    starts, ends = _union(lower, upper, [intervals])
+
+    complement_starts = np.concatenate([np.array([lower], dtype=np.int64), ends])
+    complement_ends = np.concatenate([starts, np.array([upper], dtype=np.int64)])
+
+    is_not_empty = complement_starts < complement_ends
+
+    return complement_starts[is_not_empty], complement_ends[is_not_empty]
+
+
+def _convert_time_spans_to_intervals(time_spans: Iterable[Interval]) -> _Intervals:
+    starts: list[int] = []
+    ends: list[int] = []
+
+    for time_span in time_spans:
+        starts.append(to_epoch_microseconds(time_span.start))
+        ends.append(to_epoch_microseconds(time_span.end))
+
+    return _create_intervals(starts, ends)
+
+
+def _create_intervals(starts: list[int], ends: list[int]) -> _Intervals:
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+
+def _get_microseconds(delta: timedelta) -> int:
+    return delta // timedelta(microseconds=1)
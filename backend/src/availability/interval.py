@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import NamedTuple
+
+
+class Interval(NamedTuple):
+    """
+    Half-open interval [start,end) used while evaluating availability conditions.
+
+    Unlike the pydantic `models.TimeSpan`, creating an interval runs no validation,
+    so time spans are only converted to `models.TimeSpan` for responses.
+    """
+    start: datetime
+    end: datetime
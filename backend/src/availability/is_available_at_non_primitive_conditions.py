@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+from dateutil.tz import gettz
+
+from constants import WEEKDAYS
+from models import (
+    AvailabilityConditionTimeSpanDuringDay,
+    AvailabilityConditionWeekdaysSpan,
+    AvailabilityConditionHolidays,
+    AvailabilityConditionTimeSpan,
+)
+
+from .holidays import get_by_region as get_holidays_by_region
+
+
+def time_span(
+        dt: datetime,
+        time_span_condition: AvailabilityConditionTimeSpan,
+) -> bool:
+    tz_obj = gettz(time_span_condition.timezone)
+
+    return (
+        time_span_condition.start.astimezone(tz_obj)
+        <= dt
+        < time_span_condition.end.astimezone(tz_obj)
+    )
+
+
+def time_span_during_day(
+        dt: datetime,
+        time_span_during_day_condition: AvailabilityConditionTimeSpanDuringDay,
+) -> bool:
+    tz_obj = gettz(time_span_during_day_condition.timezone)
+
+    start_time = time_span_during_day_condition.start_time
+    end_time = time_span_during_day_condition.end_time
+    ends_on_next_day = (end_time.hour, end_time.minute) < (start_time.hour, start_time.minute)
+
+    # The time spans are created like `time_spans_from_non_primitive_conditions.time_span_during_day` does
+    # and compared in UTC, so both agree on times skipped or repeated by DST transitions
+    day = dt.astimezone(tz_obj).replace(hour=6, minute=0, second=0, microsecond=0)
+    utc_dt = dt.astimezone(timezone.utc)
+
+    for start_day in (day - timedelta(days=1), day) if ends_on_next_day else (day,):
+        end_day = start_day + timedelta(days=1) if ends_on_next_day else start_day
+
+        start = start_day.replace(hour=start_time.hour, minute=start_time.minute)
+        end = end_day.replace(hour=end_time.hour, minute=end_time.minute)
+
+        if start.astimezone(timezone.utc) <= utc_dt < end.astimezone(timezone.utc):
+            return True
+
+    return False
+
+
+def weekdays(
+        dt: datetime,
+        weekdays_span_condition: AvailabilityConditionWeekdaysSpan,
+) -> bool:
+    weekday_start_index = WEEKDAYS.index(weekdays_span_condition.start_day)
+    weekday_end_index = WEEKDAYS.index(weekdays_span_condition.end_day)
+
+    tz_obj = gettz(weekdays_span_condition.timezone)
+
+    return weekday_start_index <= dt.astimezone(tz_obj).weekday() <= weekday_end_index
+
+
+def holidays(
+        dt: datetime,
+        holiday_span_condition: AvailabilityConditionHolidays,
+) -> bool:
+    for day in get_holidays_by_region(
+            dt,
+            dt,
+            holiday_span_condition.region,
+    ):
+        if _get_day_start(day) <= dt < _get_day_start(day + timedelta(days=1)):
+            return True
+
+    return False
+
+
+def _get_day_start(dt: datetime) -> datetime:
+    return dt.replace(
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
@@ -0,0 +1,141 @@
+"""
+Evaluates the availability conditions of many vets in parallel worker processes.
+
+Conditions are sent to the workers as JSON and compiled once per worker.
+The time spans are sent back as the bytes of int64 arrays of microseconds since the epoch,
+so only the requesting process creates datetimes.
+"""
+import multiprocessing
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+
+import availability
+from models import AvailabilityCondition
+from utils import validate
+
+from .interval import Interval
+
+# Sending a shard to a worker costs about as much as evaluating a few conditions,
+# so fewer conditions are evaluated in the requesting process
+_MIN_CONDITIONS_PER_SHARD = 8
+
+# Starts and ends of the time spans as bytes of int64 arrays
+_SerializedTimeSpans = tuple[bytes, bytes]
+
+
+class ProcessPool:
+    """
+    Pool of worker processes evaluating availability conditions.
+
+    The workers are started when the pool is created.
+    Importing `availability` in a worker loads the holiday cache, so no request pays for it.
+    """
+
+    _executor: ProcessPoolExecutor
+    _max_workers: int
+
+    def __init__(self, max_workers: int) -> None:
+        if max_workers < 1:
+            raise ValueError(f"'max_workers' must be greater than 0, not {max_workers}")
+
+        self._max_workers = max_workers
+        # Forking a process with running threads (e.g. of the MongoDB client) is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+        wait([self._executor.submit(_warm_up) for _ in range(max_workers)])
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def get_time_spans(
+            self,
+            lower_bound: datetime,
+            upper_bound: datetime,
+            availability_conditions: Sequence[AvailabilityCondition],
+    ) -> list[list[Interval]]:
+        """
+        Returns the time spans of each condition like `availability.get_time_spans`,
+        in the order of the conditions.
+        """
+        validate.datetime_is_timezone_aware(lower_bound)
+        validate.datetime_is_timezone_aware(upper_bound)
+
+        condition_jsons = [condition.json() for condition in availability_conditions]
+        # Vets sharing a condition (e.g. the same opening hours) only need one evaluation
+        condition_json_to_condition = dict(zip(condition_jsons, availability_conditions))
+        unique_condition_jsons = list(condition_json_to_condition)
+
+        shard_count = min(self._max_workers, len(unique_condition_jsons) // _MIN_CONDITIONS_PER_SHARD)
+
+        if shard_count <= 1:
+            # Creating datetimes from instants is slower than evaluating the conditions with datetimes
+            condition_json_to_time_spans = {
+                condition_json: list(availability.get_time_spans(lower_bound, upper_bound, condition))
+                for condition_json, condition in condition_json_to_condition.items()
+            }
+        else:
+            # Conditions of similar size tend to be next to each other,
+            # so distributing them round-robin balances the shards better than slicing
+            shards = [
+                unique_condition_jsons[shard_index::shard_count]
+                for shard_index in range(shard_count)
+            ]
+            futures = [
+                self._executor.submit(_evaluate_shard, lower_bound, upper_bound, shard)
+                for shard in shards
+            ]
+
+            condition_json_to_time_spans = {}
+            for shard, future in zip(shards, futures):
+                condition_json_to_time_spans.update(
+                    (condition_json, _deserialize_time_spans(serialized_time_spans))
+                    for condition_json, serialized_time_spans in zip(shard, future.result())
+                )
+
+        # Vets sharing a condition get their own list, so callers can modify it
+        return [
+            list(condition_json_to_time_spans[condition_json])
+            for condition_json in condition_jsons
+        ]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _evaluate_shard(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition_jsons: list[str],
+) -> list[_SerializedTimeSpans]:
+    result: list[_SerializedTimeSpans] = []
+
+    for condition_json in condition_jsons:
+        starts, ends = availability.get_time_span_instants(lower_bound, upper_bound, condition_json)
+
+        result.append((
+            starts.astype(np.int64, copy=False).tobytes(),
+            ends.astype(np.int64, copy=False).tobytes(),
+        ))
+
+    return result
+
+
+def _deserialize_time_spans(serialized_time_spans: _SerializedTimeSpans) -> list[Interval]:
+    starts_bytes, ends_bytes = serialized_time_spans
+
+    return availability.create_time_spans_from_instants(
+        np.frombuffer(starts_bytes, dtype=np.int64),
+        np.frombuffer(ends_bytes, dtype=np.int64),
+    )
@@ -6,7 +6,6 @@ from dateutil.tz import gettz
 
 from constants import WEEKDAYS
 from models import (
-    TimeSpan,
     AvailabilityConditionTimeSpanDuringDay,
     AvailabilityConditionWeekdaysSpan,
     AvailabilityConditionHolidays,
@@ -14,6 +13,7 @@ from models import (
 )
 
 from .holidays import get_by_region as get_holidays_by_region
+from .interval import Interval
 
 
 _T = TypeVar("_T")
@@ -23,14 +23,17 @@ def time_span(
         lower_bound: datetime,
         upper_bound: datetime,
         time_span: AvailabilityConditionTimeSpan
-) -> Iterable[TimeSpan]:
+) -> Iterable[Interval]:
     tz_obj = gettz(time_span.timezone)
 
-    bounded_start = min(time_span.start.astimezone(tz_obj), lower_bound.astimezone(tz_obj))
-    bounded_end = max(time_span.end.astimezone(tz_obj), upper_bound.astimezone(tz_obj))
+    bounded_start = max(time_span.start.astimezone(tz_obj), lower_bound.astimezone(tz_obj))
+    bounded_end = min(time_span.end.astimezone(tz_obj), upper_bound.astimezone(tz_obj))
+
+    if bounded_start >= bounded_end:
+        return []
 
     return [
-        TimeSpan(
+        Interval(
             start=bounded_start,
             end=bounded_end,
         )
@@ -41,22 +44,32 @@ def time_span_during_day(
         lower_bound: datetime,
         upper_bound: datetime,
         time_span_during_day_condition: AvailabilityConditionTimeSpanDuringDay,
-) -> Iterable[TimeSpan]:
+) -> Iterable[Interval]:
     tz_obj = gettz(time_span_during_day_condition.timezone)
 
+    start_time = time_span_during_day_condition.start_time
+    end_time = time_span_during_day_condition.end_time
+    ends_on_next_day = (end_time.hour, end_time.minute) < (start_time.hour, start_time.minute)
+
     # Not choosing 0 as hour may help with daylight savings bugs
     current_day = _get_start_of_hour_in_day(6, lower_bound.astimezone(tz_obj))
     last_day = _get_start_of_hour_in_day(18, upper_bound.astimezone(tz_obj))
 
+    if ends_on_next_day:
+        # The time span of the previous day may reach into the bounds
+        current_day -= timedelta(days=1)
+
     while current_day < last_day:
-        yield TimeSpan(
+        end_day = current_day + timedelta(days=1) if ends_on_next_day else current_day
+
+        yield Interval(
             start=current_day.replace(
-                hour=time_span_during_day_condition.start_time.hour,
-                minute=time_span_during_day_condition.start_time.minute,
+                hour=start_time.hour,
+                minute=start_time.minute,
             ).astimezone(tz_obj),
-            end=current_day.replace(
-                hour=time_span_during_day_condition.end_time.hour,
-                minute=time_span_during_day_condition.end_time.minute,
+            end=end_day.replace(
+                hour=end_time.hour,
+                minute=end_time.minute,
             ).astimezone(tz_obj)
         )
 
@@ -67,7 +80,7 @@ def weekdays(
         lower_bound: datetime,
         upper_bound: datetime,
         weekdays_span_condition: AvailabilityConditionWeekdaysSpan,
-) -> Iterable[TimeSpan]:
+) -> Iterable[Interval]:
     weekday_start_index = WEEKDAYS.index(weekdays_span_condition.start_day)
     weekday_end_index = WEEKDAYS.index(weekdays_span_condition.end_day)
 
@@ -87,7 +100,7 @@ def weekdays(
                 + timedelta(days=days_until_end_of_span)
             )
 
-            yield TimeSpan(
+            yield Interval(
                 start=start.astimezone(tz_obj),
                 end=end.astimezone(tz_obj),
             )
@@ -103,13 +116,13 @@ def holidays(
         lower_bound: datetime,
         upper_bound: datetime,
         holiday_span_condition: AvailabilityConditionHolidays,
-) -> Iterable[TimeSpan]:
+) -> Iterable[Interval]:
     for day in get_holidays_by_region(
             lower_bound,
             upper_bound,
             holiday_span_condition.region
     ):
-        yield TimeSpan(
+        yield Interval(
             start=day.replace(
                 hour=0,
                 minute=0,
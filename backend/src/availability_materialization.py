@@ -0,0 +1,253 @@
+"""
+Keeps the time spans of verified vets materialized for a rolling horizon (see `db.materialize_availability`),
+so `/vets/` requests within the horizon read stored time spans instead of evaluating availability conditions.
+The conditions of the remaining vets can be evaluated by a pool of worker processes.
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from logging import Logger
+from typing import Iterable
+
+import availability
+import config
+import db
+import db_async
+import logs
+from availability.process_pool import ProcessPool
+from constants import VET_VISIBILITIES
+from models import Vet, AvailabilityCondition
+from types_ import Timezone, VetVisibility, AvailabilityKind
+from utils import cache
+from utils.schedulers import WeeklyScheduler
+
+_TIMEZONE: Timezone = "Europe/Berlin"
+_HOUR = 3
+_MINUTE = 0
+_POLL_WHEN_UNIX_TIMESTAMP_SECONDS_IS_MULTIPLE_OF = 60
+# Every API process runs the scheduler, the lock lets only one of them materialize the availability at a time
+_LOCK_NAME = "materialize_availability"
+# Seconds, longer than materializing the availability of all vets takes
+_LOCK_LEASE = 60 * 60
+
+# Started by the first call of `get_process_pool`, see `shutdown_process_pool`
+_process_pool: ProcessPool | None = None
+# Conditions are evaluated by executor threads, which must not start a pool each
+_process_pool_lock = threading.Lock()
+
+
+def create_scheduler(event_loop: asyncio.AbstractEventLoop) -> WeeklyScheduler:
+    """
+    Creates a scheduler materializing the availability of all verified vets every night.
+    """
+    scheduler = WeeklyScheduler(
+        default_timezone=_TIMEZONE,
+        default_hour=_HOUR,
+        default_minute=_MINUTE,
+        default_weekdays="*",
+        poll_when_unix_timestamp_seconds_is_multiple_of=_POLL_WHEN_UNIX_TIMESTAMP_SECONDS_IS_MULTIPLE_OF,
+        event_loop=event_loop,
+    )
+
+    scheduler.schedule(
+        lambda: materialize_all_in_background(event_loop),
+        name="materialize_availability",
+    )
+
+    return scheduler
+
+
+def materialize_all_in_background(event_loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Runs `materialize_all_if_not_materialized` without blocking the event loop, e.g. once the API started.
+    """
+    future = event_loop.run_in_executor(None, materialize_all_if_not_materialized)
+    future.add_done_callback(_log_result)
+
+
+def materialize_all_if_not_materialized(now: datetime | None = None) -> bool:
+    """
+    Materializes the availability of all verified vets, unless another process is materializing it
+    or it was already materialized for the horizon starting today, e.g. by another process.
+
+    Returns whether the availability was materialized.
+    """
+    lock = db.acquire_lock(_LOCK_NAME, _LOCK_LEASE)
+
+    if lock is None:
+        return False
+
+    try:
+        if is_materialized_for_all(now):
+            return False
+
+        materialize_all(now)
+
+        return True
+    finally:
+        db.release_lock(lock)
+
+
+def is_materialized_for_all(now: datetime | None = None) -> bool:
+    """
+    Returns whether the availability of all verified vets is materialized
+    for the horizon `db.materialize_availability` would store at `now`.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    # The stored horizon starts at midnight, so it ends up to a day earlier than it would starting now
+    end = now + db.AVAILABILITY_MATERIALIZATION_HORIZON - timedelta(days=1)
+
+    return all(
+        db.availability_is_materialized_for_all_verified_vets(visibility, now, end)
+        for visibility in VET_VISIBILITIES
+    )
+
+
+def materialize_all(now: datetime | None = None) -> None:
+    for visibility in VET_VISIBILITIES:
+        materialize(visibility, now)
+
+
+def materialize(
+        visibility: VetVisibility,
+        now: datetime | None = None,
+) -> int:
+    """
+    Materializes the availability of all verified vets of the visibility.
+
+    Returns the number of vets whose availability was materialized.
+    """
+    return sum(
+        db.materialize_availability(visibility, vet, now)
+        for vet in list(db.get_all_verified_vets(visibility))
+    )
+
+
+async def get_time_spans_by_vet_id(
+        visibility: VetVisibility,
+        vets: Iterable[Vet],
+        lower_bound: datetime,
+        upper_bound: datetime,
+) -> dict[str, dict[AvailabilityKind, list[availability.Interval]]]:
+    """
+    Returns the time spans of the vets in [lower_bound,upper_bound) by vet id and kind,
+    just like `availability.get_time_spans` would.
+
+    Materialized time spans are used for vets whose horizon covers the bounds,
+    the conditions of all other vets are evaluated.
+    Kinds whose condition is None are left out.
+    """
+    vets = list(vets)
+
+    materialized_availabilities = await db_async.get_materialized_availabilities(
+        visibility,
+        (vet.id for vet in vets),
+        lower_bound,
+        upper_bound,
+    )
+
+    # Trimming and evaluating time spans must not block the event loop
+    return await asyncio.get_running_loop().run_in_executor(
+        None,
+        _get_time_spans_by_vet_id,
+        vets,
+        lower_bound,
+        upper_bound,
+        materialized_availabilities,
+    )
+
+
+def _get_time_spans_by_vet_id(
+        vets: list[Vet],
+        lower_bound: datetime,
+        upper_bound: datetime,
+        materialized_availabilities: dict[str, dict[AvailabilityKind, list[availability.Interval]]],
+) -> dict[str, dict[AvailabilityKind, list[availability.Interval]]]:
+    result: dict[str, dict[AvailabilityKind, list[availability.Interval]]] = {}
+    conditions_to_evaluate: list[tuple[str, AvailabilityKind, AvailabilityCondition]] = []
+
+    for vet in vets:
+        kind_to_condition = availability.get_conditions_by_kind(vet)
+
+        if (kind_to_time_spans := materialized_availabilities.get(vet.id)) is not None:
+            result[vet.id] = {
+                kind: list(availability.trim_time_spans(
+                    lower_bound,
+                    upper_bound,
+                    kind_to_time_spans[kind],
+                ))
+                for kind in kind_to_condition
+            }
+        else:
+            result[vet.id] = {}
+            conditions_to_evaluate += [
+                (vet.id, kind, condition)
+                for kind, condition in kind_to_condition.items()
+            ]
+
+    if (process_pool := get_process_pool()) is not None:
+        evaluated_time_spans = process_pool.get_time_spans(
+            lower_bound,
+            upper_bound,
+            [condition for _, _, condition in conditions_to_evaluate],
+        )
+    else:
+        evaluated_time_spans = [
+            list(availability.get_time_spans(lower_bound, upper_bound, condition))
+            for _, _, condition in conditions_to_evaluate
+        ]
+
+    for (vet_id, kind, _), time_spans in zip(conditions_to_evaluate, evaluated_time_spans):
+        result[vet_id][kind] = time_spans
+
+    return result
+
+
+def get_process_pool() -> ProcessPool | None:
+    """
+    Returns the pool evaluating the conditions of vets without materialized availability,
+    or None if conditions are evaluated in the calling thread, see `config.AvailabilityConfig`.
+    """
+    global _process_pool
+
+    process_pool_size = config.get().availability.process_pool_size
+
+    if process_pool_size == 0:
+        return None
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPool(process_pool_size)
+
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """
+    Shuts down the pool of `get_process_pool` if it was started, waiting for its worker processes to exit.
+    A later call of `get_process_pool` starts a new pool.
+    """
+    global _process_pool
+
+    with _process_pool_lock:
+        process_pool = _process_pool
+        _process_pool = None
+
+    if process_pool is not None:
+        process_pool.shutdown()
+
+
+def _log_result(future: asyncio.Future[bool]) -> None:
+    if (err := future.exception()) is not None:
+        _get_logger().error("Materializing availability failed", exc_info=err)
+    elif future.result():
+        _get_logger().info("Materialized availability")
+    else:
+        _get_logger().info("Skipped materializing availability, it is materialized or being materialized")
+
+
+@cache.return_singleton
+def _get_logger() -> Logger:
+    return logs.create_logger("availability_materialization")
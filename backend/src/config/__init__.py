@@ -1,3 +1,6 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
 from dotenv import dotenv_values
 
 import env
@@ -29,11 +32,32 @@ def get() -> Config:
             email=_get_email_config(env_context),
             form=_get_form_config(env_context),
             content_management=_get_content_management_config(env_context),
+            availability=_get_availability_config(env_context),
+            vets_response_cache=_get_vets_response_cache_config(env_context),
+            geocode_cache=_get_geocode_cache_config(env_context),
+            vet_submission_queue=_get_vet_submission_queue_config(env_context),
         )
 
     return _cached_config
 
 
+@contextmanager
+def use_temp_config(temp_config: Config) -> Iterator[None]:
+    """
+    Makes `get` return the config until the `with` block is left, e.g. to test other configurations.
+    """
+    global _cached_config
+
+    old_config = _cached_config
+
+    _cached_config = temp_config
+
+    try:
+        yield
+    finally:
+        _cached_config = old_config
+
+
 def reset_cache() -> None:
     global _cached_config
     global _cached_dotenv_vars
@@ -62,7 +86,43 @@ def _get_db_config(env_context: env.Context) -> DbConfig:
         connection_ping_timeout=float(_get_mongo_dotenv_var_value(
             "CONNECTION_PING_TIMEOUT",
             context=env_context,
-        ))
+        )),
+        use_in_memory_spatial_index=_parse_bool(_get_mongo_dotenv_var_value(
+            "USE_IN_MEMORY_SPATIAL_INDEX",
+            context=env_context,
+        )),
+        in_memory_spatial_index_max_age=float(_get_mongo_dotenv_var_value(
+            "IN_MEMORY_SPATIAL_INDEX_MAX_AGE",
+            context=env_context,
+        )),
+        use_single_vet_collection=_parse_bool(_get_mongo_dotenv_var_value(
+            "USE_SINGLE_VET_COLLECTION",
+            context=env_context,
+        )),
+        max_pool_size=int(_get_mongo_dotenv_var_value(
+            "MAX_POOL_SIZE",
+            context=env_context,
+        )),
+        min_pool_size=int(_get_mongo_dotenv_var_value(
+            "MIN_POOL_SIZE",
+            context=env_context,
+        )),
+        max_idle_time=float(_get_mongo_dotenv_var_value(
+            "MAX_IDLE_TIME",
+            context=env_context,
+        )),
+        wait_queue_timeout=float(_get_mongo_dotenv_var_value(
+            "WAIT_QUEUE_TIMEOUT",
+            context=env_context,
+        )),
+        server_selection_timeout=float(_get_mongo_dotenv_var_value(
+            "SERVER_SELECTION_TIMEOUT",
+            context=env_context,
+        )),
+        read_preference=_get_mongo_dotenv_var_value(
+            "READ_PREFERENCE",
+            context=env_context,
+        ),
     )
 
 
@@ -130,6 +190,74 @@ def _get_content_management_config(env_context: env.Context) -> ContentManagemen
     )
 
 
+def _get_availability_config(env_context: env.Context) -> AvailabilityConfig:
+    return AvailabilityConfig(
+        process_pool_size=int(_get_availability_dotenv_var_value(
+            "PROCESS_POOL_SIZE",
+            context=env_context,
+        )),
+    )
+
+
+def _get_vets_response_cache_config(env_context: env.Context) -> VetsResponseCacheConfig:
+    return VetsResponseCacheConfig(
+        max_bytes=int(_get_vets_response_cache_dotenv_var_value(
+            "MAX_BYTES",
+            context=env_context,
+        )),
+        max_age=float(_get_vets_response_cache_dotenv_var_value(
+            "MAX_AGE",
+            context=env_context,
+        )),
+        center_decimals=int(_get_vets_response_cache_dotenv_var_value(
+            "CENTER_DECIMALS",
+            context=env_context,
+        )),
+    )
+
+
+def _get_geocode_cache_config(env_context: env.Context) -> GeocodeCacheConfig:
+    return GeocodeCacheConfig(
+        max_age=float(_get_geocode_cache_dotenv_var_value(
+            "MAX_AGE",
+            context=env_context,
+        )),
+        max_entries=int(_get_geocode_cache_dotenv_var_value(
+            "MAX_ENTRIES",
+            context=env_context,
+        )),
+        coordinate_decimals=int(_get_geocode_cache_dotenv_var_value(
+            "COORDINATE_DECIMALS",
+            context=env_context,
+        )),
+    )
+
+
+def _get_vet_submission_queue_config(env_context: env.Context) -> VetSubmissionQueueConfig:
+    return VetSubmissionQueueConfig(
+        worker_count=int(_get_vet_submission_queue_dotenv_var_value(
+            "WORKER_COUNT",
+            context=env_context,
+        )),
+        poll_interval=float(_get_vet_submission_queue_dotenv_var_value(
+            "POLL_INTERVAL",
+            context=env_context,
+        )),
+        lease=float(_get_vet_submission_queue_dotenv_var_value(
+            "LEASE",
+            context=env_context,
+        )),
+        max_attempts=int(_get_vet_submission_queue_dotenv_var_value(
+            "MAX_ATTEMPTS",
+            context=env_context,
+        )),
+        retention=float(_get_vet_submission_queue_dotenv_var_value(
+            "RETENTION",
+            context=env_context,
+        )),
+    )
+
+
 def _get_mongo_dotenv_var_value(
         name: str,
         *,
@@ -202,6 +330,63 @@ def _get_content_management_dotenv_var_value(
     )
 
 
+def _get_availability_dotenv_var_value(
+        name: str,
+        *,
+        context: env.Context | None = None,
+) -> str:
+    return _get_dotenv_var_value(
+        name,
+        category="AVAILABILITY",
+        context=context
+    )
+
+
+def _get_vets_response_cache_dotenv_var_value(
+        name: str,
+        *,
+        context: env.Context | None = None,
+) -> str:
+    return _get_dotenv_var_value(
+        name,
+        category="VETS_RESPONSE_CACHE",
+        context=context
+    )
+
+
+def _get_geocode_cache_dotenv_var_value(
+        name: str,
+        *,
+        context: env.Context | None = None,
+) -> str:
+    return _get_dotenv_var_value(
+        name,
+        category="GEOCODE_CACHE",
+        context=context
+    )
+
+
+def _get_vet_submission_queue_dotenv_var_value(
+        name: str,
+        *,
+        context: env.Context | None = None,
+) -> str:
+    return _get_dotenv_var_value(
+        name,
+        category="VET_SUBMISSION_QUEUE",
+        context=context
+    )
+
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() == "true":
+        return True
+    if value.lower() == "false":
+        return False
+
+    raise ValueError(f"Expected 'true' or 'false', not '{value}'")
+
+
 def _get_dotenv_var_value(
         name: str,
         *,
@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 
+# See https://www.mongodb.com/docs/manual/core/read-preference/#read-preference-modes
+_READ_PREFERENCES = ["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"]
+
 
 @dataclass(frozen=True)
 class Config:
@@ -11,6 +14,10 @@ class Config:
     email: "EmailConfig"
     form: "FormConfig"
     content_management: "ContentManagementConfig"
+    availability: "AvailabilityConfig"
+    vets_response_cache: "VetsResponseCacheConfig"
+    geocode_cache: "GeocodeCacheConfig"
+    vet_submission_queue: "VetSubmissionQueueConfig"
 
 
 @dataclass(frozen=True)
@@ -20,6 +27,32 @@ class DbConfig:
     root_username: str
     root_password: str
     connection_ping_timeout: float
+    use_in_memory_spatial_index: bool
+    in_memory_spatial_index_max_age: float
+    # Stores all vets in a single collection instead of one collection per visibility and verification status
+    use_single_vet_collection: bool
+    # Connection pool of each MongoDB client (one synchronous and one asynchronous client per process)
+    max_pool_size: int
+    min_pool_size: int
+    # Seconds until idle connections are closed, 0 keeps them open
+    max_idle_time: float
+    # Seconds to wait for a connection when all connections are checked out, 0 waits indefinitely
+    wait_queue_timeout: float
+    server_selection_timeout: float
+    # Reads from secondaries may not see the latest writes yet
+    read_preference: str
+
+    def __post_init__(self) -> None:
+        if self.read_preference not in _READ_PREFERENCES:
+            raise ValueError(
+                f"'read_preference' must be one of {', '.join(_READ_PREFERENCES)}, not '{self.read_preference}'"
+            )
+
+        if not 0 <= self.min_pool_size <= self.max_pool_size:
+            raise ValueError(
+                f"'min_pool_size' must be between 0 and 'max_pool_size'={self.max_pool_size}, "
+                f"not {self.min_pool_size}"
+            )
 
 
 @dataclass(frozen=True)
@@ -57,3 +90,53 @@ class FormConfig:
 @dataclass(frozen=True)
 class ContentManagementConfig:
     email_addresses: list[str]
+
+
+@dataclass(frozen=True)
+class AvailabilityConfig:
+    # Number of worker processes evaluating availability conditions, 0 evaluates in the request thread
+    process_pool_size: int
+
+
+@dataclass(frozen=True)
+class VetsResponseCacheConfig:
+    # Total size of the cached `/vets/` response bodies, 0 disables the cache and the bucketing of requests
+    max_bytes: int
+    # Responses may be stale by this many seconds after vets were changed by another process
+    max_age: float
+    # Requests whose ring centers round to the same coordinates get the same response
+    center_decimals: int
+
+
+@dataclass(frozen=True)
+class GeocodeCacheConfig:
+    # Seconds until an address or coordinates are geocoded again
+    max_age: float
+    # The least recently used results are evicted beyond this number of results
+    max_entries: int
+    # Coordinates are rounded before they are reverse geocoded, so nearby coordinates share a result
+    coordinate_decimals: int
+
+    def __post_init__(self) -> None:
+        if self.max_entries < 1:
+            raise ValueError(f"'max_entries' must be greater than 0, not {self.max_entries}")
+
+
+@dataclass(frozen=True)
+class VetSubmissionQueueConfig:
+    # Workers processing form submissions in each API process, 0 leaves them queued
+    worker_count: int
+    # Seconds between checks for submissions of other processes
+    poll_interval: float
+    # Seconds until a submission whose worker died (e.g. in a restart) is processed again
+    lease: float
+    max_attempts: int
+    # Seconds finished submissions can be polled for
+    retention: float
+
+    def __post_init__(self) -> None:
+        if self.worker_count < 0:
+            raise ValueError(f"'worker_count' must not be negative, not {self.worker_count}")
+
+        if self.max_attempts < 1:
+            raise ValueError(f"'max_attempts' must be greater than 0, not {self.max_attempts}")
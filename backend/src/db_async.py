@@ -0,0 +1,348 @@
+"""
+Async counterparts of the read functions of `db` using the Motor driver,
+so request handlers wait for MongoDB on the event loop instead of occupying a thread.
+
+Queries, pipelines and conversions of documents are shared with `db` through `db_queries`.
+`db` prepares the collections and owns all writes
+(writing a vet also materializes its availability and updates the in-memory spatial index).
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Literal, Mapping
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+import config
+import db
+import db_queries
+from constants import VET_VISIBILITIES, VET_VERIFICATION_STATUSES
+from db import VetDoesNotExist
+from db_queries import AvailabilityWindow, RingPosition, VetWithDistance
+from models import Vet
+from types_ import VetVisibility, VetVerificationStatus, AvailabilityKind
+from utils import asyncio_, cache
+from utils.mongo_pool_metrics import PoolMetrics, PoolMetricsListener
+import availability
+
+_pool_metrics_listener = PoolMetricsListener()
+
+
+def get_pool_metrics() -> PoolMetrics:
+    """
+    See `db.get_pool_metrics`.
+    """
+    return _pool_metrics_listener.get_metrics()
+
+
+async def get_all_verified_vets(
+        visibility: VetVisibility,
+        *,
+        available_during: AvailabilityWindow | None = None,
+) -> AsyncIterator[Vet]:
+    """
+    See `db.get_all_verified_vets`.
+    """
+    collection = _get_vet_collection(visibility, "verified")
+
+    query = {}
+    if available_during is not None:
+        query[db_queries.AVAILABILITY_MATERIALIZATION_ID_FIELD_NAME] = {
+            "$in": await _get_materialization_ids_available_during(visibility, available_during),
+        }
+
+    async for vet_document in collection.find(
+            db_queries.create_vet_query(visibility, "verified", query),
+            projection=db_queries.create_vet_projection(),
+    ):
+        yield db_queries.convert_vet_mongo_document_to_model(vet_document)
+
+
+async def get_verified_vets_in_ring_by_distance(
+        visibility: VetVisibility,
+        c_lat: float,
+        c_lon: float,
+        r_inner: float,
+        r_outer: float,
+        *,
+        limit: int | None = None,
+        after: RingPosition | None = None,
+        available_during: AvailabilityWindow | None = None,
+) -> list[VetWithDistance]:
+    """
+    See `db.get_verified_vets_in_ring_by_distance`.
+    """
+    if config.get().db.use_in_memory_spatial_index:
+        # Querying the index is cheap, but it is rebuilt synchronously once it is too old
+        return await asyncio_.run_in_executor(
+            db.get_verified_vets_in_ring_by_distance,
+            visibility,
+            c_lat,
+            c_lon,
+            r_inner,
+            r_outer,
+            limit=limit,
+            after=after,
+            available_during=available_during,
+        )
+
+    if available_during is not None:
+        pipeline = db_queries.create_ring_available_during_pipeline(
+            visibility,
+            c_lat,
+            c_lon,
+            r_inner,
+            r_outer,
+            available_during,
+            limit=limit,
+            after=after,
+        )
+        vet_documents = await _get_availability_spans_collection(visibility).aggregate(pipeline).to_list(None)
+
+        return db_queries.create_vets_with_distance_page(vet_documents, limit)
+
+    collection = _get_vet_collection(visibility, "verified")
+
+    # One extra document tells us whether the page ends within a group of vets with the same distance
+    vet_documents = await _aggregate_vet_documents_in_ring(
+        visibility,
+        collection,
+        c_lat,
+        c_lon,
+        r_inner,
+        r_outer,
+        limit=None if limit is None else limit + 1,
+        after=after,
+    )
+
+    if (cut_distance := db_queries.get_distance_of_group_cut_by_limit(vet_documents, limit)) is not None:
+        # Vets sharing a distance are returned by MongoDB in no particular order,
+        # so we need the whole group to order it by id
+        vet_documents = [
+            vet_document
+            for vet_document in vet_documents
+            if vet_document[db_queries.DISTANCE_FIELD_NAME] < cut_distance
+        ] + await _aggregate_vet_documents_in_ring(
+            visibility,
+            collection,
+            c_lat,
+            c_lon,
+            cut_distance,
+            cut_distance,
+            after=after,
+        )
+
+    return db_queries.create_vets_with_distance_page(vet_documents, limit)
+
+
+async def iter_verified_vets_in_ring_by_distance(
+        visibility: VetVisibility,
+        c_lat: float,
+        c_lon: float,
+        r_inner: float,
+        r_outer: float,
+        *,
+        batch_size: int = 20,
+) -> AsyncIterator[VetWithDistance]:
+    """
+    See `db.iter_verified_vets_in_ring_by_distance`.
+    Closing the iterator (e.g. with `contextlib.aclosing`) closes the database cursor.
+    """
+    if config.get().db.use_in_memory_spatial_index:
+        vets_with_distance = await asyncio_.run_in_executor(
+            db.get_verified_vets_in_ring_by_distance,
+            visibility,
+            c_lat,
+            c_lon,
+            r_inner,
+            r_outer,
+        )
+
+        for vet_with_distance in vets_with_distance:
+            yield vet_with_distance
+
+        return
+
+    collection = _get_vet_collection(visibility, "verified")
+
+    vet_documents = collection.aggregate(
+        db_queries.create_ring_pipeline(
+            c_lat,
+            c_lon,
+            r_inner,
+            r_outer,
+            query=db_queries.create_vet_query(visibility, "verified"),
+        ) + [{"$project": db_queries.create_vet_projection()}],
+        batchSize=batch_size,
+    )
+
+    try:
+        async for vet_document in vet_documents:
+            yield VetWithDistance(
+                vet=db_queries.convert_vet_mongo_document_to_model(vet_document),
+                distance=vet_document[db_queries.DISTANCE_FIELD_NAME],
+            )
+    finally:
+        await vet_documents.close()
+
+
+async def availability_is_materialized_for_all_verified_vets(
+        visibility: VetVisibility,
+        start: datetime,
+        end: datetime,
+) -> bool:
+    """
+    See `db.availability_is_materialized_for_all_verified_vets`.
+    """
+    collection = _get_vet_collection(visibility, "verified")
+
+    vet_document_not_covering = await collection.find_one(
+        db_queries.create_vet_query(
+            visibility,
+            "verified",
+            db_queries.create_availability_not_materialized_query(start, end),
+        ),
+        projection={"_id": True},
+    )
+
+    return vet_document_not_covering is None
+
+
+async def get_materialized_availabilities(
+        visibility: VetVisibility,
+        vet_ids: Iterable[str],
+        lower_bound: datetime,
+        upper_bound: datetime,
+) -> dict[str, dict[AvailabilityKind, list[availability.Interval]]]:
+    """
+    See `db.get_materialized_availabilities`.
+    """
+    vet_collection = _get_vet_collection(visibility, "verified")
+
+    materialization_id_to_vet_id = {
+        document[db_queries.AVAILABILITY_MATERIALIZATION_ID_FIELD_NAME]: document["_id"]
+        async for document in vet_collection.find(
+            db_queries.create_vet_query(
+                visibility,
+                "verified",
+                db_queries.create_availability_materialized_query(vet_ids, lower_bound, upper_bound),
+            ),
+            projection={db_queries.AVAILABILITY_MATERIALIZATION_ID_FIELD_NAME: True},
+        )
+    }
+
+    result = db_queries.create_empty_materialized_availabilities(materialization_id_to_vet_id.values())
+
+    if not result:
+        return result
+
+    span_documents = _get_availability_spans_collection(visibility).find(
+        db_queries.create_materialized_spans_query(materialization_id_to_vet_id, lower_bound, upper_bound),
+        sort=db_queries.MATERIALIZED_SPANS_SORT,
+    )
+
+    async for span_document in span_documents:
+        db_queries.add_span_document_to_materialized_availabilities(result, span_document)
+
+    return result
+
+
+async def get_vet_by_id(
+        visibility: VetVisibility,
+        id_: str,
+) -> Vet:
+    for collection_name, query in db_queries.get_vet_collection_names_and_queries_of_visibility(visibility):
+        collection = _get_db()[collection_name]
+
+        if (document := await collection.find_one(query | {"_id": id_})) is not None:
+            return db_queries.convert_vet_mongo_document_to_model(document)
+
+    raise VetDoesNotExist(f"id={id_}")
+
+
+async def vet_collections_are_empty(
+        visibility: VetVisibility | Literal["all"] = "all",
+        verification_status: VetVerificationStatus | Literal["all"] = "all",
+) -> bool:
+    visibilities = (
+        VET_VISIBILITIES
+        if visibility == "all"
+        else [visibility]
+    )
+    verification_statuses = (
+        VET_VERIFICATION_STATUSES
+        if verification_status == "all"
+        else [verification_status]
+    )
+
+    for visibility in visibilities:
+        for verification_status in verification_statuses:
+            collection = _get_vet_collection(visibility, verification_status)
+
+            if await collection.count_documents(db_queries.create_vet_query(visibility, verification_status)) > 0:
+                return False
+
+    return True
+
+
+async def _aggregate_vet_documents_in_ring(
+        visibility: VetVisibility,
+        collection: AsyncIOMotorCollection,
+        c_lat: float,
+        c_lon: float,
+        r_inner: float,
+        r_outer: float,
+        *,
+        limit: int | None = None,
+        after: RingPosition | None = None,
+) -> list[dict]:
+    pipeline = db_queries.create_ring_page_pipeline(
+        visibility,
+        c_lat,
+        c_lon,
+        r_inner,
+        r_outer,
+        limit=limit,
+        after=after,
+    )
+
+    return await collection.aggregate(pipeline).to_list(None)
+
+
+async def _get_materialization_ids_available_during(
+        visibility: VetVisibility,
+        available_during: AvailabilityWindow,
+) -> list[str]:
+    return await _get_availability_spans_collection(visibility).distinct(
+        "materialization_id",
+        db_queries.create_availability_window_query(available_during),
+    )
+
+
+
+def _get_vet_collection(
+        visibility: VetVisibility,
+        verification_status: VetVerificationStatus,
+) -> AsyncIOMotorCollection:
+    return _get_db()[db_queries.get_vet_collection_name(visibility, verification_status)]
+
+
+def _get_availability_spans_collection(visibility: VetVisibility) -> AsyncIOMotorCollection:
+    return _get_db()[db_queries.get_availability_spans_collection_name(visibility)]
+
+
+@cache.return_singleton(populate_cache_on="first_called")
+def _get_db() -> AsyncIOMotorDatabase[Mapping[str, Any]]:
+    client = _create_mongo_client()
+
+    return client["db"]
+
+
+def _create_mongo_client() -> AsyncIOMotorClient:
+    # `db` tests the connection when it is imported, so the connection string is known to work.
+    # Motor attaches to the running event loop on first use, so the client can be created without one.
+    return AsyncIOMotorClient(
+        db_queries.get_connection_string(),
+        event_listeners=[_pool_metrics_listener],
+        **db_queries.get_mongo_client_options(),
+    )
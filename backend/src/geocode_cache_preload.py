@@ -0,0 +1,72 @@
+"""
+Preloads the geocode cache of `normalization.vet` from a JSON Lines file,
+e.g. with results geocoded in advance, so normalizing many vets does not wait for the rate limit of the geocoder.
+
+./bin/mongo-preload-geocode-cache.sh <context> <file>
+
+Each line contains the raw result of Nominatim as `location` (null if nothing was found)
+and either the `address` (with the fields of `models.Address`) or the `lat` and `lon` that were geocoded, e.g.
+{"address": {"street": "Alexanderplatz", "number": "1", "zipCode": 10178, "city": "Berlin"}, "location": {...}}
+{"lat": 52.52, "lon": 13.41, "location": {...}}
+"""
+import json
+import sys
+from typing import Any
+
+import db
+import normalization.vet
+from models import Address
+
+_BATCH_SIZE = 500
+
+
+def main(file_path: str) -> int:
+    batch: list[db.GeocodeCacheEntry] = []
+    preloaded_count = 0
+    failed_count = 0
+
+    with open(file_path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                batch.append(_convert_record_to_entry(json.loads(line)))
+            except (ValueError, KeyError, TypeError) as err:
+                print(f"Line {line_number}: {err!r}", file=sys.stderr)
+                failed_count += 1
+
+            if len(batch) == _BATCH_SIZE:
+                db.store_geocode_cache_entries(batch)
+                preloaded_count += len(batch)
+                batch = []
+
+    db.store_geocode_cache_entries(batch)
+    preloaded_count += len(batch)
+
+    print(f"Preloaded {preloaded_count} geocoding results, {failed_count} failed", file=sys.stderr)
+
+    return 0 if failed_count == 0 else 1
+
+
+def _convert_record_to_entry(record: dict[str, Any]) -> db.GeocodeCacheEntry:
+    raw_location = record["location"]
+
+    if raw_location is not None:
+        # Cached locations are created from these fields
+        float(raw_location["lat"])
+        float(raw_location["lon"])
+
+    if "address" in record:
+        key = normalization.vet.create_address_geocode_cache_key(Address.parse_obj(record["address"]))
+    else:
+        key = normalization.vet.create_lat_lon_geocode_cache_key(float(record["lat"]), float(record["lon"]))
+
+    return db.GeocodeCacheEntry(key=key, raw_location=raw_location)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(f"Usage: {sys.argv[0]} <file>")
+
+    sys.exit(main(sys.argv[1]))
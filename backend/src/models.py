@@ -9,10 +9,10 @@ from pydantic.config import BaseConfig
 from pydantic.main import BaseModel
 from typing_extensions import Annotated
 
-from pydantic import Field as PydanticField
+from pydantic import Field as PydanticField, PrivateAttr
 
 from utils import string_
-from types_ import Timezone, Region, Weekday
+from types_ import Timezone, Region, Weekday, VetSubmissionStatus, AvailabilityKind
 
 _T = TypeVar("_T")
 
@@ -276,9 +276,29 @@ class VetCreateOrOverwrite(ApiBaseModel):
 class Vet(VetCreateOrOverwrite):
     id: str
 
+    # Hashes of the availability conditions stored with the vet, see `db.get_availability_condition_hash`
+    _availability_condition_hashes: dict[AvailabilityKind, bytes] = PrivateAttr(default_factory=dict)
+
 
 class VetResponse(Vet):
+    distance: float | None = None  # In km from the ring center, if a ring was queried
     availability: list[TimeSpan] | None = None
     emergency_availability: list[TimeSpan] | None = None
     availability_during_week: TimesDuringWeek24HourClock | None = None
     emergency_availability_during_week: TimesDuringWeek24HourClock | None = None
+
+
+class VetSubmissionError(ApiBaseModel):
+    loc: list[str]
+    msg: str
+    type: str
+
+
+class VetSubmission(ApiBaseModel):
+    id: str
+    vet_id: str
+    status: VetSubmissionStatus
+    # Like the details of a 422 response of `PUT /form/create-or-overwrite-vet`, if the submission failed
+    errors: list[VetSubmissionError] | None = None
+    created_at: datetime
+    updated_at: datetime
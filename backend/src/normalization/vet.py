@@ -1,17 +1,18 @@
-from datetime import datetime, timedelta
-from functools import lru_cache
+from collections.abc import Callable
 from pathlib import Path
-from time import sleep
 
 import geopy
 
 import availability
+import config
+import db
 from models import Location, Address, VetCreateOrOverwrite
 from utils import cache
+from utils.rate_limit import FileTokenBucket, RateLimiterMetrics
 from ._errors import NormalizationError
 
 _NOMINATIM_GEOLOCATOR_USER_AGENT = "hwr_tierarzt_notdienst"
-_GEOPY_LAST_REQUEST_DATETIME_FILE_NAME = "geopy_last_request_datetime.txt"
+_GEOPY_RATE_LIMIT_STATE_FILE_NAME = "geopy_rate_limit_state"
 _GEOPY_REQUEST_RATELIMIT_IN_SECONDS = 2
 
 
@@ -22,6 +23,30 @@ def normalize(vet: VetCreateOrOverwrite) -> VetCreateOrOverwrite:
     return vet
 
 
+def get_geocoder_rate_limiter_metrics() -> RateLimiterMetrics:
+    return _geopy_rate_limiter().get_metrics()
+
+
+def create_lat_lon_geocode_cache_key(lat: float, lon: float) -> str:
+    """
+    Returns the key of the reverse geocoded coordinates in `db.get_geocode_cache_entry`.
+    """
+    lat, lon = _round_coordinates(lat, lon)
+
+    return f"lat_lon:{lat!r},{lon!r}"
+
+
+def create_address_geocode_cache_key(address: Address) -> str:
+    """
+    Returns the key of the geocoded address in `db.get_geocode_cache_entry`.
+    Addresses only differing in case and whitespace share a key.
+    """
+    street = _normalize_address_part(f"{address.number or ''} {address.street}")
+    city = _normalize_address_part(address.city)
+
+    return f"address:{street}|{address.zip_code}|{city}"
+
+
 def _normalize_availability(vet: VetCreateOrOverwrite) -> VetCreateOrOverwrite:
     vet = vet.copy()
 
@@ -91,35 +116,79 @@ def _normalize_location(vet: VetCreateOrOverwrite) -> VetCreateOrOverwrite:
     )
 
 
-@lru_cache(maxsize=1000)
 def _get_geopy_location_from_lat_lon(
         lat: float,
         lon: float
-) -> geopy.Location:
-    _satisfy_geopy_request_ratelimit()
+) -> geopy.Location | None:
+    lat, lon = _round_coordinates(lat, lon)
 
-    return _geopy_geolocator().reverse((lat, lon), addressdetails=True)
+    return _get_geopy_location_using_cache(
+        create_lat_lon_geocode_cache_key(lat, lon),
+        lambda: _geopy_geolocator().reverse((lat, lon), addressdetails=True),
+    )
 
 
-@lru_cache(maxsize=1000)
-def _get_geopy_location_from_address(address: Address) -> geopy.Location:
+def _get_geopy_location_from_address(address: Address) -> geopy.Location | None:
+    def geocode() -> geopy.Location | None:
+        try:
+            # See https://nominatim.org/release-docs/develop/api/Search/
+            return _geopy_geolocator().geocode(
+                {
+                    "street": f"{address.number} {address.street}".strip(),
+                    "postalcode": str(address.zip_code),
+                    "city": address.city,
+                },
+                addressdetails=True
+            )
+        except AttributeError as err:
+            raise NormalizationError(
+                f"Could not normalize {address=}",
+                "location.address"
+            ) from err
+
+    return _get_geopy_location_using_cache(create_address_geocode_cache_key(address), geocode)
+
+
+def _get_geopy_location_using_cache(
+        key: str,
+        geocode: Callable[[], geopy.Location | None],
+) -> geopy.Location | None:
+    if (entry := db.get_geocode_cache_entry(key)) is not None:
+        return _create_geopy_location_from_raw(entry.raw_location)
+
     _satisfy_geopy_request_ratelimit()
 
-    try:
-        # See https://nominatim.org/release-docs/develop/api/Search/
-        return _geopy_geolocator().geocode(
-            {
-                "street": f"{address.number} {address.street}".strip(),
-                "postalcode": str(address.zip_code),
-                "city": address.city,
-            },
-            addressdetails=True
-        )
-    except AttributeError as err:
-        raise NormalizationError(
-            f"Could not normalize {address=}",
-            "location.address"
-        ) from err
+    geopy_location = geocode()
+
+    # Addresses that were not found are cached as well, so they do not wait for the rate limit again
+    db.store_geocode_cache_entries([
+        db.GeocodeCacheEntry(key=key, raw_location=None if geopy_location is None else geopy_location.raw),
+    ])
+
+    return geopy_location
+
+
+def _create_geopy_location_from_raw(raw_location: dict | None) -> geopy.Location | None:
+    if raw_location is None:
+        return None
+
+    # Like `geopy.Nominatim` creates locations
+    return geopy.Location(
+        raw_location.get("display_name", ""),
+        (float(raw_location["lat"]), float(raw_location["lon"])),
+        raw_location,
+    )
+
+
+def _round_coordinates(lat: float, lon: float) -> tuple[float, float]:
+    decimals = config.get().geocode_cache.coordinate_decimals
+
+    # Adding 0.0 turns -0.0 into 0.0, so coordinates rounded to 0 from both sides share a key
+    return round(lat, decimals) + 0.0, round(lon, decimals) + 0.0
+
+
+def _normalize_address_part(part: str) -> str:
+    return " ".join(part.split()).casefold()
 
 
 def _normalize_address_from_geopy_location(
@@ -154,53 +223,17 @@ def _geopy_geolocator() -> geopy.Nominatim:
 
 def _satisfy_geopy_request_ratelimit() -> None:
     """
-    Delay the execution of synchronous code to meet the rate limit specified.
-
-    If the period between two calls is below the specified rate limit,
-    we sleep for remaining time.
+    Blocks until the next request is allowed by the rate limit shared with all other processes.
     """
-    _wait_until_next_geopy_request_allowed()
-    _set_geopy_last_request_datetime_to_current()
-
-    # Yes, this is a somewhat crude synchronization primitive,
-    # but it works and is simple.
-
-    return
-
-
-def _set_geopy_last_request_datetime_to_current() -> None:
-    with open(_geopy_last_request_datetime_file_path(), "w") as f:
-        f.write(datetime.now().isoformat())
-
-
-def _wait_until_next_geopy_request_allowed() -> None:
-    with open(_geopy_last_request_datetime_file_path(), "r") as f:
-        last_datetime = datetime.fromisoformat(f.read().strip())
-
-    seconds_since_last_request = (datetime.now() - last_datetime).seconds
-
-    if seconds_since_last_request < _GEOPY_REQUEST_RATELIMIT_IN_SECONDS:
-        seconds_left_to_wait = _GEOPY_REQUEST_RATELIMIT_IN_SECONDS - seconds_since_last_request
-        sleep(seconds_left_to_wait)
-
-    return
+    _geopy_rate_limiter().acquire()
 
 
 @cache.return_singleton
-def _geopy_last_request_datetime_file_path() -> Path:
-    current_dir = Path(__file__).parent.resolve()
-
-    file_path = current_dir / _GEOPY_LAST_REQUEST_DATETIME_FILE_NAME
-
-    # Create file containing initial datetime if it does not exist
-    if not file_path.exists():
-        file_path.touch()
-
-        with open(file_path, "w") as f:
-            initial_datetime = datetime.now() - timedelta(seconds=_GEOPY_REQUEST_RATELIMIT_IN_SECONDS)
-            f.write(initial_datetime.isoformat())
-
-    return file_path
+def _geopy_rate_limiter() -> FileTokenBucket:
+    return FileTokenBucket(
+        Path(__file__).parent.resolve() / _GEOPY_RATE_LIMIT_STATE_FILE_NAME,
+        rate=1 / _GEOPY_REQUEST_RATELIMIT_IN_SECONDS,
+    )
 
 
 cache.prepopulate()
@@ -31,3 +31,13 @@ VetVerificationStatus: TypeAlias = Literal[
     "unverified",
     "verified",
 ]
+VetSubmissionStatus: TypeAlias = Literal[
+    "queued",
+    "processing",
+    "succeeded",
+    "failed",
+]
+AvailabilityKind: TypeAlias = Literal[
+    "availability",
+    "emergency_availability",
+]
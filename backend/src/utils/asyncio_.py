@@ -0,0 +1,18 @@
+import asyncio
+import functools
+from collections.abc import Callable
+from typing import ParamSpec, TypeVar
+
+_T = TypeVar("_T")
+_P = ParamSpec("_P")
+
+
+async def run_in_executor(func: Callable[_P, _T], *args: _P.args, **kwargs: _P.kwargs) -> _T:
+    """
+    Runs blocking or CPU-bound work in the default executor of the running event loop,
+    so it does not block the event loop. Unlike `loop.run_in_executor`, keyword arguments are passed on.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        None,
+        functools.partial(func, *args, **kwargs),
+    )
@@ -1,10 +1,14 @@
-from collections.abc import Callable
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from functools import wraps
-from typing import TypeVar, Protocol, overload, Literal, Any
+from typing import TypeVar, Protocol, overload, Literal, Any, Generic
 
 from .human_readable import human_readable
 
 _T = TypeVar("_T")
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
 
 
 class _CallableWithInvalidateCacheKwargReturningSingleton(Protocol[_T]):
@@ -30,6 +34,8 @@ _VALID_PREPOPULATE_ON_MODES: set[_PrepopulateOnMode] = {
 
 _populate_cache_callbacks: list[Callable[[], Any]] = []
 
+_MISSING = object()
+
 
 def prepopulate() -> None:
     for callback in _populate_cache_callbacks:
@@ -146,3 +152,132 @@ def return_singleton(
     raise ValueError(
         "No positional arguments should be passed to decorator"
     )
+
+
+class LruCache(Generic[_K, _V]):
+    """
+    Thread-safe mapping holding entries with a total size of at most `max_size`.
+
+    Every entry has a size of 1 unless `get_size` is given,
+    e.g. to limit the number of bytes instead of the number of entries.
+    When the cache is full, the least recently used entries are evicted.
+    Values larger than `max_size` are not cached.
+    """
+
+    _max_size: int
+    _get_size: Callable[[_V], int] | None
+    _entries: "OrderedDict[_K, tuple[_V, int]]"
+    _size: int
+    _lock: threading.Lock
+
+    def __init__(self, max_size: int, *, get_size: Callable[[_V], int] | None = None) -> None:
+        if max_size < 1:
+            raise ValueError(f"'max_size' must be greater than 0, not {max_size}")
+
+        self._max_size = max_size
+        self._get_size = get_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: _K) -> bool:
+        return key in self._entries
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        """
+        The total size of the entries, which equals their number unless `get_size` was given.
+        """
+        return self._size
+
+    def get(self, key: _K, default: _V | None = None) -> _V | None:
+        with self._lock:
+            try:
+                value, _ = self._entries[key]
+            except KeyError:
+                return default
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: _K, value: _V) -> None:
+        value_size = 1 if self._get_size is None else self._get_size(value)
+
+        with self._lock:
+            self._remove(key)
+
+            if value_size > self._max_size:
+                return
+
+            self._entries[key] = (value, value_size)
+            self._size += value_size
+
+            while self._size > self._max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def get_or_create(self, key: _K, create: Callable[[], _V]) -> _V:
+        """
+        Returns the cached value or caches and returns the value created by `create`.
+
+        `create` is called without holding the lock,
+        so concurrent misses for the same key may call it more than once.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+                value, _ = self._entries[key]
+
+                return value
+
+        value = create()
+        self.set(key, value)
+
+        return value
+
+    def invalidate(self, key: _K) -> bool:
+        """
+        Removes an entry. Returns False if there was no entry for the key.
+        """
+        with self._lock:
+            return self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[_K], bool]) -> int:
+        """
+        Removes all entries whose key fulfills the predicate. Returns the number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+
+            for key in keys:
+                self._remove(key)
+
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: _K) -> bool:
+        """
+        Must be called while holding `_lock`.
+        """
+        entry = self._entries.pop(key, _MISSING)
+
+        if entry is _MISSING:
+            return False
+
+        _, value_size = entry
+        self._size -= value_size
+
+        return True
@@ -0,0 +1,244 @@
+"""
+Batch distance computations between a single point and many points on earth.
+
+Coordinates are kept in contiguous float64 arrays,
+so that all distances are computed in a single NumPy pass.
+"""
+import math
+from collections.abc import Iterable
+from typing import Literal
+
+import geopy.distance
+import numpy as np
+import numpy.typing as npt
+
+DistanceMode = Literal["spherical", "geodesic"]
+
+# Mean earth radius as defined by the IUGG
+EARTH_RADIUS_IN_KM = 6371.0088
+
+_WGS84_SEMI_MAJOR_AXIS_IN_KM = 6378.137
+_WGS84_FLATTENING = 1 / 298.257223563
+_WGS84_SEMI_MINOR_AXIS_IN_KM = (1 - _WGS84_FLATTENING) * _WGS84_SEMI_MAJOR_AXIS_IN_KM
+
+_VINCENTY_MAX_ITERATIONS = 200
+_VINCENTY_CONVERGENCE_THRESHOLD = 1e-12
+
+_FloatArray = npt.NDArray[np.float64]
+
+
+class Points:
+    """
+    Immutable collection of coordinates in degrees.
+    """
+
+    _lats: _FloatArray
+    _lons: _FloatArray
+
+    def __init__(
+            self,
+            lats: Iterable[float] | _FloatArray,
+            lons: Iterable[float] | _FloatArray,
+    ) -> None:
+        # Copy, so that making the arrays read-only does not affect the caller
+        self._lats = np.array(_as_contiguous_float_array(lats))
+        self._lons = np.array(_as_contiguous_float_array(lons))
+
+        if self._lats.shape != self._lons.shape:
+            raise ValueError(
+                f"Got {len(self._lats)} latitudes but {len(self._lons)} longitudes"
+            )
+
+        self._lats.flags.writeable = False
+        self._lons.flags.writeable = False
+
+    @classmethod
+    def from_lat_lon_pairs(cls, pairs: Iterable[tuple[float, float]]) -> "Points":
+        lat_lon_array = np.array(list(pairs), dtype=np.float64).reshape(-1, 2)
+
+        return cls(lat_lon_array[:, 0], lat_lon_array[:, 1])
+
+    def __len__(self) -> int:
+        return len(self._lats)
+
+    @property
+    def lats(self) -> _FloatArray:
+        return self._lats
+
+    @property
+    def lons(self) -> _FloatArray:
+        return self._lons
+
+    def distances_to(
+            self,
+            lat: float,
+            lon: float,
+            *,
+            mode: DistanceMode = "spherical",
+    ) -> _FloatArray:
+        """
+        Returns the distances in km from (lat, lon) to every point.
+
+        :param mode:
+            `"spherical"` uses the haversine formula on a sphere with the mean earth radius.
+            `"geodesic"` computes the exact distance on the WGS-84 ellipsoid.
+        """
+        return distances(lat, lon, self._lats, self._lons, mode=mode)
+
+
+def distances(
+        lat: float,
+        lon: float,
+        lats: _FloatArray,
+        lons: _FloatArray,
+        *,
+        mode: DistanceMode = "spherical",
+) -> _FloatArray:
+    if mode == "spherical":
+        return haversine_distances(lat, lon, lats, lons)
+    elif mode == "geodesic":
+        return geodesic_distances(lat, lon, lats, lons)
+
+    raise ValueError(f"Invalid distance mode '{mode}'")
+
+
+def haversine_distance(
+        lat1: float,
+        lon1: float,
+        lat2: float,
+        lon2: float,
+        *,
+        earth_radius_in_km: float = EARTH_RADIUS_IN_KM,
+) -> float:
+    """
+    Great-circle distance in km between two points on a sphere.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+
+    return 2 * earth_radius_in_km * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_distances(
+        lat: float,
+        lon: float,
+        lats: _FloatArray,
+        lons: _FloatArray,
+        *,
+        earth_radius_in_km: float = EARTH_RADIUS_IN_KM,
+) -> _FloatArray:
+    """
+    Vectorized version of `haversine_distance`.
+    """
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(lons) - math.radians(lon)
+
+    a = (
+        np.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    )
+
+    return 2 * earth_radius_in_km * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def geodesic_distances(
+        lat: float,
+        lon: float,
+        lats: _FloatArray,
+        lons: _FloatArray,
+) -> _FloatArray:
+    """
+    Distances in km on the WGS-84 ellipsoid.
+
+    Uses a vectorized implementation of Vincenty's inverse formula. For the rare
+    nearly antipodal points where it does not converge,
+    we fall back to the (slower) algorithm by Karney implemented by geopy.
+    """
+    a = _WGS84_SEMI_MAJOR_AXIS_IN_KM
+    b = _WGS84_SEMI_MINOR_AXIS_IN_KM
+    f = _WGS84_FLATTENING
+
+    lats = _as_contiguous_float_array(lats)
+    lons = _as_contiguous_float_array(lons)
+
+    big_l = np.radians(lons) - math.radians(lon)
+
+    u1 = math.atan((1 - f) * math.tan(math.radians(lat)))
+    u2 = np.arctan((1 - f) * np.tan(np.radians(lats)))
+    sin_u1 = math.sin(u1)
+    cos_u1 = math.cos(u1)
+    sin_u2 = np.sin(u2)
+    cos_u2 = np.cos(u2)
+
+    lambda_ = big_l.copy()
+    converged = np.zeros(lats.shape, dtype=bool)
+
+    sin_sigma = cos_sigma = sigma = cos_sq_alpha = cos_2_sigma_m = np.zeros(lats.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(_VINCENTY_MAX_ITERATIONS):
+            sin_lambda = np.sin(lambda_)
+            cos_lambda = np.cos(lambda_)
+
+            sin_sigma = np.sqrt(
+                (cos_u2 * sin_lambda) ** 2
+                + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lambda) ** 2
+            )
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lambda
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+
+            # Coincident points have sin_sigma == 0
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lambda / sin_sigma)
+            cos_sq_alpha = 1 - sin_alpha ** 2
+
+            # Points on the equator have cos_sq_alpha == 0
+            cos_2_sigma_m = np.where(
+                cos_sq_alpha == 0,
+                0.0,
+                cos_sigma - 2 * sin_u1 * sin_u2 / cos_sq_alpha,
+            )
+
+            c = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+
+            previous_lambda = lambda_
+            lambda_ = big_l + (1 - c) * f * sin_alpha * (
+                sigma + c * sin_sigma * (
+                    cos_2_sigma_m + c * cos_sigma * (-1 + 2 * cos_2_sigma_m ** 2)
+                )
+            )
+
+            converged = np.abs(lambda_ - previous_lambda) < _VINCENTY_CONVERGENCE_THRESHOLD
+            if converged.all():
+                break
+
+    u_sq = cos_sq_alpha * (a ** 2 - b ** 2) / b ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (
+        cos_2_sigma_m + big_b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2_sigma_m ** 2)
+            - big_b / 6 * cos_2_sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2_sigma_m ** 2)
+        )
+    )
+
+    result = b * big_a * (sigma - delta_sigma)
+
+    for i in np.flatnonzero(~converged):
+        result[i] = geopy.distance.geodesic((lat, lon), (lats[i], lons[i])).km
+
+    return result
+
+
+def _as_contiguous_float_array(values: Iterable[float] | _FloatArray) -> _FloatArray:
+    if isinstance(values, np.ndarray):
+        return np.ascontiguousarray(values, dtype=np.float64)
+
+    return np.fromiter(values, dtype=np.float64)
@@ -0,0 +1,139 @@
+"""
+Connection pool metrics of a pymongo (or Motor) client, collected by a listener passed to the client
+as one of its `event_listeners`.
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+from pymongo import monitoring
+
+
+@dataclass(frozen=True)
+class PoolMetrics:
+    open_connections: int
+    checked_out_connections: int
+    # The most connections that were checked out at the same time
+    max_checked_out_connections: int
+    check_out_count: int
+    failed_check_out_count: int
+    # Time spent waiting for a connection, including waits for new connections and failed check outs
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        attempt_count = self.check_out_count + self.failed_check_out_count
+
+        return self.total_wait_seconds / attempt_count if attempt_count > 0 else 0.0
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Thread-safe listener counting the connections of all pools of a client.
+
+    pymongo checks out connections in the thread running the operation (Motor in its worker threads),
+    so the wait time is measured from the start of the check out in the same thread.
+    """
+
+    _lock: threading.Lock
+    _check_out_started_at: threading.local
+    _open_connections: int
+    _checked_out_connections: int
+    _max_checked_out_connections: int
+    _check_out_count: int
+    _failed_check_out_count: int
+    _total_wait_seconds: float
+    _max_wait_seconds: float
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._check_out_started_at = threading.local()
+        self._open_connections = 0
+        self._checked_out_connections = 0
+        self.reset()
+
+    def get_metrics(self) -> PoolMetrics:
+        with self._lock:
+            return PoolMetrics(
+                open_connections=self._open_connections,
+                checked_out_connections=self._checked_out_connections,
+                max_checked_out_connections=self._max_checked_out_connections,
+                check_out_count=self._check_out_count,
+                failed_check_out_count=self._failed_check_out_count,
+                total_wait_seconds=self._total_wait_seconds,
+                max_wait_seconds=self._max_wait_seconds,
+            )
+
+    def reset(self) -> None:
+        """
+        Resets the counters, but not the number of open and checked out connections.
+        """
+        with self._lock:
+            self._max_checked_out_connections = self._checked_out_connections
+            self._check_out_count = 0
+            self._failed_check_out_count = 0
+            self._total_wait_seconds = 0.0
+            self._max_wait_seconds = 0.0
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        self._check_out_started_at.value = time.perf_counter()
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        wait_seconds = self._pop_wait_seconds()
+
+        with self._lock:
+            self._checked_out_connections += 1
+            self._max_checked_out_connections = max(
+                self._max_checked_out_connections,
+                self._checked_out_connections,
+            )
+            self._check_out_count += 1
+            self._add_wait_seconds(wait_seconds)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        wait_seconds = self._pop_wait_seconds()
+
+        with self._lock:
+            self._failed_check_out_count += 1
+            self._add_wait_seconds(wait_seconds)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self._checked_out_connections -= 1
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self._open_connections += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self._open_connections -= 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def _pop_wait_seconds(self) -> float:
+        started_at = getattr(self._check_out_started_at, "value", None)
+        self._check_out_started_at.value = None
+
+        return 0.0 if started_at is None else time.perf_counter() - started_at
+
+    def _add_wait_seconds(self, wait_seconds: float) -> None:
+        """
+        Must be called while holding `_lock`.
+        """
+        self._total_wait_seconds += wait_seconds
+        self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
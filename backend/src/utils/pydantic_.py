@@ -0,0 +1,83 @@
+"""
+Creates pydantic models from trusted data without validating it again,
+e.g. from documents that were stored from validated models.
+"""
+from collections.abc import Mapping
+from enum import Enum
+from typing import Any, Literal, TypeVar, get_args, get_origin
+
+from pydantic import BaseModel
+from pydantic.fields import ModelField, SHAPE_DICT, SHAPE_LIST, SHAPE_SINGLETON
+
+_TModel = TypeVar("_TModel", bound=BaseModel)
+
+
+def construct(model_type: type[_TModel], data: Mapping[str, Any]) -> _TModel:
+    """
+    Creates a model like `model_type.construct`, but also creates its nested models,
+    including models in lists, dicts and (discriminated) unions, and converts enum values.
+
+    The data must use field names (not aliases) and be valid,
+    an invalid value silently ends up in the model. Unknown keys are ignored.
+    """
+    fields = model_type.__fields__
+
+    return model_type.construct(**{
+        name: _construct_value(fields[name], value)
+        for name, value in data.items()
+        if name in fields
+    })
+
+
+def _construct_value(field: ModelField, value: Any) -> Any:
+    if value is None:
+        return None
+
+    if field.shape == SHAPE_LIST:
+        return [_construct_value(field.sub_fields[0], item) for item in value]
+
+    if field.shape == SHAPE_DICT:
+        return {
+            _construct_value(field.key_field, key): _construct_value(field.sub_fields[0], item)
+            for key, item in value.items()
+        }
+
+    if field.shape != SHAPE_SINGLETON:
+        raise TypeError(f"Field '{field.name}' has an unsupported shape")
+
+    if field.sub_fields:
+        return _construct_value(_get_union_member_field(field, value), value)
+
+    type_ = field.type_
+
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        return construct(type_, value)
+
+    if isinstance(type_, type) and issubclass(type_, Enum):
+        return type_(value)
+
+    return value
+
+
+def _get_union_member_field(field: ModelField, value: Any) -> ModelField:
+    if field.sub_fields_mapping is not None:
+        return field.sub_fields_mapping[value[field.discriminator_key]]
+
+    # Without a discriminator pydantic validates the members in order and takes the first valid one,
+    # which are told apart by their literal fields in our models
+    for sub_field in field.sub_fields:
+        if _literal_fields_match(sub_field.type_, value):
+            return sub_field
+
+    raise TypeError(f"No member of the union of field '{field.name}' matches the value")
+
+
+def _literal_fields_match(type_: Any, value: Any) -> bool:
+    if not (isinstance(type_, type) and issubclass(type_, BaseModel)):
+        return False
+
+    return all(
+        value.get(name, field.default) in get_args(field.outer_type_)
+        for name, field in type_.__fields__.items()
+        if get_origin(field.outer_type_) is Literal
+    )
@@ -0,0 +1,167 @@
+"""
+Token bucket rate limiting shared by all processes using the same state file.
+
+Callers reserve a token while holding an exclusive `fcntl.flock` on the file and wait for it afterwards,
+so the lock is only held for a few microseconds and waiting callers do not block each other.
+Tokens reserved in advance make the stored number of tokens negative,
+so callers are served in the order of their reservations across all processes.
+"""
+import asyncio
+import fcntl
+import math
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+# Number of tokens and the time of the last reservation (see `time.time`)
+_STATE_FORMAT = struct.Struct("<dd")
+
+
+@dataclass(frozen=True)
+class RateLimiterMetrics:
+    # Reservations of all processes that are not due yet
+    queued_count: int
+    # Callers of this process waiting for their token
+    waiting_count: int
+    acquired_count: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+
+class FileTokenBucket:
+    """
+    Allows `rate` acquisitions per second across processes, up to `capacity` at once after a pause.
+    Thread-safe, every acquisition opens the state file, so flocks exclude threads like processes.
+    """
+
+    _path: Path
+    _rate: float
+    _capacity: float
+    _metrics_lock: threading.Lock
+    _waiting_count: int
+    _acquired_count: int
+    _total_wait_seconds: float
+    _max_wait_seconds: float
+
+    def __init__(
+            self,
+            path: Path,
+            *,
+            rate: float,
+            capacity: float = 1,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"'rate' must be greater than 0, not {rate}")
+        if capacity < 1:
+            raise ValueError(f"'capacity' must be at least 1, not {capacity}")
+
+        self._path = path
+        self._rate = rate
+        self._capacity = capacity
+        self._metrics_lock = threading.Lock()
+        self._waiting_count = 0
+        self._acquired_count = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def acquire(self) -> float:
+        """
+        Blocks until a token is available. Returns the seconds waited.
+        """
+        wait_seconds = self._reserve()
+
+        self._start_waiting(wait_seconds)
+        try:
+            time.sleep(wait_seconds)
+        finally:
+            self._stop_waiting()
+
+        return wait_seconds
+
+    async def acquire_async(self) -> float:
+        """
+        Like `acquire`, but waits without blocking the event loop.
+        """
+        wait_seconds = self._reserve()
+
+        self._start_waiting(wait_seconds)
+        try:
+            await asyncio.sleep(wait_seconds)
+        finally:
+            self._stop_waiting()
+
+        return wait_seconds
+
+    def get_metrics(self) -> RateLimiterMetrics:
+        with _lock_file(self._path) as fd:
+            tokens = self._read_tokens(fd, time.time())
+
+        with self._metrics_lock:
+            return RateLimiterMetrics(
+                queued_count=math.ceil(-tokens) if tokens < 0 else 0,
+                waiting_count=self._waiting_count,
+                acquired_count=self._acquired_count,
+                total_wait_seconds=self._total_wait_seconds,
+                max_wait_seconds=self._max_wait_seconds,
+            )
+
+    def _reserve(self) -> float:
+        """
+        Takes a token, which may not be available yet. Returns the seconds until it is available.
+        """
+        with _lock_file(self._path) as fd:
+            now = time.time()
+            tokens = self._read_tokens(fd, now) - 1
+
+            os.pwrite(fd, _STATE_FORMAT.pack(tokens, now), 0)
+
+        return max(0.0, -tokens / self._rate)
+
+    def _read_tokens(self, fd: int, now: float) -> float:
+        """
+        Returns the tokens available at `now`, negative if tokens were reserved in advance.
+        """
+        state = os.pread(fd, _STATE_FORMAT.size, 0)
+
+        if len(state) < _STATE_FORMAT.size:
+            return self._capacity
+
+        tokens, reserved_at = _STATE_FORMAT.unpack(state)
+
+        if now < reserved_at:
+            # The clock was set back, so the elapsed time is unknown
+            return self._capacity
+
+        return min(self._capacity, tokens + (now - reserved_at) * self._rate)
+
+    def _start_waiting(self, wait_seconds: float) -> None:
+        with self._metrics_lock:
+            self._waiting_count += 1
+            self._acquired_count += 1
+            self._total_wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+
+    def _stop_waiting(self) -> None:
+        with self._metrics_lock:
+            self._waiting_count -= 1
+
+
+@contextmanager
+def _lock_file(path: Path) -> Iterator[int]:
+    """
+    Opens the file, creating it if necessary, and holds an exclusive flock on it until the `with` block is left.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        yield fd
+    finally:
+        # Closing the file releases the lock
+        os.close(fd)
@@ -96,6 +96,10 @@ class Poller(ABC):
         ...
 
 
+def _utcnow() -> datetime:
+    return datetime.now(tz.UTC)
+
+
 class WeeklyScheduler:
     """
 
@@ -124,7 +128,7 @@ class WeeklyScheduler:
             poller: Poller | None = None,
             poll_when_unix_timestamp_seconds_is_multiple_of: int | None = None,
             event_loop: asyncio.AbstractEventLoop | None = None,
-            get_utcnow: Callable[[], datetime] = datetime.utcnow
+            get_utcnow: Callable[[], datetime] = _utcnow
     ) -> None:
         if default_weekday is not None and default_weekdays is not None:
             raise ValueError(
@@ -315,9 +319,10 @@ class WeeklyScheduler:
             )
 
     def _run_tasks(self, pending_tasks: list[PendingTask], dt: datetime) -> Iterable[FinishedTask]:
+        # Polls rarely happen exactly at the target datetime,
+        # so all tasks whose target datetime has passed are run
         for task in pending_tasks:
-            if task.start_target_datetime >= dt:
-                yield self._run_task(task, dt)
+            yield self._run_task(task, dt)
 
     def _run_task(self, pending_task: PendingTask, dt: datetime) -> FinishedTask:
         started_task = StartedTask(
@@ -398,7 +403,7 @@ def _create_async_event_loop_poller_cls(event_loop: asyncio.AbstractEventLoop |
             self._schedule_next_poll()
 
         def _call_callbacks(self) -> None:
-            dt = datetime.utcnow()
+            dt = _utcnow()
 
             for callback in self._callbacks:
                 callback(dt)
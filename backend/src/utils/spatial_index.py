@@ -0,0 +1,210 @@
+import math
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+import numpy as np
+
+from . import geo_distance
+
+_T = TypeVar("_T")
+
+# Geodesic distances on the WGS-84 ellipsoid deviate less than 0.5% from spherical distances.
+# Candidate cells are searched in a slightly larger radius, so no points are missed.
+_GEODESIC_CANDIDATE_RADIUS_FACTOR = 1.01
+
+_Cell = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class _Entry(Generic[_T]):
+    key: str
+    lat: float
+    lon: float
+    value: _T
+
+
+class LatLonGridIndex(Generic[_T]):
+    """
+    In-memory spatial index bucketing points into cells of a regular latitude/longitude grid.
+
+    Ring queries only visit the cells overlapping the bounding box of the outer circle.
+    The distances to all points in these candidate cells are then computed in a single vectorized pass.
+    """
+
+    _cell_size_in_degrees: float
+    _cells: dict[_Cell, dict[str, _Entry[_T]]]
+    _key_to_cell: dict[str, _Cell]
+
+    def __init__(
+            self,
+            *,
+            cell_size_in_degrees: float = 0.25,
+    ) -> None:
+        if not 0 < cell_size_in_degrees <= 180:
+            raise ValueError(
+                f"'cell_size_in_degrees' must be in (0, 180], not {cell_size_in_degrees}"
+            )
+
+        self._cell_size_in_degrees = cell_size_in_degrees
+        self._cells = {}
+        self._key_to_cell = {}
+
+    def __len__(self) -> int:
+        return len(self._key_to_cell)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_to_cell
+
+    def insert(self, key: str, lat: float, lon: float, value: _T) -> None:
+        """
+        Insert a point or replace the point previously inserted with the same key.
+        """
+        self.remove(key)
+
+        cell = self._get_cell(lat, lon)
+
+        self._cells.setdefault(cell, {})[key] = _Entry(
+            key=key,
+            lat=lat,
+            lon=lon,
+            value=value,
+        )
+        self._key_to_cell[key] = cell
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove a point. Returns False if no point was inserted with the key.
+        """
+        if (cell := self._key_to_cell.pop(key, None)) is None:
+            return False
+
+        entries = self._cells[cell]
+        del entries[key]
+
+        if not entries:
+            del self._cells[cell]
+
+        return True
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._key_to_cell.clear()
+
+    def values(self) -> Iterator[_T]:
+        for entries in self._cells.values():
+            for entry in entries.values():
+                yield entry.value
+
+    def query_ring(
+            self,
+            c_lat: float,
+            c_lon: float,
+            r_inner: float,
+            r_outer: float,
+            *,
+            mode: geo_distance.DistanceMode = "spherical",
+    ) -> list[tuple[_T, float]]:
+        """
+        Returns the values with a distance in km between `r_inner` and `r_outer` from the center
+        together with their distance, ordered by increasing distance.
+
+        :param mode: See `geo_distance.Points.distances_to`.
+        """
+        candidate_radius = r_outer if mode == "spherical" else r_outer * _GEODESIC_CANDIDATE_RADIUS_FACTOR
+        candidates = list(self._iter_candidate_entries(c_lat, c_lon, candidate_radius))
+
+        if not candidates:
+            return []
+
+        distances = geo_distance.Points(
+            (entry.lat for entry in candidates),
+            (entry.lon for entry in candidates),
+        ).distances_to(c_lat, c_lon, mode=mode)
+
+        in_ring_indices = np.flatnonzero((r_inner <= distances) & (distances <= r_outer))
+        sorted_in_ring_indices = in_ring_indices[np.argsort(distances[in_ring_indices], kind="stable")]
+
+        return [
+            (candidates[i].value, float(distances[i]))
+            for i in sorted_in_ring_indices
+        ]
+
+    def _iter_candidate_entries(
+            self,
+            c_lat: float,
+            c_lon: float,
+            radius: float,
+    ) -> Iterable[_Entry[_T]]:
+        for cell in self._get_candidate_cells(c_lat, c_lon, radius):
+            yield from self._cells.get(cell, {}).values()
+
+    def _get_candidate_cells(
+            self,
+            c_lat: float,
+            c_lon: float,
+            radius: float,
+    ) -> Iterable[_Cell]:
+        lat_delta = math.degrees(radius / geo_distance.EARTH_RADIUS_IN_KM)
+        min_lat = c_lat - lat_delta
+        max_lat = c_lat + lat_delta
+
+        rows = range(
+            self._get_row(max(min_lat, -90)),
+            self._get_row(min(max_lat, 90)) + 1,
+        )
+
+        columns_count = self._get_columns_count()
+        if min_lat <= -90 or max_lat >= 90:
+            # The circle contains a pole -> all longitudes need to be searched
+            columns = range(columns_count)
+        else:
+            # The circle is widest at the latitude furthest from the equator
+            lon_delta = lat_delta / math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+
+            if 2 * lon_delta + self._cell_size_in_degrees >= 360:
+                columns = range(columns_count)
+            else:
+                min_column = self._get_column(c_lon - lon_delta)
+                max_column = self._get_column(c_lon + lon_delta)
+
+                # Modulo arithmetic handles bounding boxes wrapping around the antimeridian
+                columns = [
+                    (min_column + i) % columns_count
+                    for i in range((max_column - min_column) % columns_count + 1)
+                ]
+
+        if len(rows) * len(columns) > len(self._cells):
+            # Visiting the occupied cells is cheaper than visiting every cell in a large bounding box
+            columns = set(columns)
+
+            return [
+                cell
+                for cell in self._cells
+                if cell[0] in rows and cell[1] in columns
+            ]
+
+        return (
+            (row, column)
+            for row in rows
+            for column in columns
+        )
+
+    def _get_cell(self, lat: float, lon: float) -> _Cell:
+        if not -90 <= lat <= 90:
+            raise ValueError(f"Latitude must be between -90 and 90, not {lat}")
+
+        if not -180 <= lon <= 180:
+            raise ValueError(f"Longitude must be between -180 and 180, not {lon}")
+
+        return self._get_row(lat), self._get_column(lon)
+
+    def _get_row(self, lat: float) -> int:
+        return int((lat + 90) // self._cell_size_in_degrees)
+
+    def _get_column(self, lon: float) -> int:
+        return int(((lon + 180) % 360) // self._cell_size_in_degrees)
+
+    def _get_columns_count(self) -> int:
+        return math.ceil(360 / self._cell_size_in_degrees)
+
@@ -0,0 +1,317 @@
+"""
+Imports vets from JSON Lines or CSV files and exports them as JSON Lines, e.g. to seed or migrate many vets.
+
+./bin/mongo-import-vets.sh <context> <visibility> <file> [--verification-status ...] [--batch-size ...] [--workers ...]
+./bin/mongo-export-vets.sh <context> <visibility> <file> [--verification-status ...] [--batch-size ...]
+
+Each JSON line is a vet with the fields of `models.VetCreateOrOverwrite` and an optional id,
+so exported files can be imported again. Vets without id get a new one.
+The columns of a CSV file are the paths of the fields joined by dots (e.g. `location.address.city`),
+cells of lists and objects (e.g. `contacts`) contain JSON and empty cells are left out.
+
+Unlike vets registered with the form, imported vets are normalized in worker processes,
+written in batches and no emails are sent.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import IO, Any, BinaryIO, ContextManager, TextIO, TypeVar
+
+import db
+import normalization.vet
+from constants import VET_VERIFICATION_STATUSES, VET_VISIBILITIES
+from models import VetCreateOrOverwrite
+from normalization import NormalizationError
+from types_ import VetVerificationStatus, VetVisibility
+from utils import json_
+
+_DEFAULT_BATCH_SIZE = 500
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    imported_count: int
+    failed_count: int
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Imports or exports vets")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Imports vets from a JSON Lines or CSV file")
+    import_parser.add_argument("visibility", choices=sorted(VET_VISIBILITIES))
+    import_parser.add_argument("file", help="*.jsonl or *.csv file, '-' reads JSON Lines from stdin")
+    import_parser.add_argument("--verification-status", choices=sorted(VET_VERIFICATION_STATUSES), default="unverified")
+    import_parser.add_argument("--batch-size", type=int, default=_DEFAULT_BATCH_SIZE)
+    import_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes normalizing the vets, 1 normalizes them in this process",
+    )
+    import_parser.add_argument(
+        "--skip-normalization",
+        action="store_true",
+        help="Stores the vets as they are, e.g. when importing vets exported by this script",
+    )
+
+    export_parser = subparsers.add_parser("export", help="Exports vets to a JSON Lines file")
+    export_parser.add_argument("visibility", choices=sorted(VET_VISIBILITIES))
+    export_parser.add_argument("file", help="*.jsonl file, '-' writes to stdout")
+    export_parser.add_argument("--verification-status", choices=sorted(VET_VERIFICATION_STATUSES), default="verified")
+    export_parser.add_argument("--batch-size", type=int, default=_DEFAULT_BATCH_SIZE)
+
+    parsed_args = parser.parse_args(args)
+
+    if parsed_args.batch_size < 1:
+        parser.error(f"'--batch-size' must be greater than 0, not {parsed_args.batch_size}")
+
+    if parsed_args.command == "import":
+        if parsed_args.workers < 1:
+            parser.error(f"'--workers' must be greater than 0, not {parsed_args.workers}")
+
+        with _open(parsed_args.file, "r", sys.stdin) as file:
+            is_csv = parsed_args.file.endswith(".csv")
+
+            result = import_vets(
+                parsed_args.visibility,
+                parsed_args.verification_status,
+                _read_csv_rows(file) if is_csv else _read_json_lines(file),
+                _convert_csv_row_to_record if is_csv else json.loads,
+                batch_size=parsed_args.batch_size,
+                worker_count=parsed_args.workers,
+                normalize=not parsed_args.skip_normalization,
+            )
+
+        print(f"Imported {result.imported_count} vets, {result.failed_count} failed", file=sys.stderr)
+
+        return 0 if result.failed_count == 0 else 1
+
+    with _open(parsed_args.file, "wb", sys.stdout.buffer) as file:
+        exported_count = export_vets(
+            parsed_args.visibility,
+            parsed_args.verification_status,
+            file,
+            batch_size=parsed_args.batch_size,
+        )
+
+    print(f"Exported {exported_count} vets", file=sys.stderr)
+
+    return 0
+
+
+def import_vets(
+        visibility: VetVisibility,
+        verification_status: VetVerificationStatus,
+        lines: Iterable[tuple[int, _T]],
+        convert_to_record: Callable[[_T], dict[str, Any]],
+        *,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        worker_count: int = 1,
+        normalize: bool = True,
+) -> ImportResult:
+    """
+    Parses, normalizes and stores the vets of the lines batch by batch, reporting the progress to stderr.
+    Lines that fail are reported and skipped.
+
+    :param lines: Line numbers with the content of the lines (e.g. a CSV row).
+    :param convert_to_record: Converts the content of a line to the fields of a vet.
+    """
+    executor = (
+        # Forking a process with running threads (e.g. of the MongoDB client) is unsafe
+        ProcessPoolExecutor(max_workers=worker_count, mp_context=multiprocessing.get_context("spawn"))
+        if normalize and worker_count > 1
+        else None
+    )
+
+    imported_count = 0
+    failed_count = 0
+    start = time.perf_counter()
+
+    try:
+        for batch in _batched(lines, batch_size):
+            line_numbers_and_ids_and_vets: list[tuple[int, str, VetCreateOrOverwrite]] = []
+
+            for line_number, line in batch:
+                try:
+                    record = convert_to_record(line)
+                    # E.g. a JSON line with an array or a number
+                    if not isinstance(record, dict):
+                        raise ValueError(f"Expected an object with the fields of a vet, got {type(record).__name__}")
+
+                    id_ = str(record.pop("id", None) or uuid.uuid4())
+                    line_numbers_and_ids_and_vets.append((line_number, id_, VetCreateOrOverwrite.parse_obj(record)))
+                except ValueError as err:
+                    _report_failed_line(line_number, str(err))
+                    failed_count += 1
+
+            if normalize:
+                line_numbers_and_ids_and_vets, normalization_failed_count = _normalize_vets(
+                    line_numbers_and_ids_and_vets,
+                    executor,
+                    worker_count,
+                )
+                failed_count += normalization_failed_count
+
+            # A later line overwrites an earlier line with the same id, like separate imports would
+            id_to_vet = {id_: vet for _, id_, vet in line_numbers_and_ids_and_vets}
+
+            db.create_or_overwrite_vets(visibility, verification_status, list(id_to_vet.items()))
+            imported_count += len(id_to_vet)
+
+            print(
+                f"{imported_count} imported, {failed_count} failed, "
+                f"{imported_count / (time.perf_counter() - start):.1f} vets/s",
+                file=sys.stderr,
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return ImportResult(imported_count=imported_count, failed_count=failed_count)
+
+
+def export_vets(
+        visibility: VetVisibility,
+        verification_status: VetVerificationStatus,
+        file: BinaryIO,
+        *,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Writes the vets as JSON Lines while reading them from the database, reporting the progress to stderr.
+    Returns the number of exported vets.
+    """
+    exported_count = 0
+
+    for vet in db.iter_vets(visibility, verification_status, batch_size=batch_size):
+        file.write(json_.dumps(vet) + b"\n")
+        exported_count += 1
+
+        if exported_count % batch_size == 0:
+            print(f"{exported_count} exported", file=sys.stderr)
+
+    return exported_count
+
+
+def _normalize_vets(
+        line_numbers_and_ids_and_vets: list[tuple[int, str, VetCreateOrOverwrite]],
+        executor: ProcessPoolExecutor | None,
+        worker_count: int,
+) -> tuple[list[tuple[int, str, VetCreateOrOverwrite]], int]:
+    """
+    Returns the normalized vets and the number of vets that could not be normalized.
+    """
+    vets = [vet for _, _, vet in line_numbers_and_ids_and_vets]
+    normalized_vets_or_errors = (
+        map(_normalize_vet_or_return_error, vets)
+        if executor is None
+        else executor.map(
+            _normalize_vet_or_return_error,
+            vets,
+            chunksize=_get_chunk_size(len(vets), worker_count),
+        )
+    )
+
+    normalized_line_numbers_and_ids_and_vets = []
+    failed_count = 0
+
+    for (line_number, id_, _), normalized_vet_or_error in zip(
+            line_numbers_and_ids_and_vets,
+            normalized_vets_or_errors,
+    ):
+        if isinstance(normalized_vet_or_error, NormalizationError):
+            _report_failed_line(
+                line_number,
+                f"{normalized_vet_or_error.msg} (at {', '.join(normalized_vet_or_error.locations)})",
+            )
+            failed_count += 1
+        else:
+            normalized_line_numbers_and_ids_and_vets.append((line_number, id_, normalized_vet_or_error))
+
+    return normalized_line_numbers_and_ids_and_vets, failed_count
+
+
+def _normalize_vet_or_return_error(vet: VetCreateOrOverwrite) -> VetCreateOrOverwrite | NormalizationError:
+    try:
+        return normalization.vet.normalize(vet)
+    except NormalizationError as err:
+        return err
+
+
+def _get_chunk_size(vet_count: int, worker_count: int) -> int:
+    # Several chunks per worker, so workers finishing early take over the vets of slower ones
+    return max(1, vet_count // (worker_count * 4))
+
+
+def _report_failed_line(line_number: int, message: str) -> None:
+    print(f"Line {line_number}: {message}", file=sys.stderr)
+
+
+def _read_json_lines(file: TextIO) -> Iterator[tuple[int, str]]:
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def _read_csv_rows(file: TextIO) -> Iterator[tuple[int, dict[str | None, Any]]]:
+    reader = csv.DictReader(file)
+
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _convert_csv_row_to_record(row: dict[str | None, Any]) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+
+    for path, cell in row.items():
+        # Cells without column are stored with the path None
+        if path is None or not cell:
+            continue
+
+        *parent_keys, key = path.split(".")
+
+        parent = record
+        for parent_key in parent_keys:
+            parent = parent.setdefault(parent_key, {})
+
+        parent[key] = json.loads(cell) if cell.lstrip().startswith(("[", "{")) else cell
+
+    return record
+
+
+def _batched(items: Iterable[_T], batch_size: int) -> Iterator[list[_T]]:
+    batch: list[_T] = []
+
+    for item in items:
+        batch.append(item)
+
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def _open(path: str, mode: str, std_stream: IO) -> ContextManager[IO]:
+    if path == "-":
+        # Leaves the standard stream open
+        return nullcontext(std_stream)
+
+    return open(path, mode, **({} if "b" in mode else {"encoding": "utf-8", "newline": ""}))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
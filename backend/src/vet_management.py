@@ -5,6 +5,7 @@ from typing import Literal, cast
 import auth
 import config
 import db
+import db_async
 import email_
 import normalization.vet
 import vet_visibility
@@ -41,12 +42,12 @@ def send_registration_email(
     )
 
 
-def get_vet_by_form_user(
+async def get_vet_by_form_user(
         jwt: str,
 ) -> Vet:
     access_info = allow_access_and_get_info(jwt, "form_user")
 
-    return db.get_vet_by_id(access_info.visibility, access_info.id)
+    return await db_async.get_vet_by_id(access_info.visibility, access_info.id)
 
 
 def create_or_update_vet_by_form_user(
@@ -55,19 +56,35 @@ def create_or_update_vet_by_form_user(
 ) -> Vet:
     access_info = allow_access_and_get_info(jwt, "form_user")
 
+    return create_or_update_vet_and_notify_content_management(
+        access_info.visibility,
+        access_info.id,
+        vet,
+    )
+
+
+def create_or_update_vet_and_notify_content_management(
+        visibility: VetVisibility,
+        id_: str,
+        vet: VetCreateOrOverwrite,
+) -> Vet:
+    """
+    Normalizes and stores the unverified vet submitted by a form user
+    and asks content management to verify it.
+    """
     vet = normalization.vet.normalize(vet)
 
     vet_in_db = db.create_or_overwrite_vet(
-        access_info.visibility,
+        visibility,
         "unverified",
-        access_info.id,
+        id_,
         vet,
     )
 
     content_management_jwt = _generate_access_token(
         vet_in_db.id,
         "content_management",
-        access_info.visibility,
+        visibility,
     )
     content_management_api_root_url = (
         f"{config.get().domain}:{config.get().fastapi.port}/content-management"
@@ -0,0 +1,18 @@
+"""
+Moves the stored vets into the storage layout selected by `config.DbConfig.use_single_vet_collection`.
+
+Stop the API, switch `MONGO_<context>_USE_SINGLE_VET_COLLECTION` and run
+./bin/mongo-migrate-vet-storage.sh <context>
+before starting the API again.
+"""
+import db
+
+
+def main() -> None:
+    moved_vet_count = db.migrate_vets_to_configured_storage_layout()
+
+    print(f"Moved {moved_vet_count} vets")
+
+
+if __name__ == "__main__":
+    main()
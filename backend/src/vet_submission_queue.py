@@ -0,0 +1,204 @@
+"""
+Creates or updates the vets submitted by form users in the background,
+so the form does not wait for the geocoder of the normalization and the SMTP server.
+
+Submissions are queued in MongoDB (see `db.enqueue_vet_submission`), so they survive restarts
+and are processed by the workers of any API process. The form website polls the status of its submission.
+A submission whose worker died (e.g. in a restart) is claimed again once its lease expired,
+see `config.VetSubmissionQueueConfig`.
+"""
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from typing import Literal
+
+import config
+import db
+import logs
+import normalization.vet
+import vet_management
+from models import VetCreateOrOverwrite, VetSubmission, VetSubmissionError
+from normalization import NormalizationError
+from utils import cache, string_
+
+_event_loop: asyncio.AbstractEventLoop | None = None
+# Submissions wait for the geocoder rate limit for seconds,
+# so they do not occupy the threads of the default executor the request handlers use
+_executor: ThreadPoolExecutor | None = None
+# Set when a submission of this process was queued, so workers do not wait for the next poll
+_submitted_event: asyncio.Event | None = None
+# Running tasks must be referenced, otherwise they may be garbage collected
+_worker_tasks: list[asyncio.Task] = []
+
+
+def submit_vet_by_form_user(
+        jwt: str,
+        vet: VetCreateOrOverwrite,
+) -> VetSubmission:
+    """
+    Queues the vet to be created or updated like `vet_management.create_or_update_vet_by_form_user`.
+    """
+    access_info = vet_management.allow_access_and_get_info(jwt, "form_user")
+
+    submission = db.enqueue_vet_submission(access_info.visibility, access_info.id, vet)
+
+    if _event_loop is not None and _submitted_event is not None:
+        # Submissions are queued by request threads
+        _event_loop.call_soon_threadsafe(_submitted_event.set)
+
+    return submission
+
+
+def get_vet_submission_by_form_user(
+        jwt: str,
+        submission_id: str,
+) -> VetSubmission:
+    access_info = vet_management.allow_access_and_get_info(jwt, "form_user")
+
+    return db.get_vet_submission(access_info.visibility, access_info.id, submission_id)
+
+
+def start_workers(event_loop: asyncio.AbstractEventLoop) -> None:
+    global _event_loop
+    global _executor
+    global _submitted_event
+
+    worker_count = config.get().vet_submission_queue.worker_count
+
+    _event_loop = event_loop
+    # A thread per worker, since each worker processes one submission at a time
+    _executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="vet_submission_queue")
+    _submitted_event = asyncio.Event()
+
+    for _ in range(worker_count):
+        _worker_tasks.append(event_loop.create_task(_work(_executor, _submitted_event)))
+
+
+def stop_workers() -> None:
+    global _event_loop
+    global _executor
+    global _submitted_event
+
+    for task in _worker_tasks:
+        task.cancel()
+
+    if _executor is not None:
+        # Submissions being processed are claimed again once their lease expired
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+    _worker_tasks.clear()
+    _event_loop = None
+    _executor = None
+    _submitted_event = None
+
+
+async def _work(executor: ThreadPoolExecutor, submitted_event: asyncio.Event) -> None:
+    event_loop = asyncio.get_running_loop()
+
+    while True:
+        # Cleared before claiming, so a submission queued in the meantime is not missed
+        submitted_event.clear()
+
+        try:
+            # The MongoDB client blocks, so it must not run on the event loop
+            submission = await event_loop.run_in_executor(executor, db.claim_next_vet_submission)
+        except Exception as err:
+            _get_logger().error("Claiming a vet submission failed", exc_info=err)
+            submission = None
+
+        if submission is None:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(submitted_event.wait(), config.get().vet_submission_queue.poll_interval)
+
+            continue
+
+        try:
+            await event_loop.run_in_executor(executor, _process, submission)
+        except Exception as err:
+            # The submission is claimed again once its lease expired
+            _get_logger().error(f"Finishing vet submission {submission.id} failed", exc_info=err)
+
+
+def _process(submission: db.ClaimedVetSubmission) -> None:
+    max_attempts = config.get().vet_submission_queue.max_attempts
+
+    if submission.attempt > max_attempts:
+        # The workers of the previous attempts died
+        _finish(submission, "failed", [_create_internal_error()])
+
+        return
+
+    try:
+        vet_management.create_or_update_vet_and_notify_content_management(
+            submission.visibility,
+            submission.vet_id,
+            submission.vet,
+        )
+    except NormalizationError as err:
+        _finish(submission, "failed", _convert_normalization_error(err))
+    except Exception as err:
+        if submission.attempt < max_attempts:
+            _get_logger().warning(f"Processing vet submission {submission.id} failed, retrying", exc_info=err)
+
+            if not db.release_vet_submission(submission):
+                _log_lost_claim(submission)
+        else:
+            _get_logger().error(f"Processing vet submission {submission.id} failed", exc_info=err)
+            _finish(submission, "failed", [_create_internal_error()])
+    else:
+        _finish(submission, "succeeded")
+
+    _log_geocoder_rate_limiter_metrics()
+
+
+def _finish(
+        submission: db.ClaimedVetSubmission,
+        status: Literal["succeeded", "failed"],
+        errors: list[VetSubmissionError] | None = None,
+) -> None:
+    if not db.finish_vet_submission(submission, status, errors):
+        _log_lost_claim(submission)
+
+
+def _log_lost_claim(submission: db.ClaimedVetSubmission) -> None:
+    _get_logger().warning(
+        f"Vet submission {submission.id} was claimed again after the lease of attempt {submission.attempt} expired, "
+        f"leaving it to the new claim"
+    )
+
+
+def _log_geocoder_rate_limiter_metrics() -> None:
+    # Submissions wait for the geocoder of the normalization, see `normalization.vet`
+    metrics = normalization.vet.get_geocoder_rate_limiter_metrics()
+
+    _get_logger().info(
+        f"Geocoder rate limit: {metrics.queued_count} requests queued by all processes, "
+        f"{metrics.waiting_count} waiting in this process, "
+        f"{metrics.acquired_count} acquired waiting {metrics.total_wait_seconds:.1f}s in total "
+        f"and {metrics.max_wait_seconds:.1f}s at most"
+    )
+
+
+def _convert_normalization_error(err: NormalizationError) -> list[VetSubmissionError]:
+    # Like the response of the API to a `NormalizationError`
+    return [
+        VetSubmissionError(
+            loc=["body"] + [
+                string_.as_camel_case(segment)
+                for segment in location.split(".")
+            ],
+            msg=err.msg,
+            type="normalization_error",
+        )
+        for location in err.locations
+    ]
+
+
+def _create_internal_error() -> VetSubmissionError:
+    return VetSubmissionError(loc=[], msg="Could not process the submission", type="internal_error")
+
+
+@cache.return_singleton
+def _get_logger() -> Logger:
+    return logs.create_logger("vet_submission_queue")
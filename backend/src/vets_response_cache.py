@@ -0,0 +1,142 @@
+"""
+Caches the JSON bodies of `/vets/` responses, see `config.VetsResponseCacheConfig`.
+
+Many users request nearly the same ring, e.g. around a city center.
+While the cache is enabled, requests are put into buckets by rounding the ring center
+and extending the availability window to full hours before the vets are read,
+so all requests of a bucket get the same response.
+
+Writes of verified vets in this process invalidate the responses of their visibility (see `invalidate`).
+Writes in other processes (e.g. other uvicorn workers) are picked up once the responses are too old.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import config
+from types_ import VetVisibility
+from utils import cache
+
+
+@dataclass(frozen=True)
+class Key:
+    visibility: VetVisibility
+    c_lat: float | None
+    c_lon: float | None
+    r_inner: float | None
+    r_outer: float | None
+    availability_from: datetime | None
+    availability_to: datetime | None
+    limit: int | None
+    cursor: str | None
+    only_available: bool
+    # The weekly overviews of the responses show the current week
+    iso_year_and_week: tuple[int, int]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+    created_at: float  # See `time.monotonic`
+
+
+# Every invalidation starts a new generation of a visibility,
+# so responses created from vets read before the invalidation are not cached
+_generations: dict[VetVisibility, int] = {}
+_generations_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return config.get().vets_response_cache.max_bytes > 0
+
+
+def round_coordinate(value: float) -> float:
+    return round(value, config.get().vets_response_cache.center_decimals)
+
+
+def snap_window(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+    """
+    Extends the window to full hours in UTC.
+    """
+    snapped_start = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    snapped_end = end.astimezone(timezone.utc)
+    if snapped_end != snapped_end.replace(minute=0, second=0, microsecond=0):
+        snapped_end = snapped_end.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+    return snapped_start, snapped_end
+
+
+def get_generation(visibility: VetVisibility) -> int:
+    with _generations_lock:
+        return _generations.get(visibility, 0)
+
+
+def get(key: Key) -> CachedResponse | None:
+    if (response_cache := _get_response_cache()) is None:
+        return None
+
+    cached_response = response_cache.get(key)
+
+    if cached_response is None:
+        return None
+
+    if time.monotonic() - cached_response.created_at > config.get().vets_response_cache.max_age:
+        response_cache.invalidate(key)
+
+        return None
+
+    return cached_response
+
+
+def store(
+        key: Key,
+        body: bytes,
+        headers: dict[str, str],
+        generation: int,
+) -> None:
+    """
+    :param generation: The generation of the visibility (see `get_generation`) before the vets were read.
+    """
+    if (response_cache := _get_response_cache()) is None:
+        return
+
+    with _generations_lock:
+        if _generations.get(key.visibility, 0) != generation:
+            return
+
+        response_cache.set(key, CachedResponse(body=body, headers=headers, created_at=time.monotonic()))
+
+
+def invalidate(visibility: VetVisibility) -> None:
+    """
+    Must be called after the verified vets of the visibility were changed.
+    """
+    with _generations_lock:
+        _generations[visibility] = _generations.get(visibility, 0) + 1
+
+        if (response_cache := _get_response_cache()) is not None:
+            response_cache.invalidate_where(lambda key: key.visibility == visibility)
+
+
+def use_configured_response_cache() -> None:
+    """
+    Drops the cached responses and creates the cache again from the config, e.g. after `config.use_temp_config`.
+    """
+    with _generations_lock:
+        _get_response_cache(invalidate_cache=True)
+
+
+@cache.return_singleton(add_invalidate_cache_kwarg=True, populate_cache_on="first_called")
+def _get_response_cache() -> cache.LruCache[Key, CachedResponse] | None:
+    if not is_enabled():
+        return None
+
+    return cache.LruCache(
+        config.get().vets_response_cache.max_bytes,
+        get_size=lambda cached_response: len(cached_response.body),
+    )
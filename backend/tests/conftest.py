@@ -1,4 +1,6 @@
+from collections.abc import Iterator
 from contextlib import contextmanager, AbstractContextManager
+import dataclasses
 import os
 from typing import Callable
 
@@ -7,7 +9,9 @@ import pytest
 
 import api
 import config
+import db
 import env
+import vets_response_cache
 
 
 def pytest_addoption(parser):
@@ -56,6 +60,61 @@ def override_env_context() -> Callable[[env.Context], AbstractContextManager[env
     return override
 
 
+@pytest.fixture
+def override_vet_storage_layout() -> Callable[[bool], AbstractContextManager[None]]:
+    """
+    Stores vets in a single collection or in one collection per visibility and verification status
+    until the `with` block is left, see `config.DbConfig.use_single_vet_collection`.
+    """
+    @contextmanager
+    def override(use_single_vet_collection: bool) -> Iterator[None]:
+        temp_config = dataclasses.replace(
+            config.get(),
+            db=dataclasses.replace(config.get().db, use_single_vet_collection=use_single_vet_collection),
+        )
+
+        try:
+            with config.use_temp_config(temp_config):
+                db.use_configured_vet_storage_layout()
+                yield
+        finally:
+            db.use_configured_vet_storage_layout()
+
+    return override
+
+
+@pytest.fixture
+def override_vets_response_cache_config() -> Callable[..., AbstractContextManager[None]]:
+    """
+    Caches `/vets/` responses with the changed fields of `config.VetsResponseCacheConfig`
+    until the `with` block is left. The cache is disabled in the test context by `VETS_RESPONSE_CACHE_TEST_MAX_BYTES`.
+    """
+    @contextmanager
+    def override(**changes) -> Iterator[None]:
+        temp_config = dataclasses.replace(
+            config.get(),
+            vets_response_cache=dataclasses.replace(config.get().vets_response_cache, **changes),
+        )
+
+        try:
+            with config.use_temp_config(temp_config):
+                vets_response_cache.use_configured_response_cache()
+                yield
+        finally:
+            vets_response_cache.use_configured_response_cache()
+
+    return override
+
+
 @pytest.fixture(scope="module")
 def fastapi_client() -> TestClient:
     return TestClient(api.api)
+
+
+@pytest.fixture
+def started_fastapi_client() -> TestClient:
+    """
+    Unlike `fastapi_client`, runs the startup and shutdown handlers of the API, e.g. starting background workers.
+    """
+    with TestClient(api.api) as client:
+        yield client
@@ -0,0 +1,241 @@
+import dataclasses
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from dateutil.tz import gettz
+
+import availability
+import availability_materialization
+import config
+import db
+from models import (
+    AvailabilityCondition,
+    AvailabilityConditionAll,
+    AvailabilityConditionNot,
+    AvailabilityConditionTimeSpan,
+    OpeningHoursInformation,
+    VetCreateOrOverwrite,
+)
+
+_VISIBILITY = "software_test"
+_LOCK_NAME = "software_test_lock"
+
+
+@pytest.fixture(autouse=True)
+def delete_test_collections() -> None:
+    db.delete_vet_collections(_VISIBILITY)
+
+    yield
+
+    db.delete_vet_collections(_VISIBILITY)
+
+
+@pytest.fixture
+def now() -> datetime:
+    # MongoDB stores datetimes with millisecond precision
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _create_vet(
+        opening_hours: dict[str, OpeningHoursInformation],
+        emergency_availability_condition: AvailabilityCondition | None,
+) -> VetCreateOrOverwrite:
+    return VetCreateOrOverwrite.parse_obj({
+        "clinicName": "Clinic",
+        "nameInformation": {"firstName": "Jane", "lastName": "Doe"},
+        "location": {
+            "address": {"street": "Alt-Friedrichsfelde", "zipCode": 10315, "city": "Berlin", "number": "60"},
+            "lat": 52.5,
+            "lon": 13.5,
+        },
+        "openingHours": opening_hours,
+    }).copy(update={
+        "availability_condition": availability.convert_opening_hours_to_condition(opening_hours, "Europe/Berlin"),
+        "emergency_availability_condition": emergency_availability_condition,
+    })
+
+
+def _create_test_vets(now: datetime) -> dict[str, VetCreateOrOverwrite]:
+    vets = {
+        "materialization-test-vet-opening-hours-only": _create_vet(
+            {
+                "Mon": OpeningHoursInformation(from_="08:00", to="12:00"),
+                "Fri": OpeningHoursInformation(from_="14:30", to="18:00"),
+            },
+            None,
+        ),
+        "materialization-test-vet-always": _create_vet(
+            {"Wed": OpeningHoursInformation(from_="00:00", to="23:59")},
+            AvailabilityConditionAll(type="all"),
+        ),
+        "materialization-test-vet-never": _create_vet(
+            {"Sun": OpeningHoursInformation(from_="10:00", to="11:00")},
+            AvailabilityConditionNot(type="not", child=AvailabilityConditionAll(type="all")),
+        ),
+        "materialization-test-vet-time-span": _create_vet(
+            {"Tue": OpeningHoursInformation(from_="09:00", to="17:00")},
+            AvailabilityConditionTimeSpan(
+                type="time_span",
+                start=now + timedelta(days=3, hours=2),
+                end=now + timedelta(days=5, minutes=30),
+                timezone="Europe/Berlin",
+            ),
+        ),
+    }
+
+    for id_, vet in vets.items():
+        db.create_or_overwrite_vet(_VISIBILITY, "verified", id_, vet)
+
+    return vets
+
+
+class TestLock:
+
+    def test_is_held_until_released(self) -> None:
+        lock = db.acquire_lock(_LOCK_NAME, 60)
+
+        assert lock is not None
+        assert db.acquire_lock(_LOCK_NAME, 60) is None
+        assert db.release_lock(lock)
+
+        other_lock = db.acquire_lock(_LOCK_NAME, 60)
+
+        assert other_lock is not None
+        assert db.release_lock(other_lock)
+
+    def test_is_acquired_again_once_lease_expired(self) -> None:
+        expired_lock = db.acquire_lock(_LOCK_NAME, 0)
+        lock = db.acquire_lock(_LOCK_NAME, 60)
+
+        assert expired_lock is not None
+        assert lock is not None
+        # The holder whose lease expired does not release the lock of the next holder
+        assert not db.release_lock(expired_lock)
+        assert db.acquire_lock(_LOCK_NAME, 60) is None
+        assert db.release_lock(lock)
+
+
+class TestMaterializeAll:
+
+    @pytest.mark.parametrize("bounds_offsets", [
+        (timedelta(), timedelta(days=1)),
+        (timedelta(hours=5), timedelta(days=4, hours=3)),
+        (timedelta(days=2, minutes=17), timedelta(days=12)),
+        (timedelta(days=30), timedelta(weeks=7)),
+    ])
+    def test_materialized_time_spans_equal_evaluated_time_spans(self, now, bounds_offsets) -> None:
+        vets = _create_test_vets(now)
+        lower_bound, upper_bound = (now + offset for offset in bounds_offsets)
+
+        availability_materialization.materialize_all(now)
+        materialized_availabilities = db.get_materialized_availabilities(
+            _VISIBILITY,
+            vets,
+            lower_bound,
+            upper_bound,
+        )
+
+        assert set(materialized_availabilities) == set(vets)
+
+        for id_, vet in vets.items():
+            for kind, condition in availability.get_conditions_by_kind(vet).items():
+                assert list(availability.trim_time_spans(
+                    lower_bound,
+                    upper_bound,
+                    materialized_availabilities[id_][kind],
+                )) == list(availability.get_time_spans(lower_bound, upper_bound, condition)), (id_, kind)
+
+    def test_materializes_horizon_starting_at_midnight(self, now) -> None:
+        vets = _create_test_vets(now)
+        later = now + timedelta(days=3)
+        midnight = later.astimezone(gettz("Europe/Berlin")).replace(hour=0, minute=0, second=0)
+
+        availability_materialization.materialize_all(later)
+
+        # The time spans of the day of `later` are materialized, but not the time spans before
+        assert set(db.get_materialized_availabilities(_VISIBILITY, vets, midnight, later)) == set(vets)
+        assert db.get_materialized_availabilities(_VISIBILITY, vets, midnight - timedelta(minutes=1), later) == {}
+        assert set(db.get_materialized_availabilities(
+            _VISIBILITY,
+            vets,
+            later,
+            later + db.AVAILABILITY_MATERIALIZATION_HORIZON - timedelta(days=1),
+        )) == set(vets)
+
+
+class TestMaterializeAllIfNotMaterialized:
+
+    def test_skips_if_materialized(self, now) -> None:
+        # Vets are materialized when they are written
+        _create_test_vets(now)
+
+        assert availability_materialization.is_materialized_for_all(now)
+        assert not availability_materialization.materialize_all_if_not_materialized(now)
+
+    def test_materializes_if_horizon_is_outdated(self, now) -> None:
+        vets = _create_test_vets(now)
+        # E.g. if no API process was running last night
+        db.materialize_availability(
+            _VISIBILITY,
+            db.get_vet_by_id(_VISIBILITY, next(iter(vets))),
+            now - timedelta(days=2),
+        )
+
+        assert not availability_materialization.is_materialized_for_all(now)
+        assert availability_materialization.materialize_all_if_not_materialized(now)
+        assert availability_materialization.is_materialized_for_all(now)
+
+    def test_skips_while_another_process_materializes(self, now, monkeypatch) -> None:
+        vets = _create_test_vets(now)
+        db.materialize_availability(
+            _VISIBILITY,
+            db.get_vet_by_id(_VISIBILITY, next(iter(vets))),
+            now - timedelta(days=2),
+        )
+        monkeypatch.setattr(availability_materialization, "_LOCK_NAME", _LOCK_NAME)
+
+        lock_of_other_process = db.acquire_lock(_LOCK_NAME, 60)
+
+        try:
+            assert not availability_materialization.materialize_all_if_not_materialized(now)
+            assert not availability_materialization.is_materialized_for_all(now)
+        finally:
+            db.release_lock(lock_of_other_process)
+
+        assert availability_materialization.materialize_all_if_not_materialized(now)
+
+
+class TestProcessPool:
+
+    @pytest.fixture
+    def process_pool_size(self) -> int:
+        with config.use_temp_config(dataclasses.replace(
+                config.get(),
+                availability=dataclasses.replace(config.get().availability, process_pool_size=1),
+        )):
+            yield 1
+
+        availability_materialization.shutdown_process_pool()
+
+    def test_is_started_once_until_shut_down(self, process_pool_size) -> None:
+        process_pool = availability_materialization.get_process_pool()
+
+        assert process_pool is not None
+        assert availability_materialization.get_process_pool() is process_pool
+
+        availability_materialization.shutdown_process_pool()
+
+        # The worker processes exited
+        with pytest.raises(RuntimeError):
+            process_pool._executor.submit(int)
+
+        other_process_pool = availability_materialization.get_process_pool()
+
+        assert other_process_pool is not None
+        assert other_process_pool is not process_pool
+
+    def test_is_not_started_for_size_zero(self) -> None:
+        assert config.get().availability.process_pool_size == 0
+        assert availability_materialization.get_process_pool() is None
+
+        availability_materialization.shutdown_process_pool()
@@ -0,0 +1,247 @@
+import asyncio
+from collections.abc import AsyncIterator, Coroutine
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
+
+import pytest
+from dateutil.tz import gettz
+
+import availability
+import db
+import db_async
+from models import OpeningHoursInformation, VetCreateOrOverwrite
+
+_T = TypeVar("_T")
+
+_VISIBILITY = "software_test"
+_CENTER_LAT = 52.5
+_CENTER_LON = 13.4
+# Vets by id, opening hour and longitude offset from the center.
+# Two vets share a location, so pages are cut within a group of vets with the same distance.
+_VETS = {
+    "db-async-test-vet-0": (8, 0.01),
+    "db-async-test-vet-1": (9, 0.02),
+    "db-async-test-vet-2": (10, 0.02),
+    "db-async-test-vet-3": (11, 0.05),
+    "db-async-test-vet-4": (12, 0.1),
+    "db-async-test-vet-5": (13, 1),
+}
+_UNVERIFIED_VET_ID = "db-async-test-vet-unverified"
+
+
+@pytest.fixture(autouse=True, params=[False, True], ids=["per_status_vet_collections", "single_vet_collection"])
+def vet_storage_layout(request, override_vet_storage_layout) -> None:
+    with override_vet_storage_layout(request.param):
+        db.delete_vet_collections(_VISIBILITY)
+
+        # In reverse, so vets with the same distance are not found in the order of their ids by chance
+        for id_, (opening_hour, lon_offset) in reversed(_VETS.items()):
+            db.create_or_overwrite_vet(_VISIBILITY, "verified", id_, _create_vet(opening_hour, lon_offset))
+
+        db.create_or_overwrite_vet(_VISIBILITY, "unverified", _UNVERIFIED_VET_ID, _create_vet(8, 0.03))
+
+        yield
+
+        db.delete_vet_collections(_VISIBILITY)
+
+
+@pytest.fixture
+def available_during() -> db.AvailabilityWindow:
+    # From 9:30 to 11:30 on the next Monday, which overlaps the opening hours of the vets opening at 9, 10 and 11
+    next_monday = datetime.now(gettz("Europe/Berlin")) + timedelta(days=7)
+    next_monday = (next_monday - timedelta(days=next_monday.weekday())).replace(
+        hour=9,
+        minute=30,
+        second=0,
+        microsecond=0,
+    )
+
+    return db.AvailabilityWindow(kind="availability", start=next_monday, end=next_monday + timedelta(hours=2))
+
+
+def _create_vet(opening_hour: int, lon_offset: float) -> VetCreateOrOverwrite:
+    opening_hours = {
+        "Mon": OpeningHoursInformation(from_=f"{opening_hour:02}:00", to=f"{opening_hour + 1:02}:00"),
+    }
+
+    return VetCreateOrOverwrite.parse_obj({
+        "clinicName": f"Clinic {opening_hour}",
+        "nameInformation": {"firstName": "Jane", "lastName": "Doe"},
+        "location": {
+            "address": {"street": "Alt-Friedrichsfelde", "zipCode": 10315, "city": "Berlin", "number": "60"},
+            "lat": _CENTER_LAT,
+            "lon": _CENTER_LON + lon_offset,
+        },
+        "openingHours": opening_hours,
+    }).copy(update={
+        "availability_condition": availability.convert_opening_hours_to_condition(opening_hours, "Europe/Berlin"),
+    })
+
+
+def _run(coroutine: Coroutine[Any, Any, _T]) -> _T:
+    return asyncio.run(coroutine)
+
+
+def _collect(async_iterator: AsyncIterator[_T]) -> list[_T]:
+    async def collect() -> list[_T]:
+        return [item async for item in async_iterator]
+
+    return _run(collect())
+
+
+def _sorted_by_id(vets: list) -> list:
+    return sorted(vets, key=lambda vet: vet.id)
+
+
+class TestParityWithDb:
+
+    def test_get_all_verified_vets(self, available_during) -> None:
+        vets = _sorted_by_id(_collect(db_async.get_all_verified_vets(_VISIBILITY)))
+
+        assert [vet.id for vet in vets] == list(_VETS)
+        assert vets == _sorted_by_id(list(db.get_all_verified_vets(_VISIBILITY)))
+
+        available_vets = _sorted_by_id(_collect(db_async.get_all_verified_vets(
+            _VISIBILITY,
+            available_during=available_during,
+        )))
+
+        assert [vet.id for vet in available_vets] == list(_VETS)[1:4]
+        assert available_vets == _sorted_by_id(list(db.get_all_verified_vets(
+            _VISIBILITY,
+            available_during=available_during,
+        )))
+
+    @pytest.mark.parametrize("limit", [None, 1, 2, 3, 10])
+    @pytest.mark.parametrize("use_available_during", [False, True])
+    def test_get_verified_vets_in_ring_by_distance_pages(
+            self,
+            limit: int | None,
+            use_available_during: bool,
+            available_during: db.AvailabilityWindow,
+    ) -> None:
+        available_during = available_during if use_available_during else None
+        after = None
+        vet_ids = []
+
+        # Walks all pages the way the API follows its cursor
+        while True:
+            page = _run(db_async.get_verified_vets_in_ring_by_distance(
+                _VISIBILITY,
+                _CENTER_LAT,
+                _CENTER_LON,
+                0,
+                50,
+                limit=limit,
+                after=after,
+                available_during=available_during,
+            ))
+
+            assert page == db.get_verified_vets_in_ring_by_distance(
+                _VISIBILITY,
+                _CENTER_LAT,
+                _CENTER_LON,
+                0,
+                50,
+                limit=limit,
+                after=after,
+                available_during=available_during,
+            )
+
+            vet_ids += [vet_with_distance.vet.id for vet_with_distance in page]
+
+            if limit is None or len(page) < limit:
+                break
+
+            after = db.RingPosition(distance=page[-1].distance, id=page[-1].vet.id)
+
+        expected_vet_ids = list(_VETS)[:5] if available_during is None else list(_VETS)[1:4]
+
+        assert vet_ids == expected_vet_ids
+
+    def test_iter_verified_vets_in_ring_by_distance(self) -> None:
+        vets_with_distance = _collect(db_async.iter_verified_vets_in_ring_by_distance(
+            _VISIBILITY,
+            _CENTER_LAT,
+            _CENTER_LON,
+            1,
+            100,
+            batch_size=2,
+        ))
+
+        # The order of vets with the same distance is not defined
+        def sort_key(vet_with_distance: db.VetWithDistance) -> tuple[float, str]:
+            return vet_with_distance.distance, vet_with_distance.vet.id
+
+        assert [vet_with_distance.vet.id for vet_with_distance in sorted(vets_with_distance, key=sort_key)] == [
+            "db-async-test-vet-1",
+            "db-async-test-vet-2",
+            "db-async-test-vet-3",
+            "db-async-test-vet-4",
+            "db-async-test-vet-5",
+        ]
+        assert sorted(vets_with_distance, key=sort_key) == sorted(db.iter_verified_vets_in_ring_by_distance(
+            _VISIBILITY,
+            _CENTER_LAT,
+            _CENTER_LON,
+            1,
+            100,
+            batch_size=2,
+        ), key=sort_key)
+
+    def test_availability_is_materialized_for_all_verified_vets(self) -> None:
+        now = datetime.now(timezone.utc)
+
+        for start, end, is_materialized in [
+            (now, now + timedelta(days=1), True),
+            (now, now + db.AVAILABILITY_MATERIALIZATION_HORIZON + timedelta(days=1), False),
+            (now - timedelta(days=2), now, False),
+        ]:
+            assert _run(db_async.availability_is_materialized_for_all_verified_vets(
+                _VISIBILITY,
+                start,
+                end,
+            )) == db.availability_is_materialized_for_all_verified_vets(_VISIBILITY, start, end) == is_materialized
+
+    def test_get_materialized_availabilities(self, available_during) -> None:
+        vet_ids = [*_VETS, _UNVERIFIED_VET_ID, "db-async-test-missing-vet"]
+        lower_bound = available_during.start - timedelta(days=1)
+        upper_bound = available_during.end + timedelta(days=8)
+
+        materialized_availabilities = _run(db_async.get_materialized_availabilities(
+            _VISIBILITY,
+            vet_ids,
+            lower_bound,
+            upper_bound,
+        ))
+
+        assert set(materialized_availabilities) == set(_VETS)
+        assert all(
+            len(kind_to_time_spans["availability"]) == 2
+            for kind_to_time_spans in materialized_availabilities.values()
+        )
+        assert materialized_availabilities == db.get_materialized_availabilities(
+            _VISIBILITY,
+            vet_ids,
+            lower_bound,
+            upper_bound,
+        )
+
+    def test_get_vet_by_id(self) -> None:
+        for id_ in ["db-async-test-vet-0", _UNVERIFIED_VET_ID]:
+            assert _run(db_async.get_vet_by_id(_VISIBILITY, id_)) == db.get_vet_by_id(_VISIBILITY, id_)
+
+        with pytest.raises(db.VetDoesNotExist):
+            _run(db_async.get_vet_by_id(_VISIBILITY, "db-async-test-missing-vet"))
+
+    def test_vet_collections_are_empty(self) -> None:
+        for verification_status in ("verified", "unverified", "all"):
+            assert not _run(db_async.vet_collections_are_empty(_VISIBILITY, verification_status))
+
+        db.delete_vet_by_id_if_exists(_VISIBILITY, _UNVERIFIED_VET_ID)
+
+        assert _run(db_async.vet_collections_are_empty(_VISIBILITY, "unverified"))
+        assert _run(db_async.vet_collections_are_empty(_VISIBILITY, "unverified")) == db.vet_collections_are_empty(
+            _VISIBILITY,
+            "unverified",
+        )
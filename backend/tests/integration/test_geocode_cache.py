@@ -0,0 +1,251 @@
+import dataclasses
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+
+import geopy
+import pytest
+
+import config
+import db
+import geocode_cache_preload
+import normalization.vet
+from models import Address
+
+_RAW_LOCATION = {
+    "lat": "52.5219814",
+    "lon": "13.4111173",
+    "display_name": "1, Alexanderplatz, Mitte, Berlin, 10178, Deutschland",
+    "address": {"house_number": "1", "road": "Alexanderplatz", "postcode": "10178", "city": "Berlin"},
+}
+
+
+@pytest.fixture(autouse=True)
+def delete_geocode_cache() -> None:
+    db._get_geocode_cache_collection().delete_many({})
+
+    yield
+
+    db._get_geocode_cache_collection().delete_many({})
+
+
+@pytest.fixture
+def override_geocode_cache_config() -> Callable[..., AbstractContextManager[None]]:
+    @contextmanager
+    def override(**changes) -> Iterator[None]:
+        with config.use_temp_config(dataclasses.replace(
+                config.get(),
+                geocode_cache=dataclasses.replace(config.get().geocode_cache, **changes),
+        )):
+            yield
+
+    return override
+
+
+@pytest.fixture
+def geocoder_requests(monkeypatch) -> list[str]:
+    """
+    Records the requests to the geocoder, which fail, instead of sending them.
+    """
+    requests = []
+
+    def satisfy_rate_limit() -> None:
+        requests.append("rate_limit")
+
+    class Geolocator:
+
+        def geocode(self, query, **_) -> geopy.Location | None:
+            requests.append("geocode")
+            raise AssertionError(f"Should not geocode {query}")
+
+        def reverse(self, point, **_) -> geopy.Location | None:
+            requests.append("reverse")
+            raise AssertionError(f"Should not reverse geocode {point}")
+
+    monkeypatch.setattr(normalization.vet, "_satisfy_geopy_request_ratelimit", satisfy_rate_limit)
+    monkeypatch.setattr(normalization.vet, "_geopy_geolocator", Geolocator)
+
+    return requests
+
+
+def _create_address(**changes) -> Address:
+    return Address.parse_obj({"street": "Alexanderplatz", "number": "1", "zipCode": 10178, "city": "Berlin"} | changes)
+
+
+def _store(key: str, raw_location: dict | None = _RAW_LOCATION) -> None:
+    db.store_geocode_cache_entries([db.GeocodeCacheEntry(key=key, raw_location=raw_location)])
+    # MongoDB stores datetimes with millisecond precision, so entries stored later are used later
+    time.sleep(0.002)
+
+
+class TestCreateAddressGeocodeCacheKey:
+
+    def test_ignores_case_and_whitespace(self) -> None:
+        assert normalization.vet.create_address_geocode_cache_key(_create_address(
+            street="  ALEXANDERplatz ",
+            number="1 ",
+            city="berlin\t",
+        )) == normalization.vet.create_address_geocode_cache_key(_create_address()) == (
+            "address:1 alexanderplatz|10178|berlin"
+        )
+
+    def test_address_without_number(self) -> None:
+        assert normalization.vet.create_address_geocode_cache_key(_create_address(number=None)) == (
+            normalization.vet.create_address_geocode_cache_key(_create_address(number=""))
+        ) == "address:alexanderplatz|10178|berlin"
+
+    @pytest.mark.parametrize("changes", [
+        {"street": "Alexanderstraße"},
+        {"number": "2"},
+        {"zipCode": 10179},
+        {"city": "Potsdam"},
+    ])
+    def test_differs_for_other_addresses(self, changes: dict) -> None:
+        assert normalization.vet.create_address_geocode_cache_key(_create_address(**changes)) != (
+            normalization.vet.create_address_geocode_cache_key(_create_address())
+        )
+
+
+class TestCreateLatLonGeocodeCacheKey:
+
+    def test_rounds_coordinates(self, override_geocode_cache_config) -> None:
+        with override_geocode_cache_config(coordinate_decimals=3):
+            assert normalization.vet.create_lat_lon_geocode_cache_key(52.52049, 13.41151) == (
+                normalization.vet.create_lat_lon_geocode_cache_key(52.5196, 13.4115)
+            ) == "lat_lon:52.52,13.412"
+            assert normalization.vet.create_lat_lon_geocode_cache_key(52.5206, 13.4115) == "lat_lon:52.521,13.412"
+
+    def test_coordinates_rounded_to_zero_share_key(self, override_geocode_cache_config) -> None:
+        with override_geocode_cache_config(coordinate_decimals=3):
+            assert normalization.vet.create_lat_lon_geocode_cache_key(-0.0001, 0.0001) == (
+                normalization.vet.create_lat_lon_geocode_cache_key(0.0001, -0.0001)
+            ) == "lat_lon:0.0,0.0"
+
+    def test_differs_from_address_keys(self) -> None:
+        assert normalization.vet.create_lat_lon_geocode_cache_key(52.5, 13.4).startswith("lat_lon:")
+
+
+class TestGeocodeCache:
+
+    def test_returns_stored_entry(self) -> None:
+        _store("address:a")
+
+        assert db.get_geocode_cache_entry("address:a") == db.GeocodeCacheEntry(
+            key="address:a",
+            raw_location=_RAW_LOCATION,
+        )
+        assert db.get_geocode_cache_entry("address:b") is None
+
+    def test_stores_not_found_results(self) -> None:
+        _store("address:a", None)
+
+        assert db.get_geocode_cache_entry("address:a") == db.GeocodeCacheEntry(key="address:a", raw_location=None)
+
+    def test_overwrites_entry_with_same_key(self) -> None:
+        _store("address:a", None)
+        _store("address:a")
+
+        assert db.get_geocode_cache_entry("address:a").raw_location == _RAW_LOCATION
+
+    def test_entry_expires_after_max_age(self, override_geocode_cache_config) -> None:
+        with override_geocode_cache_config(max_age=0):
+            _store("address:expired")
+
+        with override_geocode_cache_config(max_age=60):
+            _store("address:a")
+
+        # Expired entries are ignored until MongoDB removes them
+        assert db.get_geocode_cache_entry("address:expired") is None
+        assert db.get_geocode_cache_entry("address:a") is not None
+        assert db._get_geocode_cache_collection().index_information()["expires_at_1"]["expireAfterSeconds"] == 0
+
+    def test_evicts_least_recently_used_entries_beyond_max_entries(self, override_geocode_cache_config) -> None:
+        with override_geocode_cache_config(max_entries=3):
+            for key in ["address:a", "address:b", "address:c"]:
+                _store(key)
+
+            # Marks the oldest entry as used
+            assert db.get_geocode_cache_entry("address:a") is not None
+            time.sleep(0.002)
+
+            _store("address:d")
+
+            assert db.get_geocode_cache_entry("address:b") is None
+            assert all(
+                db.get_geocode_cache_entry(key) is not None
+                for key in ["address:a", "address:c", "address:d"]
+            )
+
+            db.store_geocode_cache_entries([
+                db.GeocodeCacheEntry(key=f"address:{index}", raw_location=None)
+                for index in range(5)
+            ])
+
+            assert db._get_geocode_cache_collection().count_documents({}) == 3
+
+
+class TestNormalizationUsesGeocodeCache:
+
+    def test_geocodes_address_only_once(self, geocoder_requests, monkeypatch) -> None:
+        geocoded_location = geopy.Location(_RAW_LOCATION["display_name"], (52.5219814, 13.4111173), _RAW_LOCATION)
+
+        class Geolocator:
+
+            def geocode(self, *_, **__) -> geopy.Location:
+                geocoder_requests.append("geocode")
+
+                return geocoded_location
+
+        monkeypatch.setattr(normalization.vet, "_geopy_geolocator", Geolocator)
+
+        first_location = normalization.vet._get_geopy_location_from_address(_create_address())
+        # Shares the key of the first address
+        second_location = normalization.vet._get_geopy_location_from_address(_create_address(city="BERLIN"))
+
+        assert geocoder_requests == ["rate_limit", "geocode"]
+        assert (second_location.latitude, second_location.longitude, second_location.raw) == (
+            first_location.latitude,
+            first_location.longitude,
+            first_location.raw,
+        ) == (52.5219814, 13.4111173, _RAW_LOCATION)
+
+    def test_does_not_geocode_cached_not_found_address_again(self, geocoder_requests) -> None:
+        _store(normalization.vet.create_address_geocode_cache_key(_create_address()), None)
+
+        assert normalization.vet._get_geopy_location_from_address(_create_address()) is None
+        assert geocoder_requests == []
+
+
+class TestPreload:
+
+    def test_preloads_geocoding_results(self, tmp_path, geocoder_requests, monkeypatch, capsys) -> None:
+        monkeypatch.setattr(geocode_cache_preload, "_BATCH_SIZE", 2)
+        file_path = tmp_path / "geocoding_results.jsonl"
+        file_path.write_text("\n".join([
+            json.dumps({"address": {"street": "Alexanderplatz", "number": "1", "zipCode": 10178, "city": "Berlin"},
+                        "location": _RAW_LOCATION}),
+            "",
+            json.dumps({"lat": 52.52198, "lon": 13.41112, "location": _RAW_LOCATION}),
+            json.dumps({"address": {"street": "Nowhere", "zipCode": 10115, "city": "Berlin"}, "location": None}),
+            # Failing lines
+            "{not json",
+            json.dumps({"address": {"street": "Alexanderplatz", "zipCode": 10178, "city": "Berlin"}}),
+            json.dumps({"lat": 52.5, "lon": 13.4, "location": {"display_name": "Without coordinates"}}),
+            json.dumps({"address": {"street": "Alexanderplatz", "city": "Berlin"}, "location": None}),
+        ]), encoding="utf-8")
+
+        assert geocode_cache_preload.main(str(file_path)) == 1
+        assert "Preloaded 3 geocoding results, 4 failed" in capsys.readouterr().err
+
+        address_location = normalization.vet._get_geopy_location_from_address(_create_address(number=" 1"))
+        lat_lon_location = normalization.vet._get_geopy_location_from_lat_lon(52.521983, 13.411117)
+
+        assert (address_location.latitude, address_location.longitude) == (52.5219814, 13.4111173)
+        assert lat_lon_location.raw == _RAW_LOCATION
+        assert normalization.vet._get_geopy_location_from_address(_create_address(
+            street="Nowhere",
+            number=None,
+            zipCode=10115,
+        )) is None
+        assert geocoder_requests == []
@@ -0,0 +1,329 @@
+import io
+import json
+
+import pytest
+
+import availability
+import db
+import normalization.vet
+import vet_bulk_transfer
+from models import AvailabilityConditionAll, OpeningHoursInformation, Vet, VetCreateOrOverwrite
+from normalization import NormalizationError
+
+_VISIBILITY = "software_test"
+
+
+@pytest.fixture(autouse=True)
+def delete_test_collections() -> None:
+    db.delete_vet_collections(_VISIBILITY)
+
+    yield
+
+    db.delete_vet_collections(_VISIBILITY)
+
+
+@pytest.fixture
+def normalize_without_geocoding(monkeypatch) -> None:
+    """
+    Normalizes the availability like `normalization.vet.normalize`, but fails for vets in the city 'Nowhere'
+    instead of geocoding their location.
+    """
+    def normalize(vet: VetCreateOrOverwrite) -> VetCreateOrOverwrite:
+        if vet.location.address.city == "Nowhere":
+            raise NormalizationError(f"Could not normalize location={vet.location}", ["location.address"])
+
+        return normalization.vet._normalize_availability(vet)
+
+    monkeypatch.setattr(normalization.vet, "normalize", normalize)
+
+
+def _create_record(clinic_name: str, *, city: str = "Berlin", **fields) -> dict:
+    return {
+        "clinicName": clinic_name,
+        "nameInformation": {"firstName": "Jane", "lastName": "Doe"},
+        "location": {
+            "address": {"street": "Alt-Friedrichsfelde", "zipCode": 10315, "city": city, "number": "60"},
+            "lat": 52.5,
+            "lon": 13.5,
+        },
+        "openingHours": {"Mon": {"from": "08:00", "to": "12:00"}},
+    } | fields
+
+
+def _create_json_lines(*records: dict | str) -> io.StringIO:
+    return io.StringIO("\n".join(record if isinstance(record, str) else json.dumps(record) for record in records))
+
+
+def _import_json_lines(file: io.StringIO, **kwargs) -> vet_bulk_transfer.ImportResult:
+    return vet_bulk_transfer.import_vets(
+        _VISIBILITY,
+        "verified",
+        vet_bulk_transfer._read_json_lines(file),
+        json.loads,
+        **kwargs,
+    )
+
+
+def _read_vets_by_id() -> dict[str, Vet]:
+    return {vet.id: vet for vet in db.iter_vets(_VISIBILITY, "verified")}
+
+
+def _read_csv_records(text: str) -> list[tuple[int, dict]]:
+    return [
+        (line_number, vet_bulk_transfer._convert_csv_row_to_record(row))
+        for line_number, row in vet_bulk_transfer._read_csv_rows(io.StringIO(text))
+    ]
+
+
+class TestReadJsonLines:
+
+    def test_skips_blank_lines_but_counts_them(self) -> None:
+        file = io.StringIO('{"id": "a"}\n\n   \n{"id": "b"}\n{"id": "c"}')
+
+        assert list(vet_bulk_transfer._read_json_lines(file)) == [
+            (1, '{"id": "a"}\n'),
+            (4, '{"id": "b"}\n'),
+            (5, '{"id": "c"}'),
+        ]
+
+
+class TestConvertCsvRowToRecord:
+
+    def test_nests_fields_of_dotted_column_paths(self) -> None:
+        assert _read_csv_records(
+            "id,clinicName,location.address.city,location.address.zipCode,location.lat\n"
+            "vet-0,Clinic,Berlin,10315,52.5\n"
+        ) == [(2, {
+            "id": "vet-0",
+            "clinicName": "Clinic",
+            "location": {"address": {"city": "Berlin", "zipCode": "10315"}, "lat": "52.5"},
+        })]
+
+    def test_parses_cells_of_lists_and_objects_as_json(self) -> None:
+        assert _read_csv_records(
+            "contacts,openingHours,clinicName\n"
+            '"[{""type"": ""email"", ""value"": ""a@b.de""}]"," {""Mon"": {""from"": ""08:00"", ""to"": ""12:00""}}",'
+            "Clinic {1}\n"
+        ) == [(2, {
+            "contacts": [{"type": "email", "value": "a@b.de"}],
+            "openingHours": {"Mon": {"from": "08:00", "to": "12:00"}},
+            "clinicName": "Clinic {1}",
+        })]
+
+    def test_fails_for_invalid_json_cell(self) -> None:
+        # Counted as failed line by `vet_bulk_transfer.import_vets`
+        with pytest.raises(ValueError):
+            _read_csv_records("contacts\n[Not JSON\n")
+
+    def test_leaves_out_empty_cells(self) -> None:
+        assert _read_csv_records(
+            "id,clinicName,location.address.number,location.address.city\n"
+            "vet-0,,,Berlin\n"
+            "vet-1,Clinic,,\n"
+        ) == [
+            (2, {"id": "vet-0", "location": {"address": {"city": "Berlin"}}}),
+            (3, {"id": "vet-1", "clinicName": "Clinic"}),
+        ]
+
+    def test_leaves_out_cells_without_column(self) -> None:
+        assert _read_csv_records("id,clinicName\nvet-0,Clinic,superfluous\n") == [
+            (2, {"id": "vet-0", "clinicName": "Clinic"}),
+        ]
+
+    def test_counts_lines_of_multiline_cells(self) -> None:
+        assert _read_csv_records('id,clinicName\nvet-0,"Clinic\nat the Park"\nvet-1,Clinic\n') == [
+            (3, {"id": "vet-0", "clinicName": "Clinic\nat the Park"}),
+            (4, {"id": "vet-1", "clinicName": "Clinic"}),
+        ]
+
+    def test_records_are_parsed_as_vets(self) -> None:
+        [(_, record)] = _read_csv_records(
+            "clinicName,nameInformation.firstName,nameInformation.lastName,"
+            "location.address.street,location.address.number,location.address.zipCode,location.address.city,"
+            "openingHours\n"
+            "Clinic,Jane,Doe,Alt-Friedrichsfelde,60,10315,Berlin,"
+            '"{""Mon"": {""from"": ""08:00"", ""to"": ""12:00""}}"\n'
+        )
+
+        vet = VetCreateOrOverwrite.parse_obj(record)
+
+        assert vet.location.address.zip_code == 10315
+        assert vet.location.lat is None
+        assert vet.opening_hours["Mon"].from_ == "08:00"
+
+
+class TestBatched:
+
+    @pytest.mark.parametrize("item_count,batch_size,expected_batch_sizes", [
+        (0, 3, []),
+        (1, 3, [1]),
+        (3, 3, [3]),
+        (7, 3, [3, 3, 1]),
+        (4, 1, [1, 1, 1, 1]),
+    ])
+    def test_splits_items_into_batches(
+            self,
+            item_count: int,
+            batch_size: int,
+            expected_batch_sizes: list[int],
+    ) -> None:
+        batches = list(vet_bulk_transfer._batched(iter(range(item_count)), batch_size))
+
+        assert [len(batch) for batch in batches] == expected_batch_sizes
+        assert [item for batch in batches for item in batch] == list(range(item_count))
+
+    def test_is_lazy(self) -> None:
+        def items():
+            yield from range(3)
+            raise AssertionError("Should not be read before the first batch was processed")
+
+        assert next(vet_bulk_transfer._batched(items(), 3)) == [0, 1, 2]
+
+
+class TestGetChunkSize:
+
+    @pytest.mark.parametrize("vet_count,worker_count,expected", [
+        (0, 4, 1),
+        (3, 4, 1),
+        (500, 1, 125),
+        (500, 4, 31),
+    ])
+    def test_splits_vets_into_several_chunks_per_worker(
+            self,
+            vet_count: int,
+            worker_count: int,
+            expected: int,
+    ) -> None:
+        assert vet_bulk_transfer._get_chunk_size(vet_count, worker_count) == expected
+
+
+@pytest.mark.usefixtures("normalize_without_geocoding")
+class TestImportVets:
+
+    def test_imports_vets_in_batches(self, monkeypatch) -> None:
+        batch_sizes = []
+        create_or_overwrite_vets = db.create_or_overwrite_vets
+
+        def count_batch_sizes(visibility, verification_status, ids_and_vets):
+            batch_sizes.append(len(ids_and_vets))
+
+            return create_or_overwrite_vets(visibility, verification_status, ids_and_vets)
+
+        monkeypatch.setattr(db, "create_or_overwrite_vets", count_batch_sizes)
+
+        result = _import_json_lines(
+            _create_json_lines(*(_create_record(f"Clinic {index}", id=f"vet-{index}") for index in range(7))),
+            batch_size=3,
+        )
+
+        assert result == vet_bulk_transfer.ImportResult(imported_count=7, failed_count=0)
+        assert batch_sizes == [3, 3, 1]
+        assert set(_read_vets_by_id()) == {f"vet-{index}" for index in range(7)}
+
+    def test_normalizes_vets(self) -> None:
+        _import_json_lines(_create_json_lines(_create_record("Clinic", id="vet-0")))
+
+        assert _read_vets_by_id()["vet-0"].availability_condition == availability.convert_opening_hours_to_condition(
+            {"Mon": OpeningHoursInformation(from_="08:00", to="12:00")},
+            "Europe/Berlin",
+        )
+
+    def test_counts_and_skips_failed_lines(self, capsys) -> None:
+        result = _import_json_lines(_create_json_lines(
+            _create_record("Clinic 0", id="vet-0"),
+            "{not json",
+            _create_record("Clinic 2", id="vet-2") | {"nameInformation": None},
+            _create_record("Clinic 3", id="vet-3", city="Nowhere"),
+            _create_record("Clinic 4", id="vet-4"),
+        ), batch_size=2)
+
+        assert result == vet_bulk_transfer.ImportResult(imported_count=2, failed_count=3)
+        assert set(_read_vets_by_id()) == {"vet-0", "vet-4"}
+
+        stderr = capsys.readouterr().err
+
+        assert "Line 2: " in stderr
+        assert "Line 3: " in stderr
+        assert "Line 4: Could not normalize location=" in stderr
+        assert "(at location.address)" in stderr
+
+    @pytest.mark.parametrize("line", ["[1, 2]", "5", "null", '"Clinic"'])
+    def test_counts_and_skips_lines_that_are_no_objects(self, line: str, capsys) -> None:
+        result = _import_json_lines(_create_json_lines(
+            _create_record("Clinic 0", id="vet-0"),
+            line,
+            _create_record("Clinic 2", id="vet-2"),
+        ))
+
+        assert result == vet_bulk_transfer.ImportResult(imported_count=2, failed_count=1)
+        assert set(_read_vets_by_id()) == {"vet-0", "vet-2"}
+        assert "Line 2: Expected an object with the fields of a vet" in capsys.readouterr().err
+
+    def test_later_line_overwrites_earlier_line_with_same_id(self) -> None:
+        result = _import_json_lines(_create_json_lines(
+            _create_record("Clinic", id="vet-0"),
+            _create_record("Renamed Clinic", id="vet-0"),
+        ))
+
+        assert result.imported_count == 1
+        assert [vet.clinic_name for vet in _read_vets_by_id().values()] == ["Renamed Clinic"]
+
+    def test_creates_ids_for_vets_without_id(self) -> None:
+        _import_json_lines(_create_json_lines(_create_record("Clinic 0"), _create_record("Clinic 1", id=None)))
+
+        assert len(_read_vets_by_id()) == 2
+
+
+class TestExportAndImportVets:
+
+    def test_round_trip_keeps_vets(self) -> None:
+        for index in range(5):
+            vet = VetCreateOrOverwrite.parse_obj(_create_record(f"Clinic {index}")).copy(update={
+                "availability_condition": availability.convert_opening_hours_to_condition(
+                    {"Mon": OpeningHoursInformation(from_=f"{8 + index:02}:00", to="12:00")},
+                    "Europe/Berlin",
+                ),
+                "emergency_availability_condition": AvailabilityConditionAll(type="all") if index % 2 else None,
+            })
+            db.create_or_overwrite_vet(_VISIBILITY, "verified", f"vet-{index}", vet)
+
+        vets_by_id = _read_vets_by_id()
+        file = io.BytesIO()
+
+        assert vet_bulk_transfer.export_vets(_VISIBILITY, "verified", file, batch_size=2) == 5
+
+        db.delete_vet_collections(_VISIBILITY)
+
+        result = _import_json_lines(io.StringIO(file.getvalue().decode()), normalize=False)
+
+        assert result == vet_bulk_transfer.ImportResult(imported_count=5, failed_count=0)
+        assert _read_vets_by_id() == vets_by_id
+
+    def test_main_imports_csv_file_and_exports_json_lines_file(self, tmp_path, capsys) -> None:
+        csv_path = tmp_path / "vets.csv"
+        csv_path.write_text(
+            "id,clinicName,nameInformation.firstName,nameInformation.lastName,"
+            "location.address.street,location.address.zipCode,location.address.city,location.lat,location.lon,"
+            "openingHours\n"
+            "vet-0,Clinic,Jane,Doe,Alt-Friedrichsfelde,10315,Berlin,52.5,13.5,"
+            '"{""Mon"": {""from"": ""08:00"", ""to"": ""12:00""}}"\n'
+            "vet-1,Clinic without name\n",
+            encoding="utf-8",
+        )
+        jsonl_path = tmp_path / "vets.jsonl"
+
+        assert vet_bulk_transfer.main([
+            "import",
+            _VISIBILITY,
+            str(csv_path),
+            "--verification-status",
+            "verified",
+            "--skip-normalization",
+        ]) == 1
+        assert vet_bulk_transfer.main(["export", _VISIBILITY, str(jsonl_path)]) == 0
+
+        [line] = jsonl_path.read_text(encoding="utf-8").splitlines()
+
+        assert json.loads(line)["id"] == "vet-0"
+        assert json.loads(line)["location"]["address"]["city"] == "Berlin"
+        assert "Imported 1 vets, 1 failed" in capsys.readouterr().err
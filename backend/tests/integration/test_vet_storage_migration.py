@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import availability
+import db
+from models import OpeningHoursInformation, Vet, VetCreateOrOverwrite
+from types_ import VetVerificationStatus
+
+_VISIBILITY = "software_test"
+_VET_IDS_BY_VERIFICATION_STATUS: dict[VetVerificationStatus, list[str]] = {
+    "unverified": ["migration-test-vet-0", "migration-test-vet-1"],
+    "verified": ["migration-test-vet-2", "migration-test-vet-3", "migration-test-vet-4"],
+}
+
+_STORAGE_LAYOUTS = pytest.mark.parametrize(
+    "use_single_vet_collection",
+    [False, True],
+    ids=["per_status_vet_collections", "single_vet_collection"],
+)
+
+
+@pytest.fixture(autouse=True)
+def delete_test_collections(override_vet_storage_layout) -> None:
+    for use_single_vet_collection in (False, True):
+        with override_vet_storage_layout(use_single_vet_collection):
+            db.delete_vet_collections(_VISIBILITY)
+
+    yield
+
+    for use_single_vet_collection in (False, True):
+        with override_vet_storage_layout(use_single_vet_collection):
+            db.delete_vet_collections(_VISIBILITY)
+
+
+def _create_vet(opening_hour: int) -> VetCreateOrOverwrite:
+    opening_hours = {
+        "Mon": OpeningHoursInformation(from_=f"{opening_hour:02}:00", to=f"{opening_hour + 1:02}:00"),
+    }
+
+    return VetCreateOrOverwrite.parse_obj({
+        "clinicName": f"Clinic {opening_hour}",
+        "nameInformation": {"firstName": "Jane", "lastName": "Doe"},
+        "location": {
+            "address": {"street": "Alt-Friedrichsfelde", "zipCode": 10315, "city": "Berlin", "number": "60"},
+            "lat": 52.5,
+            "lon": 13.5 + opening_hour / 100,
+        },
+        "openingHours": opening_hours,
+    }).copy(update={
+        "availability_condition": availability.convert_opening_hours_to_condition(opening_hours, "Europe/Berlin"),
+    })
+
+
+def _create_test_vets() -> None:
+    opening_hour = 8
+
+    for verification_status, ids in _VET_IDS_BY_VERIFICATION_STATUS.items():
+        for id_ in ids:
+            db.create_or_overwrite_vet(_VISIBILITY, verification_status, id_, _create_vet(opening_hour))
+            opening_hour += 1
+
+
+def _read_test_vets() -> dict[VetVerificationStatus, list[dict]]:
+    return {
+        verification_status: sorted(
+            (_convert_vet_to_comparable_dict(vet) for vet in db.iter_vets(_VISIBILITY, verification_status)),
+            key=lambda dct: dct["id"],
+        )
+        for verification_status in _VET_IDS_BY_VERIFICATION_STATUS
+    }
+
+
+def _convert_vet_to_comparable_dict(vet: Vet) -> dict:
+    return vet.dict() | {
+        "availability_condition_hash": db.get_availability_condition_hash(vet, "availability"),
+    }
+
+
+def _get_materialized_vet_ids() -> set[str]:
+    start = datetime.now(timezone.utc)
+
+    return set(db.get_materialized_availabilities(
+        _VISIBILITY,
+        _VET_IDS_BY_VERIFICATION_STATUS["verified"],
+        start,
+        start + timedelta(days=7),
+    ))
+
+
+class TestMigrateVetsToConfiguredStorageLayout:
+
+    @_STORAGE_LAYOUTS
+    def test_round_trip_keeps_vets(self, use_single_vet_collection, override_vet_storage_layout) -> None:
+        with override_vet_storage_layout(use_single_vet_collection):
+            _create_test_vets()
+            vets = _read_test_vets()
+            materialized_vet_ids = _get_materialized_vet_ids()
+
+            assert materialized_vet_ids == set(_VET_IDS_BY_VERIFICATION_STATUS["verified"])
+
+            with override_vet_storage_layout(not use_single_vet_collection):
+                moved_vet_count = db.migrate_vets_to_configured_storage_layout()
+
+                assert moved_vet_count >= 5
+                assert _read_test_vets() == vets
+                assert _get_materialized_vet_ids() == materialized_vet_ids
+                assert _convert_vet_to_comparable_dict(db.get_vet_by_id(_VISIBILITY, "migration-test-vet-0")) == (
+                    vets["unverified"][0]
+                )
+
+            # The vets were moved out of the collections of the old layout
+            assert db.vet_collections_are_empty(_VISIBILITY)
+
+            assert db.migrate_vets_to_configured_storage_layout() == moved_vet_count
+            assert _read_test_vets() == vets
+            assert _get_materialized_vet_ids() == materialized_vet_ids
+
+            with override_vet_storage_layout(not use_single_vet_collection):
+                assert db.vet_collections_are_empty(_VISIBILITY)
+
+    @_STORAGE_LAYOUTS
+    def test_can_be_run_again(self, use_single_vet_collection, override_vet_storage_layout) -> None:
+        with override_vet_storage_layout(not use_single_vet_collection):
+            _create_test_vets()
+            vets = _read_test_vets()
+
+        with override_vet_storage_layout(use_single_vet_collection):
+            db.migrate_vets_to_configured_storage_layout()
+
+            # Nothing is left to move
+            assert db.migrate_vets_to_configured_storage_layout() == 0
+            assert _read_test_vets() == vets
+
+
+class TestChangeVetVerificationStatusInSingleVetCollection:
+
+    @pytest.fixture(autouse=True)
+    def use_single_vet_collection(self, override_vet_storage_layout) -> None:
+        with override_vet_storage_layout(True):
+            yield
+
+    def test_moves_vet_between_verification_statuses(self) -> None:
+        _create_test_vets()
+        vets = _read_test_vets()
+        [unverified_vet, *_] = vets["unverified"]
+        [verified_vet, *_] = vets["verified"]
+
+        db.change_vet_verification_status_by_id_if_exists(_VISIBILITY, unverified_vet["id"], "verified")
+        db.change_vet_verification_status_by_id_if_exists(_VISIBILITY, verified_vet["id"], "unverified")
+
+        changed_vets = _read_test_vets()
+
+        assert unverified_vet in changed_vets["verified"]
+        assert verified_vet in changed_vets["unverified"]
+        assert sorted(changed_vets["verified"] + changed_vets["unverified"], key=lambda dct: dct["id"]) == sorted(
+            vets["verified"] + vets["unverified"],
+            key=lambda dct: dct["id"],
+        )
+
+    def test_materializes_only_verified_vets(self) -> None:
+        _create_test_vets()
+        [unverified_vet_id, *_] = _VET_IDS_BY_VERIFICATION_STATUS["unverified"]
+        [verified_vet_id, *_] = _VET_IDS_BY_VERIFICATION_STATUS["verified"]
+
+        db.change_vet_verification_status_by_id_if_exists(_VISIBILITY, verified_vet_id, "unverified")
+
+        assert verified_vet_id not in _get_materialized_vet_ids()
+        assert db.availability_is_materialized_for_all_verified_vets(
+            _VISIBILITY,
+            datetime.now(timezone.utc),
+            datetime.now(timezone.utc) + timedelta(days=1),
+        )
+
+        db.change_vet_verification_status_by_id_if_exists(_VISIBILITY, verified_vet_id, "verified")
+        db.change_vet_verification_status_by_id_if_exists(_VISIBILITY, unverified_vet_id, "verified")
+
+        start = datetime.now(timezone.utc)
+        materialized_vet_ids = set(db.get_materialized_availabilities(
+            _VISIBILITY,
+            [verified_vet_id, unverified_vet_id],
+            start,
+            start + timedelta(days=7),
+        ))
+
+        assert materialized_vet_ids == {verified_vet_id, unverified_vet_id}
+
+    def test_raises_if_vet_does_not_exist(self) -> None:
+        with pytest.raises(db.VetDoesNotExist):
+            db.change_vet_verification_status_by_id_if_exists(_VISIBILITY, "migration-test-missing-vet", "verified")
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import pytest
+from dateutil.tz import gettz
+
+import availability
+import db
+from models import (
+    AvailabilityConditionTimeSpan,
+    AvailabilityKind,
+    OpeningHoursInformation,
+    TimesDuringWeek24HourClock,
+    VetCreateOrOverwrite,
+)
+from utils import cache
+
+_VISIBILITY = "software_test"
+_VET_ID = "weekly-overviews-test-vet"
+
+
+@pytest.fixture(autouse=True)
+def delete_test_collections() -> None:
+    db.delete_vet_collections(_VISIBILITY)
+
+    yield
+
+    db.delete_vet_collections(_VISIBILITY)
+
+
+@pytest.fixture(autouse=True)
+def weekly_overviews(monkeypatch) -> cache.LruCache:
+    weekly_overviews = cache.LruCache(max_size=100)
+    monkeypatch.setattr(availability, "_weekly_overviews", weekly_overviews)
+
+    return weekly_overviews
+
+
+def _create_vet(opening_hour: int) -> VetCreateOrOverwrite:
+    opening_hours = {
+        "Mon": OpeningHoursInformation(from_=f"{opening_hour:02}:00", to=f"{opening_hour + 1:02}:00"),
+    }
+
+    return VetCreateOrOverwrite.parse_obj({
+        "clinicName": "Clinic",
+        "nameInformation": {"firstName": "Jane", "lastName": "Doe"},
+        "location": {
+            "address": {"street": "Alt-Friedrichsfelde", "zipCode": 10315, "city": "Berlin", "number": "60"},
+            "lat": 52.5,
+            "lon": 13.5,
+        },
+        "openingHours": opening_hours,
+    }).copy(update={
+        "availability_condition": availability.convert_opening_hours_to_condition(opening_hours, "Europe/Berlin"),
+    })
+
+
+def _get_weekly_overview_of_stored_vet(kind: AvailabilityKind = "availability") -> TimesDuringWeek24HourClock:
+    vet = db.get_vet_by_id(_VISIBILITY, _VET_ID)
+
+    return availability.get_times_during_current_week_24_hour_clock(
+        availability.get_conditions_by_kind(vet)[kind],
+        vet.timezone,
+        condition_hash=db.get_availability_condition_hash(vet, kind),
+    )
+
+
+class TestAvailabilityConditionHash:
+
+    def test_stored_hash_equals_hash_of_condition(self) -> None:
+        vet = _create_vet(8)
+
+        db.create_or_overwrite_vet(_VISIBILITY, "verified", _VET_ID, vet)
+        stored_vet = db.get_vet_by_id(_VISIBILITY, _VET_ID)
+
+        assert db.get_availability_condition_hash(stored_vet, "availability") == availability.get_condition_hash(
+            vet.availability_condition,
+        )
+        assert db.get_availability_condition_hash(stored_vet, "emergency_availability") is None
+
+    def test_overwriting_vet_invalidates_weekly_overview(self, weekly_overviews) -> None:
+        db.create_or_overwrite_vet(_VISIBILITY, "verified", _VET_ID, _create_vet(8))
+        overview = _get_weekly_overview_of_stored_vet()
+
+        assert len(weekly_overviews) == 1
+        assert _get_weekly_overview_of_stored_vet() == overview
+        assert len(weekly_overviews) == 1
+
+        db.create_or_overwrite_vet(_VISIBILITY, "verified", _VET_ID, _create_vet(9))
+
+        # The overview of the old condition is not used anymore
+        assert len(weekly_overviews) == 0
+
+        updated_overview = _get_weekly_overview_of_stored_vet()
+
+        assert [time_span.digital_clock_string for time_span in overview["Mon"]] == ["08:00-09:00"]
+        assert [time_span.digital_clock_string for time_span in updated_overview["Mon"]] == ["09:00-10:00"]
+
+    def test_deleting_vet_invalidates_weekly_overview(self, weekly_overviews) -> None:
+        db.create_or_overwrite_vet(_VISIBILITY, "verified", _VET_ID, _create_vet(8))
+        _get_weekly_overview_of_stored_vet()
+
+        db.delete_vet_by_id_if_exists(_VISIBILITY, _VET_ID)
+
+        assert len(weekly_overviews) == 0
+
+    def test_deleting_vet_invalidates_weekly_overview_of_condition_with_datetimes(self, weekly_overviews) -> None:
+        # MongoDB returns naive datetimes, so the condition read back serializes differently than the stored one
+        start = datetime.now(gettz("Europe/Berlin")).replace(microsecond=0)
+        db.create_or_overwrite_vet(_VISIBILITY, "verified", _VET_ID, _create_vet(8).copy(update={
+            "emergency_availability_condition": AvailabilityConditionTimeSpan(
+                start=start,
+                end=start + timedelta(hours=1),
+                timezone="Europe/Berlin",
+            ),
+        }))
+        _get_weekly_overview_of_stored_vet()
+        _get_weekly_overview_of_stored_vet("emergency_availability")
+
+        assert len(weekly_overviews) == 2
+
+        db.delete_vet_by_id_if_exists(_VISIBILITY, _VET_ID)
+
+        assert len(weekly_overviews) == 0
@@ -6,23 +6,44 @@ functionally that will interact with external services or users
 Consider a rewrite using a BDD test framework.
 """
 
+import base64
+import dataclasses
+import json
 import random
 import re
-from collections.abc import Callable
+import threading
+import time
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Any, ContextManager
+from unittest import mock
 
 import pytest
+import requests
+from dateutil.tz import gettz
 from fastapi import status
 from fastapi.testclient import TestClient
 
+import availability
 import config
 import db
+import db_async
 import email_
 import paths
 import vet_management
+import vet_submission_queue
 import vet_visibility
+from api import vets as vets_api
+from api.vets import NDJSON_MEDIA_TYPE, NEXT_CURSOR_HEADER_NAME
+from models import (
+    AvailabilityCondition,
+    AvailabilityConditionAll,
+    AvailabilityConditionNot,
+    AvailabilityConditionTimeSpan,
+    VetCreateOrOverwrite,
+)
 
 
 TEST_API_ROOT = f"{config.get().domain}:{config.get().fastapi.port}"
@@ -469,6 +490,983 @@ class Steps:
             assert db.vet_collections_are_empty("software_test")
 
 
+class VetSubmissionQueueSteps:
+    """
+    Like `Steps`, but the form user submits the vet to the queue,
+    which is processed by the workers of the API in the background.
+    """
+    visibility = "software_test"
+
+    # State will incrementally be populated by the steps
+    form_user_access_token: str
+    other_form_user_access_token: str
+    submission_id: str
+
+    @classmethod
+    def step_request_form_user_access_tokens_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        visibility_token = read_vet_visibility_token(cls.visibility)
+
+        # When ****************************************************************
+        cls.form_user_access_token = request_form_user_access_token(
+            api,
+            visibility_token,
+            "form.user@example.com",
+        )
+        cls.other_form_user_access_token = request_form_user_access_token(
+            api,
+            visibility_token,
+            "other.form.user@example.com",
+        )
+
+        # Then ****************************************************************
+        with assertion_ctx("Access tokens should belong to different vets"):
+            assert (
+                vet_management.allow_access_and_get_info(cls.form_user_access_token, "form_user").id
+                != vet_management.allow_access_and_get_info(cls.other_form_user_access_token, "form_user").id
+            )
+
+    @classmethod
+    def step_submit_vet_by_form_user_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        request_url = f"{TEST_API_ROOT}/form/submit-vet"
+        request_headers = {
+            "Authorization": f"Bearer {cls.form_user_access_token}",
+            'Content-Type': 'application/json'
+        }
+        request_body = FormCreateOrOverwriteVetRequestBodies.create
+
+        process = vet_submission_queue._process
+        processing_thread_names = []
+
+        def process_and_record_thread_name(submission: db.ClaimedVetSubmission) -> None:
+            processing_thread_names.append(threading.current_thread().name)
+            process(submission)
+
+        # When ****************************************************************
+        with use_mail_stub() as mail_stub, mock.patch.object(
+                vet_submission_queue,
+                "_process",
+                process_and_record_thread_name,
+        ):
+            res = api.put(
+                request_url,
+                headers=request_headers,
+                json=request_body,
+            )
+
+            cls.submission_id = res.json()["id"]
+
+            statuses = poll_vet_submission_statuses(api, cls.form_user_access_token, cls.submission_id)
+
+        # Then ****************************************************************
+        with assertion_ctx("Request response should have '202 Accepted' status"):
+            assert res.status_code == status.HTTP_202_ACCEPTED
+
+        with assertion_ctx("Submission should be queued"):
+            assert res.json()["status"] == "queued"
+            assert res.json()["vetId"] == vet_management.allow_access_and_get_info(
+                cls.form_user_access_token,
+                "form_user",
+            ).id
+            assert res.json()["errors"] is None
+
+        with assertion_ctx("Submission should move from queued to succeeded"):
+            assert statuses[-1] == "succeeded"
+            assert set(statuses) <= {"queued", "processing", "succeeded"}
+
+        with assertion_ctx("Should send content management emails"):
+            assert len(mail_stub.capture_send_mail_arguments()) > 0
+
+        with assertion_ctx("Submission should be processed by a thread of the queue, not of the default executor"):
+            assert processing_thread_names
+            assert all(name.startswith("vet_submission_queue") for name in processing_thread_names)
+
+    @classmethod
+    def step_get_vet_submitted_by_form_user_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        request_url = f"{TEST_API_ROOT}/form/vet"
+        request_headers = {
+            "Authorization": f"Bearer {cls.form_user_access_token}",
+            'Content-Type': 'application/json'
+        }
+
+        # When ****************************************************************
+        res = api.get(
+            request_url,
+            headers=request_headers,
+        )
+
+        # Then ****************************************************************
+        with assertion_ctx("Request response should have successful status"):
+            assert res.status_code == status.HTTP_200_OK
+
+        with assertion_ctx("Response should contain keys and values from submit request object"):
+            assert_first_dict_is_subset_of_second(
+                FormCreateOrOverwriteVetRequestBodies.create,
+                res.json(),
+                recursive=True,
+            )
+
+    @classmethod
+    def step_fail_to_get_vet_submission_with_access_token_of_other_vet_using_api(
+            cls,
+            assertion_ctx,
+            api: TestClient,
+    ) -> None:
+        # Given ***************************************************************
+        request_url = f"{TEST_API_ROOT}/form/vet-submission/{cls.submission_id}"
+        request_headers = {
+            "Authorization": f"Bearer {cls.other_form_user_access_token}",
+            'Content-Type': 'application/json'
+        }
+
+        # When ****************************************************************
+        res = api.get(
+            request_url,
+            headers=request_headers,
+        )
+
+        # Then ****************************************************************
+        with assertion_ctx("Request response should have '404 Not Found' status"):
+            assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    @classmethod
+    def step_fail_to_normalize_vet_submitted_by_form_user_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        request_url = f"{TEST_API_ROOT}/form/submit-vet"
+        request_headers = {
+            "Authorization": f"Bearer {cls.form_user_access_token}",
+            'Content-Type': 'application/json'
+        }
+        request_body = FormCreateOrOverwriteVetRequestBodies.create | {
+            "openingHours": {
+                "Mon": {
+                    "from": "INVALID TIME",
+                    "to": "INVALID TIME"
+                }
+            }
+        }
+
+        # When ****************************************************************
+        with use_mail_stub() as mail_stub:
+            res = api.put(
+                request_url,
+                headers=request_headers,
+                json=request_body,
+            )
+
+            statuses = poll_vet_submission_statuses(api, cls.form_user_access_token, res.json()["id"])
+
+        submission_res = api.get(
+            f"{TEST_API_ROOT}/form/vet-submission/{res.json()['id']}",
+            headers=request_headers,
+        )
+
+        # Then ****************************************************************
+        with assertion_ctx("Request response should have '202 Accepted' status"):
+            assert res.status_code == status.HTTP_202_ACCEPTED
+
+        with assertion_ctx("Submission should fail"):
+            assert statuses[-1] == "failed"
+
+        with assertion_ctx("Errors should locate the invalid field of the request body like validation errors"):
+            errors = submission_res.json()["errors"]
+
+            assert len(errors) == 1
+            assert errors[0]["loc"] == ["body", "openingHours"]
+            assert errors[0]["type"] == "normalization_error"
+
+        with assertion_ctx("Should not send content management emails"):
+            assert mail_stub.capture_send_mail_arguments() == []
+
+    @classmethod
+    def step_reclaim_vet_submission_after_lease_of_dead_worker_expired(
+            cls,
+            assertion_ctx,
+            api: TestClient,
+    ) -> None:
+        # Given ***************************************************************
+        access_info = vet_management.allow_access_and_get_info(cls.form_user_access_token, "form_user")
+        lease = 0.1
+
+        submission = db.enqueue_vet_submission(
+            access_info.visibility,
+            access_info.id,
+            VetCreateOrOverwrite.parse_obj(FormCreateOrOverwriteVetRequestBodies.update),
+        )
+
+        # A worker that dies while processing the submission
+        with config.use_temp_config(replace_vet_submission_queue_config(lease=lease)):
+            dead_worker_claim = db.claim_next_vet_submission()
+
+        time.sleep(lease)
+
+        # When ****************************************************************
+        with use_mail_stub():
+            # Wakes up the workers, see `wake_vet_submission_queue_workers_only_on_submission`
+            api.put(
+                f"{TEST_API_ROOT}/form/submit-vet",
+                headers={
+                    "Authorization": f"Bearer {cls.other_form_user_access_token}",
+                    'Content-Type': 'application/json'
+                },
+                json=FormCreateOrOverwriteVetRequestBodies.create,
+            )
+
+            statuses = poll_vet_submission_statuses(api, cls.form_user_access_token, submission.id)
+
+        dead_worker_finished = db.finish_vet_submission(dead_worker_claim, "failed")
+
+        # Then ****************************************************************
+        with assertion_ctx("Dead worker should have claimed the submission"):
+            assert dead_worker_claim is not None
+            assert dead_worker_claim.id == submission.id
+
+        with assertion_ctx("Submission should be processed by another worker after the lease expired"):
+            assert statuses[-1] == "succeeded"
+
+        with assertion_ctx("Dead worker should not be able to finish the submission anymore"):
+            assert not dead_worker_finished
+            assert poll_vet_submission_statuses(api, cls.form_user_access_token, submission.id) == ["succeeded"]
+
+
+class OnlyAvailableSteps:
+    """
+    Steps filtering vets by the availability of their emergency service,
+    both by the availability materialized in the database and by evaluating the availability conditions.
+    """
+    visibility = "software_test"
+    ring = {"c_lat": 52.5, "c_lon": 13.4, "r_inner": 0, "r_outer": 10}
+    # Window names to the bounds of the window
+    windows: dict[str, tuple[datetime, datetime]]
+    # Window names to the ids of the vets in the ring available during the window ordered by distance
+    expected_vet_ids_in_ring: dict[str, list[str]]
+    # Window names to the ids of all vets available during the window
+    expected_vet_ids: dict[str, set[str]]
+
+    # State will incrementally be populated by the steps
+    visibility_token: str
+
+    @classmethod
+    def step_create_vets_with_emergency_service_around_windows(cls, assertion_ctx) -> None:
+        # Given ***************************************************************
+        tomorrow = datetime.now(gettz("Europe/Berlin")).replace(
+            hour=0,
+            minute=0,
+            second=0,
+            microsecond=0,
+        ) + timedelta(days=1)
+        cls.windows = {
+            "within_horizon": (tomorrow + timedelta(hours=12), tomorrow + timedelta(hours=18)),
+            # Only evaluated by the availability conditions, see `db.AVAILABILITY_MATERIALIZATION_HORIZON`
+            "beyond_horizon": (
+                tomorrow + db.AVAILABILITY_MATERIALIZATION_HORIZON + timedelta(weeks=2, hours=12),
+                tomorrow + db.AVAILABILITY_MATERIALIZATION_HORIZON + timedelta(weeks=2, hours=18),
+            ),
+        }
+        cls.expected_vet_ids_in_ring = {window_name: [] for window_name in cls.windows}
+        cls.expected_vet_ids = {window_name: set() for window_name in cls.windows}
+
+        # Vet ids to their emergency service and whether they are available during each window,
+        # ordered by increasing distance from the ring center
+        emergency_availability_conditions: dict[str, tuple[AvailabilityCondition | None, set[str]]] = {}
+        for window_name, (start, end) in cls.windows.items():
+            for case, (span_start, span_end, is_available) in {
+                "inside": (start + timedelta(hours=1), start + timedelta(hours=2), True),
+                "overlapping_start": (start - timedelta(hours=1), start + timedelta(minutes=1), True),
+                "overlapping_end": (end - timedelta(minutes=1), end + timedelta(hours=1), True),
+                "touching_start": (start - timedelta(hours=1), start, False),
+                "touching_end": (end, end + timedelta(hours=1), False),
+            }.items():
+                emergency_availability_conditions[f"only-available-{window_name}-{case}"] = (
+                    AvailabilityConditionTimeSpan(
+                        type="time_span",
+                        start=span_start,
+                        end=span_end,
+                        timezone="Europe/Berlin",
+                    ),
+                    {window_name} if is_available else set(),
+                )
+        emergency_availability_conditions["only-available-always"] = (
+            AvailabilityConditionAll(type="all"),
+            set(cls.windows),
+        )
+        emergency_availability_conditions["only-available-without-emergency-service"] = (None, set())
+
+        # When ****************************************************************
+        for index, (vet_id, (condition, window_names)) in enumerate(emergency_availability_conditions.items()):
+            db.create_or_overwrite_vet(
+                cls.visibility,
+                "verified",
+                vet_id,
+                create_vet_at(52.5, 13.4 + 0.01 * (index + 1), emergency_availability_condition=condition),
+            )
+
+            for window_name in window_names:
+                cls.expected_vet_ids_in_ring[window_name].append(vet_id)
+                cls.expected_vet_ids[window_name].add(vet_id)
+
+        # Available all the time, but outside the ring
+        db.create_or_overwrite_vet(
+            cls.visibility,
+            "verified",
+            "only-available-always-outside-ring",
+            create_vet_at(52.5, 14.4, emergency_availability_condition=AvailabilityConditionAll(type="all")),
+        )
+        for window_name in cls.windows:
+            cls.expected_vet_ids[window_name].add("only-available-always-outside-ring")
+
+        cls.visibility_token = read_vet_visibility_token(cls.visibility)
+
+        # Then ****************************************************************
+        with assertion_ctx("Availability should be materialized for the window within the horizon"):
+            assert db.availability_is_materialized_for_all_verified_vets(
+                cls.visibility,
+                *cls.windows["within_horizon"],
+            )
+
+        with assertion_ctx("Availability should not be materialized for the window beyond the horizon"):
+            assert not db.availability_is_materialized_for_all_verified_vets(
+                cls.visibility,
+                *cls.windows["beyond_horizon"],
+            )
+
+    @classmethod
+    def step_get_vets_available_during_windows_in_ring_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        for window_name, window in cls.windows.items():
+            # When ************************************************************
+            vet_ids, next_cursor = request_only_available_vet_ids(api, cls.visibility_token, window, cls.ring)
+
+            # Then ************************************************************
+            with assertion_ctx(f"Should return the vets in the ring available during the window {window_name}"):
+                assert vet_ids == cls.expected_vet_ids_in_ring[window_name]
+                assert next_cursor is None
+
+    @classmethod
+    def step_get_vets_available_during_windows_without_ring_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        for window_name, window in cls.windows.items():
+            # When ************************************************************
+            vet_ids, _ = request_only_available_vet_ids(api, cls.visibility_token, window)
+
+            # Then ************************************************************
+            with assertion_ctx(f"Should return all vets available during the window {window_name}"):
+                assert set(vet_ids) == cls.expected_vet_ids[window_name]
+                assert len(vet_ids) == len(cls.expected_vet_ids[window_name])
+
+    @classmethod
+    def step_get_same_vets_if_availability_is_not_materialized_using_api(
+            cls,
+            assertion_ctx,
+            api: TestClient,
+    ) -> None:
+        # Given ***************************************************************
+        window = cls.windows["within_horizon"]
+
+        async def availability_is_not_materialized(*_: Any) -> bool:
+            return False
+
+        # When ****************************************************************
+        # E.g. while the availability of a vet is materialized again
+        with mock.patch.object(
+                db_async,
+                "availability_is_materialized_for_all_verified_vets",
+                availability_is_not_materialized,
+        ):
+            vet_ids_in_ring, _ = request_only_available_vet_ids(api, cls.visibility_token, window, cls.ring)
+            vet_ids, _ = request_only_available_vet_ids(api, cls.visibility_token, window)
+
+        # Then ****************************************************************
+        with assertion_ctx("Evaluating the availability conditions should return the same vets in the ring"):
+            assert vet_ids_in_ring == cls.expected_vet_ids_in_ring["within_horizon"]
+
+        with assertion_ctx("Evaluating the availability conditions should return the same vets"):
+            assert set(vet_ids) == cls.expected_vet_ids["within_horizon"]
+
+    @classmethod
+    def step_page_through_vets_available_during_windows_in_ring_using_api(
+            cls,
+            assertion_ctx,
+            api: TestClient,
+    ) -> None:
+        for window_name, window in cls.windows.items():
+            for limit in (1, 2):
+                # When ********************************************************
+                pages = []
+                cursor = None
+
+                while len(pages) <= len(cls.expected_vet_ids_in_ring[window_name]):
+                    vet_ids, cursor = request_only_available_vet_ids(
+                        api,
+                        cls.visibility_token,
+                        window,
+                        cls.ring | {"limit": limit},
+                        cursor=cursor,
+                    )
+                    pages.append(vet_ids)
+
+                    if cursor is None:
+                        break
+
+                # Then ********************************************************
+                with assertion_ctx(
+                        f"Pages of {limit} vets should return the vets available during the window {window_name}"
+                ):
+                    assert [vet_id for page in pages for vet_id in page] == cls.expected_vet_ids_in_ring[window_name]
+                    assert all(len(page) <= limit for page in pages)
+                    assert cursor is None
+
+    @classmethod
+    def step_fail_to_get_only_available_vets_without_window_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # When ****************************************************************
+        res = api.get(
+            f"{TEST_API_ROOT}/vets/",
+            headers={"Authorization": f"Bearer {cls.visibility_token}"},
+            params={"only_available": True} | cls.ring,
+        )
+
+        # Then ****************************************************************
+        with assertion_ctx("Request response should have '400 Bad Request' status"):
+            assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    @classmethod
+    def step_fail_to_page_through_vets_with_invalid_cursor_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        for cursor_json, expected_status_code in [
+            ('[0.5, "only-available-always"]', status.HTTP_200_OK),
+            ('[NaN, "only-available-always"]', status.HTTP_400_BAD_REQUEST),
+            ('[Infinity, "only-available-always"]', status.HTTP_400_BAD_REQUEST),
+            ('[-Infinity, "only-available-always"]', status.HTTP_400_BAD_REQUEST),
+            ('[true, "only-available-always"]', status.HTTP_400_BAD_REQUEST),
+            ('[0.5, 1]', status.HTTP_400_BAD_REQUEST),
+            ('[0.5, "only-available-always", 1]', status.HTTP_400_BAD_REQUEST),
+            ('{"not": "json"', status.HTTP_400_BAD_REQUEST),
+        ]:
+            # When ************************************************************
+            res = api.get(
+                f"{TEST_API_ROOT}/vets/",
+                headers={"Authorization": f"Bearer {cls.visibility_token}"},
+                params=cls.ring | {"limit": 1, "cursor": base64.urlsafe_b64encode(cursor_json.encode()).decode()},
+            )
+
+            # Then ************************************************************
+            with assertion_ctx(f"Request with the cursor {cursor_json} should have status {expected_status_code}"):
+                assert res.status_code == expected_status_code, res.text
+
+
+class ResponseCacheSteps:
+    """
+    Steps getting vets while `/vets/` responses are cached, see `vets_response_cache`.
+    """
+    visibility = "software_test"
+    # Ring centers of the same bucket, since they round to the same coordinates
+    ring = {"c_lat": 52.50012, "c_lon": 13.40004, "r_inner": 0, "r_outer": 10, "limit": 2}
+    ring_of_same_bucket = ring | {"c_lat": 52.49971, "c_lon": 13.40038}
+    rounded_center = {"c_lat": 52.5, "c_lon": 13.4}
+    vet_ids = ["response-cache-vet-0", "response-cache-vet-1", "response-cache-vet-2"]
+
+    # State will incrementally be populated by the steps
+    visibility_token: str
+    window: tuple[datetime, datetime]
+    window_of_same_bucket: tuple[datetime, datetime]
+    snapped_window: tuple[datetime, datetime]
+    first_page: bytes
+    next_cursor: str
+
+    @classmethod
+    def step_create_vets_in_ring(cls, assertion_ctx) -> None:
+        tomorrow = datetime.now(gettz("Europe/Berlin")).replace(
+            hour=0,
+            minute=0,
+            second=0,
+            microsecond=0,
+        ) + timedelta(days=1)
+        cls.window = (tomorrow + timedelta(hours=12, minutes=17), tomorrow + timedelta(hours=15, minutes=42))
+        cls.window_of_same_bucket = (
+            tomorrow + timedelta(hours=12, minutes=55),
+            tomorrow + timedelta(hours=15, minutes=1),
+        )
+        cls.snapped_window = (
+            (tomorrow + timedelta(hours=12)).astimezone(timezone.utc),
+            (tomorrow + timedelta(hours=16)).astimezone(timezone.utc),
+        )
+
+        for index, vet_id in enumerate(cls.vet_ids):
+            db.create_or_overwrite_vet(
+                cls.visibility,
+                "verified",
+                vet_id,
+                create_vet_at(
+                    52.5,
+                    13.4 + 0.01 * (index + 1),
+                    emergency_availability_condition=AvailabilityConditionAll(type="all"),
+                ),
+            )
+
+        cls.visibility_token = read_vet_visibility_token(cls.visibility)
+
+    @classmethod
+    def step_get_same_response_for_requests_of_same_bucket_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # When ****************************************************************
+        with count_vet_reads_in_ring() as vet_reads_in_ring:
+            res = request_vets(api, cls.visibility_token, cls.window, cls.ring)
+            res_of_same_bucket = request_vets(
+                api,
+                cls.visibility_token,
+                cls.window_of_same_bucket,
+                cls.ring_of_same_bucket,
+            )
+
+        # Then ****************************************************************
+        with assertion_ctx("Vets should only be read for the first request"):
+            assert vet_reads_in_ring.await_count == 1
+
+        with assertion_ctx("Vets should be read around the rounded ring center"):
+            assert vet_reads_in_ring.await_args.args[1:3] == (cls.rounded_center["c_lat"], cls.rounded_center["c_lon"])
+
+        with assertion_ctx("Both requests should get the first page"):
+            assert [vet["id"] for vet in res.json()] == cls.vet_ids[:2]
+            assert res_of_same_bucket.content == res.content
+
+        with assertion_ctx("Both requests should get the same cursor of the next page"):
+            assert res.headers.get(NEXT_CURSOR_HEADER_NAME) is not None
+            assert res_of_same_bucket.headers.get(NEXT_CURSOR_HEADER_NAME) == res.headers[NEXT_CURSOR_HEADER_NAME]
+
+        with assertion_ctx("Emergency availability should span the window extended to full hours"):
+            for vet in res.json():
+                assert [
+                    (datetime.fromisoformat(time_span["start"]), datetime.fromisoformat(time_span["end"]))
+                    for time_span in vet["emergencyAvailability"]
+                ] == [cls.snapped_window]
+
+        cls.first_page = res.content
+        cls.next_cursor = res.headers[NEXT_CURSOR_HEADER_NAME]
+
+    @classmethod
+    def step_follow_cached_cursor_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # When ****************************************************************
+        with count_vet_reads_in_ring() as vet_reads_in_ring:
+            res = request_vets(api, cls.visibility_token, cls.window, cls.ring, cursor=cls.next_cursor)
+            res_of_same_bucket = request_vets(
+                api,
+                cls.visibility_token,
+                cls.window_of_same_bucket,
+                cls.ring_of_same_bucket,
+                cursor=cls.next_cursor,
+            )
+
+        # Then ****************************************************************
+        with assertion_ctx("Cursor should lead to the last page"):
+            assert [vet["id"] for vet in res.json()] == cls.vet_ids[2:]
+            assert NEXT_CURSOR_HEADER_NAME not in res.headers
+            assert res_of_same_bucket.content == res.content
+            assert NEXT_CURSOR_HEADER_NAME not in res_of_same_bucket.headers
+
+        with assertion_ctx("Vets should only be read for the first request of the page"):
+            assert vet_reads_in_ring.await_count == 1
+
+    @classmethod
+    def step_get_vets_from_db_after_vet_was_written_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        db.create_or_overwrite_vet(
+            cls.visibility,
+            "verified",
+            "response-cache-vet-nearest",
+            create_vet_at(52.5, 13.401, emergency_availability_condition=AvailabilityConditionAll(type="all")),
+        )
+
+        # When ****************************************************************
+        with count_vet_reads_in_ring() as vet_reads_in_ring:
+            res = request_vets(api, cls.visibility_token, cls.window, cls.ring)
+            cached_res = request_vets(api, cls.visibility_token, cls.window, cls.ring)
+
+        # Then ****************************************************************
+        with assertion_ctx("Writing a vet should invalidate the cached responses"):
+            assert vet_reads_in_ring.await_count == 1
+            assert [vet["id"] for vet in res.json()] == ["response-cache-vet-nearest", cls.vet_ids[0]]
+            assert cached_res.content == res.content
+
+    @classmethod
+    def step_do_not_cache_response_if_vet_was_written_while_reading_vets_using_api(
+            cls,
+            assertion_ctx,
+            api: TestClient,
+    ) -> None:
+        # Given ***************************************************************
+        # Invalidates the response cached by the previous step
+        db.create_or_overwrite_vet(
+            cls.visibility,
+            "verified",
+            "response-cache-vet-nearest",
+            create_vet_at(52.5, 13.401, emergency_availability_condition=AvailabilityConditionAll(type="all")),
+        )
+
+        def delete_nearest_vet() -> None:
+            db.delete_vet_by_id_if_exists(cls.visibility, "response-cache-vet-nearest")
+
+        # When ****************************************************************
+        # The response still contains the deleted vet, since it was read before the vet was deleted
+        with count_vet_reads_in_ring(after_read=delete_nearest_vet) as vet_reads_in_ring:
+            stale_res = request_vets(api, cls.visibility_token, cls.window_of_same_bucket, cls.ring)
+
+        with count_vet_reads_in_ring() as vet_reads_in_ring_after_write:
+            res = request_vets(api, cls.visibility_token, cls.window_of_same_bucket, cls.ring)
+
+        # Then ****************************************************************
+        with assertion_ctx("Response read before the vet was deleted should not be cached"):
+            assert vet_reads_in_ring.await_count == 1
+            assert [vet["id"] for vet in stale_res.json()][0] == "response-cache-vet-nearest"
+            assert vet_reads_in_ring_after_write.await_count == 1
+            assert res.content == cls.first_page
+            assert res.headers[NEXT_CURSOR_HEADER_NAME] == cls.next_cursor
+
+
+class EmergencyNowSteps:
+    """
+    Steps getting the nearest vets whose emergency service is available now.
+    """
+    visibility = "software_test"
+    center = {"c_lat": 52.5, "c_lon": 13.4}
+    r_outer = 10
+    # Ids of the vets in the ring ordered by increasing distance and whether their emergency service is available now
+    vets_in_ring: list[tuple[str, bool]]
+    vet_outside_ring_id = "emergency-now-open-outside-ring"
+
+    # State will incrementally be populated by the steps
+    visibility_token: str
+
+    @classmethod
+    def step_create_vets_with_emergency_service_open_and_closed_now(cls, assertion_ctx) -> None:
+        now = datetime.now(timezone.utc)
+        emergency_availability_conditions: dict[str, AvailabilityCondition | None] = {
+            "emergency-now-closed": AvailabilityConditionNot(type="not", child=AvailabilityConditionAll(type="all")),
+            "emergency-now-open-0": AvailabilityConditionAll(type="all"),
+            "emergency-now-without-emergency-service": None,
+            "emergency-now-open-during-time-span": AvailabilityConditionTimeSpan(
+                type="time_span",
+                start=now - timedelta(hours=1),
+                end=now + timedelta(hours=1),
+                timezone="Europe/Berlin",
+            ),
+            "emergency-now-closed-until-later": AvailabilityConditionTimeSpan(
+                type="time_span",
+                start=now + timedelta(hours=1),
+                end=now + timedelta(hours=2),
+                timezone="Europe/Berlin",
+            ),
+            "emergency-now-open-1": AvailabilityConditionAll(type="all"),
+            "emergency-now-open-2": AvailabilityConditionAll(type="all"),
+        }
+        cls.vets_in_ring = []
+
+        # In reverse, so the vets are not found in the order they were created by chance
+        for index, (vet_id, condition) in reversed(list(enumerate(emergency_availability_conditions.items()))):
+            db.create_or_overwrite_vet(
+                cls.visibility,
+                "verified",
+                vet_id,
+                create_vet_at(52.5, 13.4 + 0.01 * (index + 1), emergency_availability_condition=condition),
+            )
+            cls.vets_in_ring.insert(0, (vet_id, condition is not None and "open" in vet_id))
+
+        # About 68 km from the center
+        db.create_or_overwrite_vet(
+            cls.visibility,
+            "verified",
+            cls.vet_outside_ring_id,
+            create_vet_at(52.5, 14.4, emergency_availability_condition=AvailabilityConditionAll(type="all")),
+        )
+
+        cls.visibility_token = read_vet_visibility_token(cls.visibility)
+
+    @classmethod
+    def step_get_available_vets_in_ring_by_distance_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # When ****************************************************************
+        res = request_emergency_vets_available_now(api, cls.visibility_token, cls.center | {
+            "r_outer": cls.r_outer,
+            "count": 10,
+        })
+
+        # Then ****************************************************************
+        with assertion_ctx("Should return the vets available now in the ring ordered by distance"):
+            assert [vet["id"] for vet in res.json()] == [
+                vet_id for vet_id, is_available in cls.vets_in_ring if is_available
+            ]
+
+        with assertion_ctx("Distances should increase and not exceed the outer radius"):
+            distances = [vet["distance"] for vet in res.json()]
+
+            assert distances == sorted(distances)
+            assert all(distance <= cls.r_outer for distance in distances)
+
+    @classmethod
+    def step_get_available_vets_beyond_ring_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # When ****************************************************************
+        res = request_emergency_vets_available_now(api, cls.visibility_token, cls.center | {
+            "r_outer": 100,
+            "count": 10,
+        })
+
+        # Then ****************************************************************
+        with assertion_ctx("Should also return the available vet outside the smaller ring last"):
+            assert [vet["id"] for vet in res.json()] == [
+                *(vet_id for vet_id, is_available in cls.vets_in_ring if is_available),
+                cls.vet_outside_ring_id,
+            ]
+
+    @classmethod
+    def step_stop_after_count_available_vets_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        iter_verified_vets_in_ring_by_distance = db_async.iter_verified_vets_in_ring_by_distance
+        batch_sizes = []
+        read_vet_ids = []
+
+        async def iter_and_record_read_vets(*args: Any, batch_size: int, **kwargs: Any):
+            batch_sizes.append(batch_size)
+
+            async for vet_with_distance in iter_verified_vets_in_ring_by_distance(
+                    *args,
+                    batch_size=batch_size,
+                    **kwargs,
+            ):
+                read_vet_ids.append(vet_with_distance.vet.id)
+
+                yield vet_with_distance
+
+        # When ****************************************************************
+        with mock.patch.object(db_async, "iter_verified_vets_in_ring_by_distance", iter_and_record_read_vets):
+            res = request_emergency_vets_available_now(api, cls.visibility_token, cls.center | {
+                "r_outer": cls.r_outer,
+                "count": 2,
+            })
+
+        # Then ****************************************************************
+        with assertion_ctx("Should return the nearest 2 available vets"):
+            assert [vet["id"] for vet in res.json()] == [
+                vet_id for vet_id, is_available in cls.vets_in_ring if is_available
+            ][:2]
+
+        with assertion_ctx("Vets should be read in batches of the count"):
+            assert batch_sizes == [2]
+
+        with assertion_ctx("Vets should only be read until the batch containing the last returned vet"):
+            # The second available vet is the fourth vet, which completes the second batch
+            assert read_vet_ids == [vet_id for vet_id, _ in cls.vets_in_ring[:4]]
+
+    @classmethod
+    def step_get_available_vets_with_count_not_filling_batches_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # When ****************************************************************
+        res = request_emergency_vets_available_now(api, cls.visibility_token, cls.center | {
+            "r_outer": cls.r_outer,
+            "count": 3,
+        })
+
+        # Then ****************************************************************
+        with assertion_ctx("Should return the nearest 3 available vets"):
+            assert [vet["id"] for vet in res.json()] == [
+                vet_id for vet_id, is_available in cls.vets_in_ring if is_available
+            ][:3]
+
+    @classmethod
+    def step_fail_to_get_vets_with_invalid_parameters_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        for params, expected_status_code in [
+            (cls.center | {"count": 0}, status.HTTP_400_BAD_REQUEST),
+            (cls.center | {"count": -1}, status.HTTP_400_BAD_REQUEST),
+            (cls.center | {"r_outer": -1}, status.HTTP_400_BAD_REQUEST),
+            ({"c_lat": 91, "c_lon": 13.4}, status.HTTP_400_BAD_REQUEST),
+            ({"c_lat": 52.5}, status.HTTP_422_UNPROCESSABLE_ENTITY),
+        ]:
+            # When ************************************************************
+            res = api.get(
+                f"{TEST_API_ROOT}/vets/emergency-now",
+                headers={"Authorization": f"Bearer {cls.visibility_token}"},
+                params=params,
+            )
+
+            # Then ************************************************************
+            with assertion_ctx(f"Request with {params} should have status {expected_status_code}"):
+                assert res.status_code == expected_status_code
+
+
+class NdjsonSteps:
+    """
+    Steps streaming vets as newline-delimited JSON instead of returning them in a JSON array.
+    """
+    visibility = "software_test"
+    ring = {"c_lat": 52.5, "c_lon": 13.4, "r_inner": 0, "r_outer": 10}
+    streamed_batch_size = 2
+
+    # State will incrementally be populated by the steps
+    visibility_token: str
+    window: tuple[datetime, datetime]
+
+    @classmethod
+    def step_create_vets_with_and_without_emergency_service(cls, assertion_ctx) -> None:
+        tomorrow = datetime.now(gettz("Europe/Berlin")).replace(
+            hour=0,
+            minute=0,
+            second=0,
+            microsecond=0,
+        ) + timedelta(days=1)
+        cls.window = (tomorrow + timedelta(hours=12), tomorrow + timedelta(hours=18))
+        emergency_availability_conditions: dict[str, AvailabilityCondition | None] = {
+            "ndjson-open": AvailabilityConditionAll(type="all"),
+            "ndjson-closed": AvailabilityConditionNot(type="not", child=AvailabilityConditionAll(type="all")),
+            "ndjson-without-emergency-service": None,
+            "ndjson-available-during-window": AvailabilityConditionTimeSpan(
+                type="time_span",
+                start=tomorrow + timedelta(hours=13),
+                end=tomorrow + timedelta(hours=14),
+                timezone="Europe/Berlin",
+            ),
+            "ndjson-open-farther": AvailabilityConditionAll(type="all"),
+        }
+
+        for index, (vet_id, condition) in enumerate(emergency_availability_conditions.items()):
+            vet = create_vet_at(52.5, 13.4 + 0.01 * (index + 1), emergency_availability_condition=condition)
+            # Independent of the time of day the steps run
+            vet.availability_condition = AvailabilityConditionAll(type="all") if "open" in vet_id else (
+                AvailabilityConditionNot(type="not", child=AvailabilityConditionAll(type="all"))
+            )
+            db.create_or_overwrite_vet(cls.visibility, "verified", vet_id, vet)
+
+        db.create_or_overwrite_vet(
+            cls.visibility,
+            "verified",
+            "ndjson-open-outside-ring",
+            create_vet_at(52.5, 14.4, emergency_availability_condition=AvailabilityConditionAll(type="all")),
+        )
+
+        cls.visibility_token = read_vet_visibility_token(cls.visibility)
+
+    @classmethod
+    def step_stream_same_vets_as_json_response_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        window_parameters = {
+            "availability_from": cls.window[0].isoformat(),
+            "availability_to": cls.window[1].isoformat(),
+        }
+
+        for params in [
+            cls.ring,
+            {},
+            cls.ring | window_parameters,
+            cls.ring | window_parameters | {"only_available": True},
+            window_parameters | {"only_available": True},
+            cls.ring | {"open_now": True},
+            cls.ring | window_parameters | {"only_available": True, "open_now": True},
+        ]:
+            # When ************************************************************
+            res = api.get(
+                f"{TEST_API_ROOT}/vets/",
+                headers={"Authorization": f"Bearer {cls.visibility_token}"},
+                params=params,
+            )
+
+            with mock.patch.object(vets_api, "_STREAMED_BATCH_SIZE", cls.streamed_batch_size), mock.patch.object(
+                    vets_api,
+                    "_create_vets_ndjson",
+                    wraps=vets_api._create_vets_ndjson,
+            ) as create_vets_ndjson:
+                streamed_res = api.get(
+                    f"{TEST_API_ROOT}/vets/",
+                    headers={"Authorization": f"Bearer {cls.visibility_token}"},
+                    params=params | {"format": "ndjson"},
+                )
+
+            # Then ************************************************************
+            with assertion_ctx(f"Request with {params} should return vets"):
+                assert res.status_code == status.HTTP_200_OK, res.text
+                assert res.json()
+
+            with assertion_ctx(f"Streamed request with {params} should return the same vets line by line"):
+                assert streamed_res.status_code == status.HTTP_200_OK, streamed_res.text
+                assert streamed_res.headers["Content-Type"] == NDJSON_MEDIA_TYPE
+                assert NEXT_CURSOR_HEADER_NAME not in streamed_res.headers
+                assert parse_ndjson(streamed_res) == res.json()
+
+            with assertion_ctx(f"Streamed request with {params} should evaluate the vets in batches"):
+                batch_sizes = [len(call.args[1]) for call in create_vets_ndjson.await_args_list]
+
+                assert sum(batch_sizes) == len(res.json())
+                assert all(batch_size == cls.streamed_batch_size for batch_size in batch_sizes[:-1])
+                assert 0 < batch_sizes[-1] <= cls.streamed_batch_size
+
+        with assertion_ctx("All vets in the ring should be streamed in more than one batch"):
+            assert len(parse_ndjson(api.get(
+                f"{TEST_API_ROOT}/vets/",
+                headers={"Authorization": f"Bearer {cls.visibility_token}"},
+                params=cls.ring | {"format": "ndjson"},
+            ))) > cls.streamed_batch_size
+
+    @classmethod
+    def step_negotiate_ndjson_by_accept_header_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        expected_vets = api.get(
+            f"{TEST_API_ROOT}/vets/",
+            headers={"Authorization": f"Bearer {cls.visibility_token}"},
+            params=cls.ring,
+        ).json()
+
+        for accept, format_, is_streamed in [
+            (NDJSON_MEDIA_TYPE, None, True),
+            (f"application/json;q=0.5, {NDJSON_MEDIA_TYPE};q=0.9", None, True),
+            ("application/json", None, False),
+            (None, None, False),
+            # The query parameter takes precedence over the header
+            (NDJSON_MEDIA_TYPE, "json", False),
+            ("application/json", "ndjson", True),
+        ]:
+            # When ************************************************************
+            res = api.get(
+                f"{TEST_API_ROOT}/vets/",
+                headers={"Authorization": f"Bearer {cls.visibility_token}"} | (
+                    {"Accept": accept} if accept is not None else {}
+                ),
+                params=cls.ring | ({"format": format_} if format_ is not None else {}),
+            )
+
+            # Then ************************************************************
+            with assertion_ctx(f"Request with {accept=} and {format_=} should {'' if is_streamed else 'not '}stream"):
+                assert res.status_code == status.HTTP_200_OK, res.text
+
+                if is_streamed:
+                    assert res.headers["Content-Type"] == NDJSON_MEDIA_TYPE
+                    assert parse_ndjson(res) == expected_vets
+                else:
+                    assert res.headers["Content-Type"] == "application/json"
+                    assert res.json() == expected_vets
+
+    @classmethod
+    def step_fail_to_stream_vets_with_limit_or_cursor_using_api(cls, assertion_ctx, api: TestClient) -> None:
+        # Given ***************************************************************
+        cursor = api.get(
+            f"{TEST_API_ROOT}/vets/",
+            headers={"Authorization": f"Bearer {cls.visibility_token}"},
+            params=cls.ring | {"limit": 1},
+        ).headers[NEXT_CURSOR_HEADER_NAME]
+
+        for params, accept in [
+            (cls.ring | {"format": "ndjson", "limit": 1}, None),
+            (cls.ring | {"format": "ndjson", "cursor": cursor}, None),
+            (cls.ring | {"limit": 1}, NDJSON_MEDIA_TYPE),
+            (cls.ring | {"cursor": cursor}, NDJSON_MEDIA_TYPE),
+        ]:
+            # When ************************************************************
+            res = api.get(
+                f"{TEST_API_ROOT}/vets/",
+                headers={"Authorization": f"Bearer {cls.visibility_token}"} | (
+                    {"Accept": accept} if accept is not None else {}
+                ),
+                params=params,
+            )
+
+            # Then ************************************************************
+            with assertion_ctx(
+                    f"Streamed request with {params} and {accept=} should have '400 Bad Request' status, "
+                    "since streamed responses have no next cursor"
+            ):
+                assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
 class FormCreateOrOverwriteVetRequestBodies:
     create = {
         "clinicName": "Initial Clinic Name",
@@ -550,6 +1548,44 @@ class ExpectedFormVetResponseBodies:
 
 
 def test(fastapi_client: TestClient, delete_test_collections) -> None:
+    run_steps(Steps, fastapi_client)
+
+
+def test_only_available(fastapi_client: TestClient, delete_test_collections) -> None:
+    run_steps(OnlyAvailableSteps, fastapi_client)
+
+
+def test_emergency_now(fastapi_client: TestClient, delete_test_collections) -> None:
+    run_steps(EmergencyNowSteps, fastapi_client)
+
+
+def test_ndjson(fastapi_client: TestClient, delete_test_collections) -> None:
+    run_steps(NdjsonSteps, fastapi_client)
+
+
+def test_response_cache(
+        fastapi_client: TestClient,
+        delete_test_collections,
+        override_vets_response_cache_config,
+) -> None:
+    with override_vets_response_cache_config(max_bytes=2 ** 20, center_decimals=3):
+        run_steps(ResponseCacheSteps, fastapi_client)
+
+
+def test_vet_submission_queue(
+        delete_test_collections,
+        delete_test_vet_submissions,
+        wake_vet_submission_queue_workers_only_on_submission,
+        started_fastapi_client: TestClient,
+) -> None:
+    # The startup handlers of the started client start the workers of the queue
+    run_steps(VetSubmissionQueueSteps, started_fastapi_client)
+
+
+def run_steps(steps: type, fastapi_client: TestClient) -> None:
+    """
+    Runs the class methods of `steps` prefixed with 'step_' in the order they are defined.
+    """
 
     # Helpers
     def try_run_step(step_name: str, step: Callable) -> None:
@@ -593,13 +1629,20 @@ def test(fastapi_client: TestClient, delete_test_collections) -> None:
         return member_name.startswith("step_")
 
     # Run steps
-    for step_name in filter(is_step_name, list(Steps.__dict__.keys())):
-        step = getattr(Steps, step_name)
+    for step_name in filter(is_step_name, list(steps.__dict__.keys())):
+        step = getattr(steps, step_name)
         try_run_step(step_name, step)
 
 
+@pytest.fixture(params=[False, True], ids=["per_status_vet_collections", "single_vet_collection"])
+def vet_storage_layout(request, override_vet_storage_layout) -> None:
+    """Run the test with both storage layouts, see `config.DbConfig.use_single_vet_collection`."""
+    with override_vet_storage_layout(request.param):
+        yield
+
+
 @pytest.fixture
-def delete_test_collections() -> None:
+def delete_test_collections(vet_storage_layout) -> None:
     """Remove 'software_test' collections before and after test."""
     db.delete_vet_collections("software_test")
 
@@ -608,9 +1651,209 @@ def delete_test_collections() -> None:
     db.delete_vet_collections("software_test")
 
 
+@pytest.fixture
+def delete_test_vet_submissions() -> None:
+    """Remove 'software_test' vet submissions before and after test."""
+    db.delete_vet_submissions("software_test")
+
+    yield
+
+    db.delete_vet_submissions("software_test")
+
+
+@pytest.fixture
+def wake_vet_submission_queue_workers_only_on_submission() -> None:
+    """
+    Workers usually also check for submissions of other processes in intervals.
+    Without these checks submissions queued directly in the database stay queued until the next submission
+    using the API, so tests can claim them like workers of other processes.
+    """
+    with config.use_temp_config(replace_vet_submission_queue_config(poll_interval=3600)):
+        yield
+
+
 # Helpers
 # =============================================================================
 
+def read_vet_visibility_token(visibility: str) -> str:
+    with open(paths.find_backend() / "vet_visibility_tokens.txt", "r") as f:
+        for line in f:
+            line_visibility, token = line.strip().split(":")
+            if line_visibility == visibility:
+                return token
+
+    raise ValueError(f"No token for the visibility '{visibility}'")
+
+
+def request_form_user_access_token(api: TestClient, visibility_token: str, email_address: str) -> str:
+    with use_mail_stub() as mail_stub:
+        api.post(
+            f"{TEST_API_ROOT}/form/send-vet-registration-email",
+            headers={
+                "Authorization": f"Bearer {visibility_token}",
+                'Content-Type': 'application/json'
+            },
+            json={"emailAddress": email_address},
+        )
+
+    return get_text_between_string(
+        get_url_route(mail_stub.capture_send_mail_arguments()[0].template_fill_obj["form_url"]),
+        "access-token=",
+        "&email",
+    )
+
+
+def poll_vet_submission_statuses(
+        api: TestClient,
+        form_user_access_token: str,
+        submission_id: str,
+        *,
+        timeout: float = 60,
+) -> list[str]:
+    """
+    Returns the statuses of the submission until it succeeded or failed.
+    """
+    statuses = []
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        res = api.get(
+            f"{TEST_API_ROOT}/form/vet-submission/{submission_id}",
+            headers={
+                "Authorization": f"Bearer {form_user_access_token}",
+                'Content-Type': 'application/json'
+            },
+        )
+        statuses.append(res.json()["status"])
+
+        if statuses[-1] in ("succeeded", "failed"):
+            break
+
+        time.sleep(0.05)
+
+    return statuses
+
+
+def create_vet_at(
+        lat: float,
+        lon: float,
+        *,
+        emergency_availability_condition: AvailabilityCondition | None = None,
+) -> VetCreateOrOverwrite:
+    vet = VetCreateOrOverwrite.parse_obj(FormCreateOrOverwriteVetRequestBodies.create)
+    vet.location.lat = lat
+    vet.location.lon = lon
+    vet.availability_condition = availability.convert_opening_hours_to_condition(vet.opening_hours, vet.timezone)
+    vet.emergency_availability_condition = emergency_availability_condition
+
+    return vet
+
+
+def request_only_available_vet_ids(
+        api: TestClient,
+        visibility_token: str,
+        window: tuple[datetime, datetime],
+        ring_and_page_parameters: dict[str, Any] | None = None,
+        *,
+        cursor: str | None = None,
+) -> tuple[list[str], str | None]:
+    """
+    Returns the ids of the vets available during the window and the cursor of the next page.
+    """
+    availability_from, availability_to = window
+    params = {
+        "availability_from": availability_from.isoformat(),
+        "availability_to": availability_to.isoformat(),
+        "only_available": True,
+    } | (ring_and_page_parameters or {})
+    if cursor is not None:
+        params["cursor"] = cursor
+
+    res = api.get(
+        f"{TEST_API_ROOT}/vets/",
+        headers={"Authorization": f"Bearer {visibility_token}"},
+        params=params,
+    )
+    assert res.status_code == status.HTTP_200_OK, res.text
+
+    return [vet["id"] for vet in res.json()], res.headers.get(NEXT_CURSOR_HEADER_NAME)
+
+
+def request_vets(
+        api: TestClient,
+        visibility_token: str,
+        window: tuple[datetime, datetime],
+        ring_and_page_parameters: dict[str, Any],
+        *,
+        cursor: str | None = None,
+) -> requests.Response:
+    availability_from, availability_to = window
+    params = {
+        "availability_from": availability_from.isoformat(),
+        "availability_to": availability_to.isoformat(),
+    } | ring_and_page_parameters
+    if cursor is not None:
+        params["cursor"] = cursor
+
+    res = api.get(
+        f"{TEST_API_ROOT}/vets/",
+        headers={"Authorization": f"Bearer {visibility_token}"},
+        params=params,
+    )
+    assert res.status_code == status.HTTP_200_OK, res.text
+
+    return res
+
+
+def request_emergency_vets_available_now(
+        api: TestClient,
+        visibility_token: str,
+        params: dict[str, Any],
+) -> requests.Response:
+    res = api.get(
+        f"{TEST_API_ROOT}/vets/emergency-now",
+        headers={"Authorization": f"Bearer {visibility_token}"},
+        params=params,
+    )
+    assert res.status_code == status.HTTP_200_OK, res.text
+
+    return res
+
+
+def parse_ndjson(res: requests.Response) -> list[Any]:
+    return [json.loads(line) for line in res.text.splitlines()]
+
+
+@contextmanager
+def count_vet_reads_in_ring(after_read: Callable[[], None] | None = None) -> Iterator[mock.AsyncMock]:
+    """
+    Counts the pages of vets the API reads from the database, calling `after_read` after each page was read.
+    """
+    get_verified_vets_in_ring_by_distance = db_async.get_verified_vets_in_ring_by_distance
+
+    async def read_vets_in_ring(*args: Any, **kwargs: Any) -> list[db.VetWithDistance]:
+        vets_with_distance = await get_verified_vets_in_ring_by_distance(*args, **kwargs)
+
+        if after_read is not None:
+            after_read()
+
+        return vets_with_distance
+
+    with mock.patch.object(
+            db_async,
+            "get_verified_vets_in_ring_by_distance",
+            mock.AsyncMock(side_effect=read_vets_in_ring),
+    ) as vet_reads_in_ring:
+        yield vet_reads_in_ring
+
+
+def replace_vet_submission_queue_config(**changes: Any) -> config.Config:
+    return dataclasses.replace(
+        config.get(),
+        vet_submission_queue=dataclasses.replace(config.get().vet_submission_queue, **changes),
+    )
+
+
 def tamper_with_jwt(
     jwt: str,
     replace_n_chars_in_header: int = 0,
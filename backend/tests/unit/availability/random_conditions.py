@@ -0,0 +1,106 @@
+"""
+Random availability conditions for comparing the evaluation backends of `availability`.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from dateutil.tz import gettz
+
+import availability
+from constants import WEEKDAYS
+from models import (
+    AvailabilityCondition,
+    AvailabilityConditionAll,
+    AvailabilityConditionAnd,
+    AvailabilityConditionNot,
+    AvailabilityConditionOr,
+    AvailabilityConditionTimeSpan,
+    AvailabilityConditionTimeSpanDuringDay,
+    AvailabilityConditionWeekdaysSpan,
+    TimeDuringDay,
+)
+
+TIMEZONES = ["Europe/Berlin", "America/New_York", "Australia/Sydney", "Asia/Tokyo", "UTC"]
+REFERENCE_DATETIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# Windows containing the DST transitions of the timezones above
+DST_TRANSITION_WINDOWS = [
+    (datetime(2026, 3, 26, tzinfo=gettz("Europe/Berlin")), datetime(2026, 4, 2, tzinfo=gettz("Europe/Berlin"))),
+    (datetime(2026, 10, 22, tzinfo=gettz("Europe/Berlin")), datetime(2026, 10, 29, tzinfo=gettz("Europe/Berlin"))),
+    (datetime(2026, 3, 6, tzinfo=gettz("America/New_York")), datetime(2026, 3, 11, tzinfo=gettz("America/New_York"))),
+    (datetime(2026, 10, 30, tzinfo=gettz("America/New_York")), datetime(2026, 11, 4, tzinfo=gettz("America/New_York"))),
+    (datetime(2026, 4, 2, tzinfo=gettz("Australia/Sydney")), datetime(2026, 4, 7, tzinfo=gettz("Australia/Sydney"))),
+    (datetime(2026, 10, 1, tzinfo=gettz("Australia/Sydney")), datetime(2026, 10, 6, tzinfo=gettz("Australia/Sydney"))),
+]
+
+
+def _create_random_leaf_condition(rng: random.Random) -> AvailabilityCondition:
+    timezone_ = rng.choice(TIMEZONES)
+    condition_type = rng.choice(["time_span_during_day", "weekdays", "time_span", "all"])
+
+    if condition_type == "time_span_during_day":
+        return AvailabilityConditionTimeSpanDuringDay(
+            # Includes the hours of the DST transitions and time spans ending on the next day
+            start_time=TimeDuringDay(hour=rng.randrange(24), minute=rng.choice([0, 30])),
+            end_time=TimeDuringDay(hour=rng.randrange(24), minute=rng.choice([0, 30])),
+            timezone=timezone_,
+        )
+    elif condition_type == "weekdays":
+        start_index, end_index = sorted(rng.sample(range(len(WEEKDAYS)), 2))
+
+        return AvailabilityConditionWeekdaysSpan(
+            start_day=WEEKDAYS[start_index],
+            end_day=WEEKDAYS[end_index],
+            timezone=timezone_,
+        )
+    elif condition_type == "time_span":
+        start = REFERENCE_DATETIME + timedelta(days=rng.uniform(0, 365))
+
+        return AvailabilityConditionTimeSpan(
+            start=start,
+            end=start + timedelta(hours=rng.uniform(1, 24 * 30)),
+            timezone=timezone_,
+        )
+
+    return AvailabilityConditionAll(type="all")
+
+
+def create_random_condition(rng: random.Random, depth: int = 0) -> AvailabilityCondition:
+    if depth > 2 or rng.random() < 0.3:
+        return _create_random_leaf_condition(rng)
+
+    condition_type = rng.choice(["and", "or", "not"])
+
+    if condition_type == "not":
+        return AvailabilityConditionNot(child=create_random_condition(rng, depth + 1))
+
+    children = [create_random_condition(rng, depth + 1) for _ in range(rng.randint(1, 3))]
+
+    if condition_type == "and":
+        return AvailabilityConditionAnd(children=children)
+
+    return AvailabilityConditionOr(children=children)
+
+
+def normalize(time_spans: list[availability.Interval]) -> list[tuple[datetime, datetime]]:
+    """
+    Merges adjacent time spans and converts them to UTC.
+
+    Datetimes in the ambiguous hour at the end of DST never compare equal
+    to datetimes in other timezones, so only UTC datetimes are compared.
+    """
+    result: list[tuple[datetime, datetime]] = []
+
+    for start, end in sorted(
+            (time_span.start.astimezone(timezone.utc), time_span.end.astimezone(timezone.utc))
+            for time_span in time_spans
+    ):
+        if start >= end:
+            continue
+
+        if result and start <= result[-1][1]:
+            result[-1] = (result[-1][0], max(result[-1][1], end))
+        else:
+            result.append((start, end))
+
+    return result
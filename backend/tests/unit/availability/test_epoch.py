@@ -0,0 +1,90 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from dateutil.tz import gettz
+
+import availability
+from models import (
+    AvailabilityCondition,
+    AvailabilityConditionOr,
+    AvailabilityConditionTimeSpanDuringDay,
+    AvailabilityConditionWeekdaysSpan,
+    TimeDuringDay,
+)
+from . import random_conditions
+
+_BACKENDS = pytest.mark.parametrize("backend", ["datetime", "epoch"])
+
+
+def _get_time_spans_with_generators(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: AvailabilityCondition,
+) -> list[availability.Interval]:
+    return list(availability._get_time_spans_from_condition(
+        availability._datetime_in_reference_tz(lower_bound),
+        availability._datetime_in_reference_tz(upper_bound),
+        condition,
+    ))
+
+
+class TestEvaluationBackends:
+
+    @_BACKENDS
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_generators_for_random_conditions(self, seed: int, backend: availability.EvaluationBackend) -> None:
+        rng = random.Random(seed)
+
+        for _ in range(100):
+            condition = random_conditions.create_random_condition(rng)
+            lower_bound = random_conditions.REFERENCE_DATETIME + timedelta(days=rng.uniform(0, 365))
+            upper_bound = lower_bound + timedelta(days=rng.uniform(0, 40))
+
+            expected = _get_time_spans_with_generators(lower_bound, upper_bound, condition)
+            actual = list(availability.get_time_spans(lower_bound, upper_bound, condition, backend=backend))
+
+            assert random_conditions.normalize(actual) == random_conditions.normalize(expected), condition.json()
+
+    @_BACKENDS
+    @pytest.mark.parametrize("lower_bound,upper_bound", random_conditions.DST_TRANSITION_WINDOWS)
+    @pytest.mark.parametrize("timezone_", random_conditions.TIMEZONES)
+    def test_matches_generators_around_dst_transitions(
+            self,
+            lower_bound: datetime,
+            upper_bound: datetime,
+            timezone_: str,
+            backend: availability.EvaluationBackend,
+    ) -> None:
+        for start_hour in range(24):
+            for end_hour in [0, 1, 2, 3, 4, 12, 23]:
+                condition = AvailabilityConditionTimeSpanDuringDay(
+                    start_time=TimeDuringDay(hour=start_hour, minute=30),
+                    end_time=TimeDuringDay(hour=end_hour, minute=0),
+                    timezone=timezone_,
+                )
+
+                expected = _get_time_spans_with_generators(lower_bound, upper_bound, condition)
+                actual = list(availability.get_time_spans(lower_bound, upper_bound, condition, backend=backend))
+
+                assert random_conditions.normalize(actual) == random_conditions.normalize(expected), condition.json()
+
+
+class TestEpochBackend:
+
+    def test_returns_sorted_disjoint_time_spans_in_reference_timezone(self) -> None:
+        condition = AvailabilityConditionOr(children=[
+            AvailabilityConditionWeekdaysSpan(start_day="Mon", end_day="Tue", timezone="Europe/Berlin"),
+            AvailabilityConditionWeekdaysSpan(start_day="Tue", end_day="Wed", timezone="Europe/Berlin"),
+        ])
+        lower_bound = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+        time_spans = list(availability.get_time_spans(
+            lower_bound,
+            lower_bound + timedelta(days=13),
+            condition,
+            backend="epoch",
+        ))
+
+        assert [(time_span.start.day, time_span.end.day) for time_span in time_spans] == [(1, 4), (8, 11)]
+        assert all(time_span.start.tzinfo == gettz("Europe/Berlin") for time_span in time_spans)
@@ -0,0 +1,258 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+import pytest
+
+import availability
+from availability import Interval
+
+_LOWER_BOUND = datetime(2026, 6, 1, tzinfo=timezone.utc)
+_UPPER_BOUND = _LOWER_BOUND + timedelta(hours=24)
+
+
+def _at(hour: float) -> datetime:
+    return _LOWER_BOUND + timedelta(hours=hour)
+
+
+def _intervals(*hours: tuple[float, float]) -> list[Interval]:
+    return [Interval(start=_at(start), end=_at(end)) for start, end in hours]
+
+
+def _create_random_intervals(rng: random.Random) -> list[Interval]:
+    intervals = []
+
+    for _ in range(rng.randint(0, 8)):
+        # Whole hours, so that intervals often touch each other, and some outside the bounds
+        start = rng.randint(-4, 26)
+        intervals.append(Interval(start=_at(start), end=_at(start + rng.randint(0, 6))))
+
+    return intervals
+
+
+def _or_with_apply_or_single(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        time_spans: Iterable[Interval],
+) -> list[Interval]:
+    """
+    The union as it was computed before `_or_operation` sorted and swept the time spans.
+    """
+    result: list[Interval] = []
+
+    for time_span in sorted(time_spans):
+        time_span = Interval(
+            start=max(lower_bound, time_span.start),
+            end=min(time_span.end, upper_bound),
+        )
+        new_result = []
+
+        for existing_time_span in result:
+            is_joined = (
+                    time_span.start <= existing_time_span.start <= time_span.end
+                    or time_span.start <= existing_time_span.end <= time_span.end
+            )
+
+            if is_joined:
+                time_span = Interval(
+                    start=min(existing_time_span.start, time_span.start),
+                    end=max(existing_time_span.end, time_span.end),
+                )
+            else:
+                new_result.append(existing_time_span)
+
+        new_result.append(time_span)
+        result = new_result
+
+    return _normalize(result)
+
+
+def _and_with_apply_or_single(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        time_spans_per_operand: list[list[Interval]],
+) -> list[Interval]:
+    """
+    The intersection as it was computed before `_and_operation`, using de morgan's laws.
+    """
+    return _normalize(availability._not_operation(
+        lower_bound,
+        upper_bound,
+        _or_with_apply_or_single(
+            lower_bound,
+            upper_bound,
+            (
+                time_span
+                for time_spans in time_spans_per_operand
+                for time_span in availability._not_operation(
+                    lower_bound,
+                    upper_bound,
+                    _or_with_apply_or_single(lower_bound, upper_bound, time_spans),
+                )
+            ),
+        ),
+    ))
+
+
+def _normalize(time_spans: Iterable[Interval]) -> list[Interval]:
+    """
+    Drops empty time spans and merges overlapping and touching time spans.
+    """
+    result: list[Interval] = []
+
+    for time_span in sorted(time_spans):
+        if time_span.start >= time_span.end:
+            continue
+
+        if result and time_span.start <= result[-1].end:
+            result[-1] = Interval(start=result[-1].start, end=max(result[-1].end, time_span.end))
+        else:
+            result.append(time_span)
+
+    return result
+
+
+class TestOrOperation:
+
+    @pytest.mark.parametrize("time_spans,expected", [
+        ([], []),
+        (_intervals((1, 3), (2, 5)), _intervals((1, 5))),
+        (_intervals((1, 3), (3, 5)), _intervals((1, 5))),
+        (_intervals((1, 8), (2, 3)), _intervals((1, 8))),
+        (_intervals((6, 7), (1, 2), (4, 5)), _intervals((1, 2), (4, 5), (6, 7))),
+        (_intervals((4, 4), (1, 2)), _intervals((1, 2))),
+        (_intervals((-3, 1), (23, 26)), _intervals((0, 1), (23, 24))),
+        (_intervals((-3, -1), (24, 26)), []),
+    ], ids=[
+        "empty",
+        "overlapping",
+        "touching",
+        "contained",
+        "unsorted",
+        "empty_time_span",
+        "clamped_to_bounds",
+        "outside_bounds",
+    ])
+    def test_returns_sorted_disjoint_union(self, time_spans: list[Interval], expected: list[Interval]) -> None:
+        assert availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, time_spans) == expected
+
+    def test_accepts_iterator(self) -> None:
+        assert availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, iter(_intervals((2, 3), (1, 2)))) == (
+            _intervals((1, 3))
+        )
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_equals_apply_or_single_for_random_time_spans(self, seed: int) -> None:
+        rng = random.Random(seed)
+
+        for _ in range(200):
+            time_spans = _create_random_intervals(rng)
+
+            assert availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, time_spans) == _or_with_apply_or_single(
+                _LOWER_BOUND,
+                _UPPER_BOUND,
+                time_spans,
+            ), time_spans
+
+
+class TestAndOperation:
+
+    @pytest.mark.parametrize("time_spans_per_operand,expected", [
+        ([], _intervals((0, 24))),
+        ([[]], []),
+        ([_intervals((1, 5)), []], []),
+        ([_intervals((1, 5))], _intervals((1, 5))),
+        ([_intervals((1, 5)), _intervals((3, 8))], _intervals((3, 5))),
+        ([_intervals((1, 3)), _intervals((3, 5))], []),
+        ([_intervals((1, 3), (3, 5)), _intervals((2, 4))], _intervals((2, 4))),
+        ([_intervals((1, 3), (2, 6)), _intervals((2, 4), (5, 9))], _intervals((2, 4), (5, 6))),
+        ([_intervals((1, 9)), _intervals((2, 8)), _intervals((0, 3), (7, 10))], _intervals((2, 3), (7, 8))),
+        ([_intervals((-3, 2), (22, 26)), _intervals((-1, 26))], _intervals((0, 2), (22, 24))),
+    ], ids=[
+        "no_operands",
+        "empty_operand",
+        "one_empty_operand",
+        "one_operand",
+        "overlapping",
+        "touching",
+        "touching_within_operand",
+        "overlapping_within_operand",
+        "three_operands",
+        "clamped_to_bounds",
+    ])
+    def test_returns_sorted_disjoint_intersection(
+            self,
+            time_spans_per_operand: list[list[Interval]],
+            expected: list[Interval],
+    ) -> None:
+        assert availability._and_operation(_LOWER_BOUND, _UPPER_BOUND, time_spans_per_operand) == expected
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_equals_apply_or_single_for_random_time_spans(self, seed: int) -> None:
+        rng = random.Random(seed)
+
+        for _ in range(200):
+            time_spans_per_operand = [_create_random_intervals(rng) for _ in range(rng.randint(1, 4))]
+
+            assert availability._and_operation(
+                _LOWER_BOUND,
+                _UPPER_BOUND,
+                time_spans_per_operand,
+            ) == _and_with_apply_or_single(
+                _LOWER_BOUND,
+                _UPPER_BOUND,
+                time_spans_per_operand,
+            ), time_spans_per_operand
+
+
+class TestNestedOperations:
+
+    def test_and_of_or_and_not(self) -> None:
+        # (1-4 or 3-9) and not (5-6 or 8-12)
+        time_spans = availability._and_operation(_LOWER_BOUND, _UPPER_BOUND, [
+            availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, _intervals((1, 4), (3, 9))),
+            availability._not_operation(
+                _LOWER_BOUND,
+                _UPPER_BOUND,
+                availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, _intervals((5, 6), (8, 12))),
+            ),
+        ])
+
+        assert time_spans == _intervals((1, 5), (6, 8))
+
+    def test_or_of_ands(self) -> None:
+        # (1-4 and 2-6) or (3-8 and 7-10) or not 0-20
+        time_spans = availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, [
+            *availability._and_operation(_LOWER_BOUND, _UPPER_BOUND, [_intervals((1, 4)), _intervals((2, 6))]),
+            *availability._and_operation(_LOWER_BOUND, _UPPER_BOUND, [_intervals((3, 8)), _intervals((7, 10))]),
+            *availability._not_operation(_LOWER_BOUND, _UPPER_BOUND, _intervals((0, 20))),
+        ])
+
+        assert time_spans == _intervals((2, 4), (7, 8), (20, 24))
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_equal_apply_or_single_for_random_nesting(self, seed: int) -> None:
+        rng = random.Random(seed)
+
+        for _ in range(100):
+            operands = [_create_random_intervals(rng) for _ in range(rng.randint(1, 3))]
+
+            # (not the first operand) or (all operands)
+            time_spans = availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, [
+                *availability._not_operation(
+                    _LOWER_BOUND,
+                    _UPPER_BOUND,
+                    availability._or_operation(_LOWER_BOUND, _UPPER_BOUND, operands[0]),
+                ),
+                *availability._and_operation(_LOWER_BOUND, _UPPER_BOUND, operands),
+            ])
+            expected = _or_with_apply_or_single(_LOWER_BOUND, _UPPER_BOUND, [
+                *availability._not_operation(
+                    _LOWER_BOUND,
+                    _UPPER_BOUND,
+                    _or_with_apply_or_single(_LOWER_BOUND, _UPPER_BOUND, operands[0]),
+                ),
+                *_and_with_apply_or_single(_LOWER_BOUND, _UPPER_BOUND, operands),
+            ])
+
+            assert time_spans == expected, operands
@@ -0,0 +1,86 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import availability
+from models import (
+    AvailabilityCondition,
+    AvailabilityConditionTimeSpanDuringDay,
+    TimeDuringDay,
+)
+from . import random_conditions
+
+
+def _get_instants_to_check(
+        rng: random.Random,
+        lower_bound: datetime,
+        upper_bound: datetime,
+        time_spans: list[tuple[datetime, datetime]],
+) -> list[datetime]:
+    """
+    Returns random instants in the bounds and the instants at and right before the ends of the time spans,
+    where `is_available_at` and `get_time_spans` disagree most likely.
+    """
+    instants = [lower_bound + (upper_bound - lower_bound) * rng.random() for _ in range(20)]
+
+    for start, end in time_spans:
+        instants += [start, start - timedelta(microseconds=1), end, end - timedelta(microseconds=1)]
+
+    return [instant for instant in instants if lower_bound <= instant < upper_bound]
+
+
+def _assert_is_available_at_matches_time_spans(
+        rng: random.Random,
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: AvailabilityCondition,
+) -> None:
+    time_spans = random_conditions.normalize(list(availability.get_time_spans(lower_bound, upper_bound, condition)))
+
+    for instant in _get_instants_to_check(rng, lower_bound, upper_bound, time_spans):
+        is_in_time_spans = any(start <= instant < end for start, end in time_spans)
+
+        assert availability.is_available_at(condition, instant) == is_in_time_spans, (
+            condition.json(),
+            instant.isoformat(),
+        )
+
+
+class TestIsAvailableAt:
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_time_spans_for_random_conditions(self, seed: int) -> None:
+        rng = random.Random(seed)
+
+        for _ in range(100):
+            condition = random_conditions.create_random_condition(rng)
+            lower_bound = random_conditions.REFERENCE_DATETIME + timedelta(days=rng.uniform(0, 365))
+            upper_bound = lower_bound + timedelta(days=rng.uniform(0, 40))
+
+            _assert_is_available_at_matches_time_spans(rng, lower_bound, upper_bound, condition)
+
+    @pytest.mark.parametrize("lower_bound,upper_bound", random_conditions.DST_TRANSITION_WINDOWS)
+    @pytest.mark.parametrize("timezone_", random_conditions.TIMEZONES)
+    def test_matches_time_spans_around_dst_transitions(
+            self,
+            lower_bound: datetime,
+            upper_bound: datetime,
+            timezone_: str,
+    ) -> None:
+        rng = random.Random(0)
+
+        for start_hour in range(0, 24, 3):
+            for end_hour in [0, 2, 3, 12, 23]:
+                condition = AvailabilityConditionTimeSpanDuringDay(
+                    start_time=TimeDuringDay(hour=start_hour, minute=30),
+                    end_time=TimeDuringDay(hour=end_hour, minute=0),
+                    timezone=timezone_,
+                )
+
+                _assert_is_available_at_matches_time_spans(
+                    rng,
+                    lower_bound.astimezone(timezone.utc),
+                    upper_bound.astimezone(timezone.utc),
+                    condition,
+                )
@@ -0,0 +1,162 @@
+import random
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import availability
+from availability.process_pool import ProcessPool
+from models import AvailabilityCondition, AvailabilityConditionOr, AvailabilityConditionTimeSpan
+from . import random_conditions
+
+_LOWER_BOUND = random_conditions.REFERENCE_DATETIME + timedelta(days=80)
+_UPPER_BOUND = _LOWER_BOUND + timedelta(days=30)
+
+
+@pytest.fixture(scope="module")
+def process_pool() -> ProcessPool:
+    process_pool = ProcessPool(max_workers=2)
+
+    yield process_pool
+
+    process_pool.shutdown()
+
+
+@pytest.fixture
+def submitted_shards(process_pool, monkeypatch) -> list[list[str]]:
+    """
+    Records the condition JSONs of each shard sent to a worker.
+    """
+    shards = []
+    submit = process_pool._executor.submit
+
+    def record_shard(fn, lower_bound, upper_bound, condition_jsons) -> Future:
+        shards.append(condition_jsons)
+
+        return submit(fn, lower_bound, upper_bound, condition_jsons)
+
+    monkeypatch.setattr(process_pool._executor, "submit", record_shard)
+
+    return shards
+
+
+def _create_random_conditions(seed: int, count: int) -> list[AvailabilityCondition]:
+    rng = random.Random(seed)
+    conditions = {}
+
+    while len(conditions) < count:
+        condition = random_conditions.create_random_condition(rng)
+        conditions[condition.json()] = condition
+
+    return list(conditions.values())
+
+
+def _create_time_span_conditions(count: int) -> list[AvailabilityCondition]:
+    # Starts and ends with microseconds, in timezones with offsets that are no full hours
+    return [
+        AvailabilityConditionTimeSpan(
+            start=_LOWER_BOUND + timedelta(days=index, microseconds=123_457 * index),
+            end=_LOWER_BOUND + timedelta(days=index + 1, hours=5, microseconds=999_999 - index),
+            timezone=["Asia/Kolkata", "Australia/Adelaide", "America/St_Johns"][index % 3],
+        )
+        for index in range(count)
+    ]
+
+
+def _with_duplicates(conditions: list[AvailabilityCondition], seed: int) -> list[AvailabilityCondition]:
+    rng = random.Random(seed)
+    conditions_with_duplicates = conditions + rng.choices(conditions, k=len(conditions))
+    rng.shuffle(conditions_with_duplicates)
+
+    return conditions_with_duplicates
+
+
+class TestGetTimeSpans:
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_get_time_spans_for_random_conditions(self, seed: int, process_pool, submitted_shards) -> None:
+        conditions = _with_duplicates(_create_random_conditions(seed, 40), seed)
+
+        time_spans_per_condition = process_pool.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, conditions)
+
+        assert len(submitted_shards) == 2
+        assert len(time_spans_per_condition) == len(conditions)
+
+        for condition, time_spans in zip(conditions, time_spans_per_condition):
+            assert time_spans == list(availability.get_time_spans(
+                _LOWER_BOUND,
+                _UPPER_BOUND,
+                condition,
+                backend="epoch",
+            )), condition.json()
+            assert random_conditions.normalize(time_spans) == random_conditions.normalize(list(
+                availability.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, condition),
+            )), condition.json()
+
+    def test_evaluates_each_condition_once_in_round_robin_shards(self, process_pool, submitted_shards) -> None:
+        unique_conditions = _create_random_conditions(0, 20)
+        conditions = [condition for condition in unique_conditions for _ in range(3)]
+
+        time_spans_per_condition = process_pool.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, conditions)
+
+        unique_condition_jsons = [condition.json() for condition in unique_conditions]
+
+        assert submitted_shards == [unique_condition_jsons[0::2], unique_condition_jsons[1::2]]
+
+        # Vets sharing a condition get equal, but separate lists
+        for index in range(0, len(conditions), 3):
+            first, second, third = time_spans_per_condition[index:index + 3]
+
+            assert first == second == third
+            assert first is not second and second is not third
+
+    def test_evaluates_few_conditions_in_requesting_process(self, process_pool, submitted_shards) -> None:
+        # 15 distinct conditions do not fill two shards of the minimum size
+        conditions = _with_duplicates(_create_random_conditions(1, 15), 1)
+
+        time_spans_per_condition = process_pool.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, conditions)
+
+        assert submitted_shards == []
+        assert time_spans_per_condition == [
+            list(availability.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, condition))
+            for condition in conditions
+        ]
+
+    def test_keeps_microseconds_through_int64_round_trip(self, process_pool, submitted_shards) -> None:
+        conditions = _create_time_span_conditions(17)
+        # An evaluation across the whole range of the conditions as well
+        conditions.append(AvailabilityConditionOr(children=conditions[::2]))
+
+        time_spans_per_condition = process_pool.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, conditions)
+
+        assert len(submitted_shards) == 2
+
+        for condition, time_spans in zip(conditions, time_spans_per_condition):
+            expected = list(availability.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, condition))
+
+            assert [
+                (time_span.start.astimezone(timezone.utc), time_span.end.astimezone(timezone.utc))
+                for time_span in time_spans
+            ] == [
+                (time_span.start.astimezone(timezone.utc), time_span.end.astimezone(timezone.utc))
+                for time_span in expected
+            ], condition.json()
+            assert all(time_span.end.microsecond for time_span in time_spans)
+
+    def test_returns_empty_list_for_no_conditions(self, process_pool) -> None:
+        assert process_pool.get_time_spans(_LOWER_BOUND, _UPPER_BOUND, []) == []
+
+    def test_rejects_naive_bounds(self, process_pool) -> None:
+        with pytest.raises(ValueError):
+            process_pool.get_time_spans(
+                datetime(2026, 3, 1),
+                datetime(2026, 3, 2),
+                _create_time_span_conditions(1),
+            )
+
+
+class TestInit:
+
+    def test_rejects_less_than_one_worker(self) -> None:
+        with pytest.raises(ValueError):
+            ProcessPool(max_workers=0)
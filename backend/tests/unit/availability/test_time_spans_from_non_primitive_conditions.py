@@ -0,0 +1,117 @@
+from datetime import datetime
+
+from dateutil.tz import gettz
+
+import availability
+from availability import time_spans_from_non_primitive_conditions
+from models import AvailabilityConditionTimeSpan, AvailabilityConditionTimeSpanDuringDay, TimeDuringDay
+
+_TIMEZONE = "Europe/Berlin"
+
+
+def _create_datetime(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 6, day, hour, minute, tzinfo=gettz(_TIMEZONE))
+
+
+def _get_time_spans(
+        lower_bound: datetime,
+        upper_bound: datetime,
+        condition: AvailabilityConditionTimeSpan | AvailabilityConditionTimeSpanDuringDay,
+) -> list[tuple[datetime, datetime]]:
+    return [
+        (time_span.start, time_span.end)
+        for time_span in availability.get_time_spans(lower_bound, upper_bound, condition)
+    ]
+
+
+class TestTimeSpan:
+
+    def test_is_clamped_to_bounds(self) -> None:
+        condition = AvailabilityConditionTimeSpan(
+            start=_create_datetime(1, 10),
+            end=_create_datetime(3, 12),
+            timezone=_TIMEZONE,
+        )
+
+        assert list(time_spans_from_non_primitive_conditions.time_span(
+            _create_datetime(2, 0),
+            _create_datetime(2, 18),
+            condition,
+        )) == [availability.Interval(start=_create_datetime(2, 0), end=_create_datetime(2, 18))]
+
+    def test_is_not_widened_to_bounds(self) -> None:
+        # Clamping with min/max swapped used to return the bounds, so the condition was always true
+        condition = AvailabilityConditionTimeSpan(
+            start=_create_datetime(2, 10),
+            end=_create_datetime(2, 12),
+            timezone=_TIMEZONE,
+        )
+
+        assert _get_time_spans(_create_datetime(1, 0), _create_datetime(4, 0), condition) == [
+            (_create_datetime(2, 10), _create_datetime(2, 12)),
+        ]
+
+    def test_outside_of_bounds_is_empty(self) -> None:
+        condition = AvailabilityConditionTimeSpan(
+            start=_create_datetime(2, 10),
+            end=_create_datetime(2, 12),
+            timezone=_TIMEZONE,
+        )
+
+        assert _get_time_spans(_create_datetime(3, 0), _create_datetime(4, 0), condition) == []
+        # Touching the bounds does not overlap the half-open interval
+        assert list(time_spans_from_non_primitive_conditions.time_span(
+            _create_datetime(2, 12),
+            _create_datetime(2, 18),
+            condition,
+        )) == []
+        assert not availability.is_available_at(condition, _create_datetime(2, 12))
+
+
+class TestTimeSpanDuringDay:
+
+    def test_ends_on_next_day_if_end_time_is_before_start_time(self) -> None:
+        # E.g. an overnight emergency service
+        condition = AvailabilityConditionTimeSpanDuringDay(
+            start_time=TimeDuringDay(hour=22, minute=0),
+            end_time=TimeDuringDay(hour=2, minute=30),
+            timezone=_TIMEZONE,
+        )
+
+        assert _get_time_spans(_create_datetime(1, 0), _create_datetime(3, 0), condition) == [
+            # The time span of the previous day reaches into the bounds
+            (_create_datetime(1, 0), _create_datetime(1, 2, 30)),
+            (_create_datetime(1, 22), _create_datetime(2, 2, 30)),
+            (_create_datetime(2, 22), _create_datetime(3, 0)),
+        ]
+        assert availability.is_available_at(condition, _create_datetime(2, 1))
+        assert not availability.is_available_at(condition, _create_datetime(2, 12))
+
+    def test_generated_time_spans_end_after_start(self) -> None:
+        condition = AvailabilityConditionTimeSpanDuringDay(
+            start_time=TimeDuringDay(hour=22, minute=0),
+            end_time=TimeDuringDay(hour=2, minute=30),
+            timezone=_TIMEZONE,
+        )
+
+        time_spans = list(time_spans_from_non_primitive_conditions.time_span_during_day(
+            _create_datetime(1, 12),
+            _create_datetime(4, 12),
+            condition,
+        ))
+
+        assert time_spans
+        assert all(time_span.end - time_span.start == _create_datetime(2, 2, 30) - _create_datetime(1, 22)
+                   for time_span in time_spans)
+
+    def test_ends_on_same_day_if_end_time_is_after_start_time(self) -> None:
+        condition = AvailabilityConditionTimeSpanDuringDay(
+            start_time=TimeDuringDay(hour=8, minute=0),
+            end_time=TimeDuringDay(hour=12, minute=0),
+            timezone=_TIMEZONE,
+        )
+
+        assert _get_time_spans(_create_datetime(1, 0), _create_datetime(3, 0), condition) == [
+            (_create_datetime(1, 8), _create_datetime(1, 12)),
+            (_create_datetime(2, 8), _create_datetime(2, 12)),
+        ]
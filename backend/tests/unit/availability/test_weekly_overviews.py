@@ -0,0 +1,165 @@
+from datetime import datetime
+
+import pytest
+from dateutil.tz import gettz
+
+import availability
+from models import (
+    AvailabilityCondition,
+    AvailabilityConditionTimeSpan,
+    OpeningHoursInformation,
+)
+from utils import cache
+
+_TIMEZONE = "Europe/Berlin"
+# Thursday of the ISO week 2026-W11, the current week is Monday 2026-03-09 to Sunday 2026-03-15
+_NOW = datetime(2026, 3, 12, 12)
+
+
+class _FrozenDatetime(datetime):
+    frozen_now = _NOW
+
+    @classmethod
+    def now(cls, tz=None) -> datetime:
+        return cls.frozen_now
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch) -> type[_FrozenDatetime]:
+    _FrozenDatetime.frozen_now = _NOW
+    monkeypatch.setattr(availability, "datetime", _FrozenDatetime)
+
+    return _FrozenDatetime
+
+
+@pytest.fixture(autouse=True)
+def weekly_overviews(monkeypatch) -> cache.LruCache:
+    weekly_overviews = cache.LruCache(max_size=100)
+    monkeypatch.setattr(availability, "_weekly_overviews", weekly_overviews)
+
+    return weekly_overviews
+
+
+@pytest.fixture
+def computed_weekdays(monkeypatch) -> list[str]:
+    """
+    Records the weekdays whose time spans are computed, i.e. the weekdays of cache misses.
+    """
+    computed_weekdays = []
+    get_time_spans_during_weekday = availability._get_times_spans_during_weekday_in_current_week_24_hour_clock
+
+    def get_time_spans_during_weekday_and_record(weekday, *args):
+        computed_weekdays.append(weekday)
+
+        return get_time_spans_during_weekday(weekday, *args)
+
+    monkeypatch.setattr(
+        availability,
+        "_get_times_spans_during_weekday_in_current_week_24_hour_clock",
+        get_time_spans_during_weekday_and_record,
+    )
+
+    return computed_weekdays
+
+
+def _create_condition(opening_hour: int) -> AvailabilityCondition:
+    return availability.convert_opening_hours_to_condition(
+        {
+            "Mon": OpeningHoursInformation(from_=f"{opening_hour:02}:00", to=f"{opening_hour + 1:02}:00"),
+        },
+        _TIMEZONE,
+    )
+
+
+class TestGetTimesDuringCurrentWeek24HourClock:
+
+    def test_computes_overview_once_per_condition_content(self, computed_weekdays) -> None:
+        overview = availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)
+        computed_weekday_count = len(computed_weekdays)
+
+        # An equal condition, e.g. of the same vet read again
+        cached_overview = availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)
+
+        assert computed_weekday_count == 7
+        assert len(computed_weekdays) == computed_weekday_count
+        assert cached_overview == overview
+
+    def test_uses_passed_condition_hash(self, computed_weekdays, monkeypatch) -> None:
+        condition = _create_condition(8)
+        condition_hash = availability.get_condition_hash(condition)
+
+        availability.get_times_during_current_week_24_hour_clock(condition, _TIMEZONE, condition_hash=condition_hash)
+
+        def fail_to_get_condition_hash(_: AvailabilityCondition) -> bytes:
+            raise AssertionError("The condition should not be serialized on a cache hit")
+
+        monkeypatch.setattr(availability, "get_condition_hash", fail_to_get_condition_hash)
+
+        availability.get_times_during_current_week_24_hour_clock(condition, _TIMEZONE, condition_hash=condition_hash)
+
+        assert len(computed_weekdays) == 7
+
+    def test_shows_time_spans_on_their_weekday(self) -> None:
+        overview = availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)
+
+        assert [time_span.digital_clock_string for time_span in overview["Mon"]] == ["08:00-09:00"]
+        assert not any(time_spans for weekday, time_spans in overview.items() if weekday != "Mon")
+
+    def test_callers_can_not_modify_cached_overview(self) -> None:
+        overview = availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)
+        overview["Mon"].clear()
+
+        assert availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)["Mon"]
+
+    def test_computes_overview_again_in_next_week(self, computed_weekdays, frozen_now) -> None:
+        # Only available in the week of `_NOW`
+        condition = AvailabilityConditionTimeSpan(
+            start=datetime(2026, 3, 9, tzinfo=gettz(_TIMEZONE)),
+            end=datetime(2026, 3, 16, tzinfo=gettz(_TIMEZONE)),
+            timezone=_TIMEZONE,
+        )
+
+        overview = availability.get_times_during_current_week_24_hour_clock(condition, _TIMEZONE)
+
+        frozen_now.frozen_now = datetime(2026, 3, 15, 12)
+        same_week_overview = availability.get_times_during_current_week_24_hour_clock(condition, _TIMEZONE)
+        computed_weekday_count = len(computed_weekdays)
+
+        frozen_now.frozen_now = datetime(2026, 3, 16, 12)
+        next_week_overview = availability.get_times_during_current_week_24_hour_clock(condition, _TIMEZONE)
+
+        assert same_week_overview == overview
+        assert computed_weekday_count == 7
+        assert len(computed_weekdays) == 14
+        assert all(overview.values())
+        assert not any(next_week_overview.values())
+
+    def test_evicts_least_recently_used_overview(self, computed_weekdays, monkeypatch) -> None:
+        weekly_overviews = cache.LruCache(max_size=2)
+        monkeypatch.setattr(availability, "_weekly_overviews", weekly_overviews)
+
+        for opening_hour in (8, 9, 10):
+            availability.get_times_during_current_week_24_hour_clock(_create_condition(opening_hour), _TIMEZONE)
+
+        assert len(weekly_overviews) == 2
+
+        # The overview of the most recently used condition is still cached
+        availability.get_times_during_current_week_24_hour_clock(_create_condition(10), _TIMEZONE)
+        assert len(computed_weekdays) == 21
+
+        availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)
+        assert len(computed_weekdays) == 28
+
+    def test_invalidate_cached_weekly_overviews(self, computed_weekdays) -> None:
+        availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)
+        availability.get_times_during_current_week_24_hour_clock(_create_condition(8), "UTC")
+        availability.get_times_during_current_week_24_hour_clock(_create_condition(9), _TIMEZONE)
+
+        # Removes the overviews of the condition for all timezones, but not the overviews of other conditions
+        assert availability.invalidate_cached_weekly_overviews(_create_condition(8)) == 2
+
+        availability.get_times_during_current_week_24_hour_clock(_create_condition(9), _TIMEZONE)
+        assert len(computed_weekdays) == 21
+
+        availability.get_times_during_current_week_24_hour_clock(_create_condition(8), _TIMEZONE)
+        assert len(computed_weekdays) == 28
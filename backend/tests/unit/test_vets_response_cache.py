@@ -0,0 +1,201 @@
+from datetime import datetime, timezone
+
+import pytest
+from dateutil.tz import gettz
+
+import vets_response_cache
+
+_BERLIN = gettz("Europe/Berlin")
+
+
+class _Clock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(vets_response_cache, "time", clock)
+
+    return clock
+
+
+@pytest.fixture
+def enabled_cache(override_vets_response_cache_config) -> None:
+    with override_vets_response_cache_config(max_bytes=100, max_age=60):
+        yield
+
+
+def _create_key(visibility: str = "software_test", c_lat: float = 52.5) -> vets_response_cache.Key:
+    return vets_response_cache.Key(
+        visibility=visibility,
+        c_lat=c_lat,
+        c_lon=13.4,
+        r_inner=0,
+        r_outer=10,
+        availability_from=None,
+        availability_to=None,
+        limit=None,
+        cursor=None,
+        only_available=False,
+        iso_year_and_week=(2026, 11),
+    )
+
+
+def _store(key: vets_response_cache.Key, body: bytes = b"[]", generation: int | None = None) -> None:
+    vets_response_cache.store(
+        key,
+        body,
+        {},
+        vets_response_cache.get_generation(key.visibility) if generation is None else generation,
+    )
+
+
+class TestSnapWindow:
+
+    @pytest.mark.parametrize("window,expected", [
+        (
+            (datetime(2026, 3, 12, 9, tzinfo=timezone.utc), datetime(2026, 3, 12, 17, tzinfo=timezone.utc)),
+            (datetime(2026, 3, 12, 9, tzinfo=timezone.utc), datetime(2026, 3, 12, 17, tzinfo=timezone.utc)),
+        ),
+        (
+            (datetime(2026, 3, 12, 9, 59, tzinfo=timezone.utc), datetime(2026, 3, 12, 17, 1, tzinfo=timezone.utc)),
+            (datetime(2026, 3, 12, 9, tzinfo=timezone.utc), datetime(2026, 3, 12, 18, tzinfo=timezone.utc)),
+        ),
+        (
+            (
+                datetime(2026, 3, 12, 9, 0, 0, 1, tzinfo=timezone.utc),
+                datetime(2026, 3, 12, 17, 0, 0, 1, tzinfo=timezone.utc),
+            ),
+            (datetime(2026, 3, 12, 9, tzinfo=timezone.utc), datetime(2026, 3, 12, 18, tzinfo=timezone.utc)),
+        ),
+        (
+            (datetime(2026, 3, 12, 23, 30, tzinfo=timezone.utc), datetime(2026, 3, 12, 23, 45, tzinfo=timezone.utc)),
+            (datetime(2026, 3, 12, 23, tzinfo=timezone.utc), datetime(2026, 3, 13, 0, tzinfo=timezone.utc)),
+        ),
+        (
+            # Converted to UTC, so offsets that are no full hours are snapped to full hours in UTC
+            (
+                datetime(2026, 3, 12, 12, 15, tzinfo=gettz("Asia/Kolkata")),
+                datetime(2026, 3, 12, 13, 15, tzinfo=_BERLIN),
+            ),
+            (datetime(2026, 3, 12, 6, tzinfo=timezone.utc), datetime(2026, 3, 12, 13, tzinfo=timezone.utc)),
+        ),
+    ], ids=["full_hours", "minutes", "microseconds", "until_midnight", "other_timezones"])
+    def test_extends_window_to_full_hours_in_utc(
+            self,
+            window: tuple[datetime, datetime],
+            expected: tuple[datetime, datetime],
+    ) -> None:
+        snapped_window = vets_response_cache.snap_window(*window)
+
+        assert snapped_window == expected
+        assert all(dt.tzinfo == timezone.utc for dt in snapped_window)
+
+    def test_windows_in_same_hours_are_snapped_to_same_window(self) -> None:
+        assert vets_response_cache.snap_window(
+            datetime(2026, 3, 12, 10, 1, tzinfo=_BERLIN),
+            datetime(2026, 3, 12, 15, 59, tzinfo=_BERLIN),
+        ) == vets_response_cache.snap_window(
+            datetime(2026, 3, 12, 10, 59, tzinfo=_BERLIN),
+            datetime(2026, 3, 12, 15, 1, tzinfo=_BERLIN),
+        )
+
+
+class TestRoundCoordinate:
+
+    @pytest.mark.usefixtures("enabled_cache")
+    def test_rounds_to_center_decimals(self, override_vets_response_cache_config) -> None:
+        with override_vets_response_cache_config(center_decimals=2):
+            assert vets_response_cache.round_coordinate(52.52437) == 52.52
+            assert vets_response_cache.round_coordinate(13.41553) == 13.42
+
+
+@pytest.mark.usefixtures("enabled_cache")
+class TestStore:
+
+    def test_stores_response(self, clock) -> None:
+        key = _create_key()
+        vets_response_cache.store(
+            key,
+            b"[1]",
+            {"X-Next-Cursor": "cursor"},
+            vets_response_cache.get_generation(key.visibility),
+        )
+
+        cached_response = vets_response_cache.get(key)
+
+        assert cached_response.body == b"[1]"
+        assert cached_response.headers == {"X-Next-Cursor": "cursor"}
+        assert vets_response_cache.get(_create_key(c_lat=52.501)) is None
+
+    def test_drops_response_stored_after_invalidate(self, clock) -> None:
+        key = _create_key()
+        # Read before the vets were read from the database
+        generation = vets_response_cache.get_generation(key.visibility)
+
+        # E.g. a vet was written while the response was created
+        vets_response_cache.invalidate(key.visibility)
+        _store(key, generation=generation)
+
+        assert vets_response_cache.get(key) is None
+
+        _store(key)
+
+        assert vets_response_cache.get(key) is not None
+
+    def test_invalidate_removes_responses_of_visibility(self, clock) -> None:
+        key = _create_key()
+        other_visibility_key = _create_key(visibility="test")
+        _store(key)
+        _store(other_visibility_key)
+
+        vets_response_cache.invalidate(key.visibility)
+
+        assert vets_response_cache.get(key) is None
+        assert vets_response_cache.get(other_visibility_key) is not None
+
+    def test_response_expires_after_max_age(self, clock) -> None:
+        key = _create_key()
+        _store(key)
+
+        clock.now += 60
+
+        assert vets_response_cache.get(key) is not None
+
+        clock.now += 0.001
+
+        assert vets_response_cache.get(key) is None
+
+        # The expired response was removed
+        clock.now -= 60
+
+        assert vets_response_cache.get(key) is None
+
+    def test_evicts_least_recently_used_response_beyond_max_bytes(self, clock) -> None:
+        keys = [_create_key(c_lat=52.5 + index / 1000) for index in range(3)]
+
+        for key in keys:
+            _store(key, body=b"x" * 40)
+
+        assert vets_response_cache.get(keys[0]) is None
+        assert vets_response_cache.get(keys[1]) is not None
+        assert vets_response_cache.get(keys[2]) is not None
+
+
+class TestDisabled:
+
+    def test_stores_nothing(self, override_vets_response_cache_config) -> None:
+        key = _create_key()
+
+        with override_vets_response_cache_config(max_bytes=0):
+            assert not vets_response_cache.is_enabled()
+
+            _store(key)
+
+            assert vets_response_cache.get(key) is None
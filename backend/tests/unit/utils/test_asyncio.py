@@ -0,0 +1,14 @@
+import asyncio
+import threading
+
+from utils import asyncio_
+
+
+def test_run_in_executor_runs_in_other_thread_with_arguments() -> None:
+    def get_thread_and_arguments(*args, **kwargs) -> tuple[threading.Thread, tuple, dict]:
+        return threading.current_thread(), args, kwargs
+
+    thread, args, kwargs = asyncio.run(asyncio_.run_in_executor(get_thread_and_arguments, 1, 2, key="value"))
+
+    assert thread is not threading.current_thread()
+    assert (args, kwargs) == ((1, 2), {"key": "value"})
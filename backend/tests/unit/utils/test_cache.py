@@ -0,0 +1,66 @@
+from utils.cache import LruCache
+
+
+class TestLruCache:
+
+    def test_evicts_least_recently_used_entry(self) -> None:
+        cache: LruCache[str, int] = LruCache(max_size=2)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_get_or_create_only_creates_on_miss(self) -> None:
+        cache: LruCache[str, int] = LruCache(max_size=2)
+        calls: list[str] = []
+
+        def create() -> int:
+            calls.append("a")
+
+            return 1
+
+        assert cache.get_or_create("a", create) == 1
+        assert cache.get_or_create("a", create) == 1
+        assert calls == ["a"]
+
+    def test_invalidate(self) -> None:
+        cache: LruCache[str, int] = LruCache(max_size=3)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        assert cache.invalidate("a")
+        assert not cache.invalidate("a")
+        assert cache.invalidate_where(lambda key: key == "b") == 1
+        assert list(key for key in "abc" if key in cache) == ["c"]
+
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_evicts_by_size(self) -> None:
+        cache: LruCache[str, bytes] = LruCache(max_size=10, get_size=len)
+
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        cache.set("c", b"1234")
+
+        assert "a" not in cache
+        assert cache.size == 8
+
+        cache.set("b", b"1")
+        assert cache.size == 5
+
+        cache.set("d", b"12345678901")
+        assert "d" not in cache
+        assert cache.size == 5
+
+        assert cache.invalidate_where(lambda key: True) == 2
+        assert cache.size == 0
@@ -0,0 +1,54 @@
+import random
+
+import geopy.distance
+import numpy as np
+import pytest
+
+from utils.geo_distance import Points, haversine_distance
+
+
+def _random_lat_lon_pairs(n: int, seed: int) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+
+    return [
+        (rng.uniform(-90, 90), rng.uniform(-180, 180))
+        for _ in range(n)
+    ]
+
+
+class TestPoints:
+
+    def test_haversine_distance_berlin_to_munich(self) -> None:
+        assert haversine_distance(52.52437, 13.41053, 48.13743, 11.57549) == pytest.approx(504, abs=1)
+
+    @pytest.mark.parametrize("center", [(52.52437, 13.41053), (0, 0), (-89.9, 10)])
+    def test_spherical_distances_match_scalar_haversine(self, center: tuple[float, float]) -> None:
+        pairs = _random_lat_lon_pairs(1000, seed=1)
+
+        actual = Points.from_lat_lon_pairs(pairs).distances_to(*center)
+        expected = [haversine_distance(*center, *pair) for pair in pairs]
+
+        assert actual == pytest.approx(expected, abs=1e-6)
+
+    @pytest.mark.parametrize("center", [(52.52437, 13.41053), (0, 0), (-89.9, 10)])
+    def test_geodesic_distances_match_geopy(self, center: tuple[float, float]) -> None:
+        pairs = _random_lat_lon_pairs(1000, seed=2) + [
+            center,  # Coincident
+            (0, 179.7),  # Nearly antipodal for (0, 0)
+            (0, 90),  # Equatorial
+        ]
+
+        actual = Points.from_lat_lon_pairs(pairs).distances_to(*center, mode="geodesic")
+        expected = [geopy.distance.geodesic(center, pair).km for pair in pairs]
+
+        # Less than a millimeter
+        assert actual == pytest.approx(expected, abs=1e-6)
+
+    def test_does_not_make_input_arrays_read_only(self) -> None:
+        lats = np.array([1.0, 2.0])
+        lons = np.array([3.0, 4.0])
+
+        Points(lats, lons)
+
+        assert lats.flags.writeable
+        assert lons.flags.writeable
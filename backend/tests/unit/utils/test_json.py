@@ -0,0 +1,74 @@
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from enum import Enum
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from utils import json_, string_
+
+
+class _Color(str, Enum):
+    red = "red"
+
+
+class _Inner(BaseModel):
+    class Config:
+        allow_population_by_field_name = True
+        alias_generator = string_.as_camel_case
+
+    start_time: datetime
+    colors: list[_Color] = []
+
+
+class _Outer(BaseModel):
+    class Config:
+        allow_population_by_field_name = True
+        alias_generator = string_.as_camel_case
+
+    some_name: str
+    inner_by_day: dict[str, list[_Inner]]
+    distance: float | None = None
+    count: int = 0
+
+
+def _render_like_fastapi(content: object) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+@pytest.mark.parametrize("content", [
+    [
+        _Outer(
+            some_name="Tierärztin \"A\"\n \x7f",
+            inner_by_day={
+                "Mon": [_Inner(start_time=datetime(2026, 1, 1, 8, 30, 0, 5, tzinfo=timezone(timedelta(hours=1))))],
+                "Tue": [],
+            },
+            distance=1e-7,
+        ),
+        _Outer(some_name="", inner_by_day={}, distance=None, count=2 ** 70),
+    ],
+    {"a": [0.0, -0.0, 1e-4, 9.99e-5, 1e15, 1e16, 1.5e300, 5e-324, 0.1, 100.0]},
+    {1: "int key", 1.5: "float key", True: "bool key", None: "none key", _Color.red: "enum key"},
+    (date(2026, 1, 1), time(8, 30), datetime(2026, 1, 1), {1, 2}, frozenset()),
+    [_Inner.construct(start_time=datetime(2026, 1, 1), colors=[_Color.red])],
+])
+def test_dumps_equals_fastapi_json_response(content: object) -> None:
+    assert json_.dumps(content) == _render_like_fastapi(content)
+
+
+def test_dumps_formats_floats_like_json_module() -> None:
+    rng = random.Random(0)
+    floats = [rng.uniform(-1, 1) * 10 ** rng.randint(-20, 20) for _ in range(10_000)]
+
+    assert json_.dumps(floats) == _render_like_fastapi(floats)
+
+
+def test_dumps_rejects_non_finite_floats() -> None:
+    with pytest.raises(ValueError):
+        json_.dumps([float("nan")])
+
+    with pytest.raises(ValueError):
+        json_.dumps({"a": float("inf")})
@@ -0,0 +1,77 @@
+import threading
+
+from pymongo import monitoring
+
+from utils.mongo_pool_metrics import PoolMetricsListener
+
+_ADDRESS = ("localhost", 27017)
+
+
+def test_counts_connections_and_check_outs() -> None:
+    listener = PoolMetricsListener()
+
+    listener.connection_created(monitoring.ConnectionCreatedEvent(_ADDRESS, 1))
+    listener.connection_created(monitoring.ConnectionCreatedEvent(_ADDRESS, 2))
+
+    for connection_id in [1, 2]:
+        listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(_ADDRESS))
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(_ADDRESS, connection_id))
+
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(_ADDRESS, 1))
+    listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(_ADDRESS))
+    listener.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(_ADDRESS, "timeout"))
+    listener.connection_closed(monitoring.ConnectionClosedEvent(_ADDRESS, 1, "idle"))
+
+    metrics = listener.get_metrics()
+
+    assert metrics.open_connections == 1
+    assert metrics.checked_out_connections == 1
+    assert metrics.max_checked_out_connections == 2
+    assert metrics.check_out_count == 2
+    assert metrics.failed_check_out_count == 1
+    assert 0 <= metrics.max_wait_seconds <= metrics.total_wait_seconds
+    assert metrics.mean_wait_seconds == metrics.total_wait_seconds / 3
+
+
+def test_reset_keeps_connections() -> None:
+    listener = PoolMetricsListener()
+
+    listener.connection_created(monitoring.ConnectionCreatedEvent(_ADDRESS, 1))
+    listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(_ADDRESS))
+    listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(_ADDRESS, 1))
+    listener.reset()
+
+    metrics = listener.get_metrics()
+
+    assert metrics.open_connections == 1
+    assert metrics.checked_out_connections == 1
+    assert metrics.max_checked_out_connections == 1
+    assert metrics.check_out_count == 0
+    assert metrics.total_wait_seconds == 0
+    assert metrics.mean_wait_seconds == 0
+
+
+def test_measures_wait_per_thread() -> None:
+    listener = PoolMetricsListener()
+    waiting = threading.Event()
+    checked_out = threading.Event()
+
+    def check_out_slowly() -> None:
+        listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(_ADDRESS))
+        waiting.set()
+        checked_out.wait()
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(_ADDRESS, 1))
+
+    thread = threading.Thread(target=check_out_slowly)
+    thread.start()
+    waiting.wait()
+
+    # A check out of another thread does not end the wait of the first one
+    listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(_ADDRESS, 2))
+    assert listener.get_metrics().total_wait_seconds == 0
+
+    threading.Event().wait(0.01)
+    checked_out.set()
+    thread.join()
+
+    assert listener.get_metrics().max_wait_seconds >= 0.01
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+from utils import pydantic_
+
+
+class _Color(str, Enum):
+    red = "red"
+    blue = "blue"
+
+
+class _Leaf(BaseModel):
+    type: Literal["leaf"] = "leaf"
+    color: _Color
+
+
+class _Node(BaseModel):
+    type: Literal["node"] = "node"
+    children: list[_TreeElement]
+
+
+_TreeElement = Annotated[_Leaf | _Node, Field(discriminator="type")]
+
+_Node.update_forward_refs()
+
+
+class _Tree(BaseModel):
+    name: str
+    root: _Leaf | _Node | None = None
+    leaves_by_name: dict[str, list[_Leaf]] = {}
+
+
+def test_construct_equals_validation() -> None:
+    data = {
+        "name": "tree",
+        "root": {
+            "type": "node",
+            "children": [
+                {"type": "leaf", "color": "red"},
+                {"type": "node", "children": [{"type": "leaf", "color": "blue"}]},
+            ],
+        },
+        "leaves_by_name": {"a": [{"type": "leaf", "color": "blue"}]},
+    }
+
+    constructed = pydantic_.construct(_Tree, data)
+
+    assert constructed == _Tree(**data)
+    assert isinstance(constructed.root, _Node)
+    assert isinstance(constructed.root.children[1], _Node)
+    assert constructed.root.children[0].color is _Color.red
+    assert constructed.__fields_set__ == {"name", "root", "leaves_by_name"}
+
+
+def test_construct_uses_defaults_and_ignores_unknown_keys() -> None:
+    constructed = pydantic_.construct(_Tree, {"name": "tree", "root": None, "unknown": 1})
+
+    assert constructed == _Tree(name="tree")
+    assert not hasattr(constructed, "unknown")
@@ -0,0 +1,76 @@
+import asyncio
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from utils.rate_limit import FileTokenBucket
+
+_RATE = 50
+
+
+def test_spaces_acquisitions_by_rate(tmp_path: Path) -> None:
+    bucket = FileTokenBucket(tmp_path / "state", rate=_RATE)
+
+    start = time.perf_counter()
+    wait_seconds = [bucket.acquire() for _ in range(5)]
+
+    assert wait_seconds[0] == 0
+    assert time.perf_counter() - start >= 4 / _RATE * 0.9
+
+    metrics = bucket.get_metrics()
+    assert metrics.acquired_count == 5
+    assert metrics.waiting_count == 0
+    assert metrics.max_wait_seconds <= 1 / _RATE * 1.5
+
+
+def test_allows_bursts_up_to_capacity(tmp_path: Path) -> None:
+    bucket = FileTokenBucket(tmp_path / "state", rate=0.01, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.get_metrics().queued_count == 0
+
+
+def test_buckets_with_the_same_file_share_tokens(tmp_path: Path) -> None:
+    first_bucket = FileTokenBucket(tmp_path / "state", rate=0.01)
+    second_bucket = FileTokenBucket(tmp_path / "state", rate=0.01)
+
+    assert first_bucket._reserve() == 0
+    assert second_bucket._reserve() == pytest.approx(100, rel=0.01)
+    assert first_bucket.get_metrics().queued_count == 1
+
+
+def test_acquire_async_waits_concurrently(tmp_path: Path) -> None:
+    bucket = FileTokenBucket(tmp_path / "state", rate=_RATE)
+
+    async def acquire_all() -> list[float]:
+        return await asyncio.gather(*[bucket.acquire_async() for _ in range(5)])
+
+    wait_seconds = asyncio.run(acquire_all())
+
+    # Waiting one after the other, every acquisition after the first would wait `1 / _RATE`
+    assert sorted(wait_seconds) == pytest.approx([i / _RATE for i in range(5)], abs=0.5 / _RATE)
+
+
+def test_limits_rate_across_processes(tmp_path: Path) -> None:
+    path = tmp_path / "state"
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_acquire, args=(path, 3)) for _ in range(2)]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    # The first of the 6 acquisitions is immediate
+    assert time.perf_counter() - start >= 5 / _RATE * 0.9
+
+
+def _acquire(path: Path, count: int) -> None:
+    bucket = FileTokenBucket(path, rate=_RATE)
+
+    for _ in range(count):
+        bucket.acquire()
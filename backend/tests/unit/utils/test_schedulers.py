@@ -241,3 +241,59 @@ def test_scheduler() -> None:
                 actual_execution_dts,
         ):
             assert expected_dt == actual_dt
+
+
+def test_scheduler_runs_task_when_poll_is_after_target_datetime() -> None:
+    timezone_: Timezone = "Europe/Berlin"
+
+    start_dt = datetime(
+        year=2022,
+        month=9,
+        day=5,  # Monday
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+        tzinfo=tz.gettz(timezone_),
+    )
+    clock = SimulatedClock(
+        start_unix_timestamp=start_dt.timestamp(),
+        tick_interval=60,
+    )
+    poller = SimulatedPoller(
+        clock,
+        poll_when_unix_timestamp_seconds_is_multiple_of=60 * 5
+    )
+    scheduler = WeeklyScheduler(
+        default_weekday="Mon",
+        default_hour=3,
+        # Not a multiple of the poll interval
+        default_minute=32,
+        default_timezone=timezone_,
+        poller=poller,
+        get_utcnow=clock.utcnow
+    )
+
+    actual_execution_dts = []
+
+    def task() -> None:
+        actual_execution_dts.append(clock.utcnow())
+
+    scheduler.schedule(task, infer_name=True)
+
+    scheduler.start()
+    clock.run_until_datetime(start_dt.replace(day=13))
+
+    assert actual_execution_dts == [
+        datetime(
+            year=2022,
+            month=9,
+            day=day,  # Mondays
+            hour=3,
+            minute=35,
+            second=0,
+            microsecond=0,
+            tzinfo=tz.gettz(timezone_),
+        )
+        for day in [5, 12]
+    ]
@@ -0,0 +1,100 @@
+import random
+
+import geopy.distance
+import pytest
+
+from utils.geo_distance import haversine_distance
+from utils.spatial_index import LatLonGridIndex
+
+
+def _brute_force_query_ring(
+        points: dict[str, tuple[float, float]],
+        c_lat: float,
+        c_lon: float,
+        r_inner: float,
+        r_outer: float,
+) -> list[str]:
+    key_to_distance = {
+        key: haversine_distance(c_lat, c_lon, lat, lon)
+        for key, (lat, lon) in points.items()
+    }
+
+    return sorted(
+        (
+            key
+            for key, distance in key_to_distance.items()
+            if r_inner <= distance <= r_outer
+        ),
+        key=lambda key: key_to_distance[key],
+    )
+
+
+class TestLatLonGridIndex:
+
+    def test_insert_replaces_and_remove_deletes(self) -> None:
+        index: LatLonGridIndex[str] = LatLonGridIndex()
+
+        index.insert("a", 52.5, 13.4, "first")
+        index.insert("a", 48.1, 11.6, "second")
+
+        assert len(index) == 1
+        assert list(index.values()) == ["second"]
+
+        assert index.remove("a")
+        assert not index.remove("a")
+        assert len(index) == 0
+
+    @pytest.mark.parametrize("cell_size_in_degrees", [0.25, 7, 50])
+    def test_query_ring_matches_brute_force(self, cell_size_in_degrees: float) -> None:
+        rng = random.Random(1)
+
+        index: LatLonGridIndex[str] = LatLonGridIndex(cell_size_in_degrees=cell_size_in_degrees)
+        points: dict[str, tuple[float, float]] = {}
+        for i in range(1000):
+            key = str(i)
+            lat = rng.uniform(-90, 90)
+            lon = rng.uniform(-180, 180)
+
+            index.insert(key, lat, lon, key)
+            points[key] = (lat, lon)
+
+        for _ in range(100):
+            c_lat = rng.uniform(-90, 90)
+            c_lon = rng.uniform(-180, 180)
+            r_outer = rng.choice([1, 50, 500, 3000, 15000, 25000])
+            r_inner = rng.uniform(0, r_outer)
+
+            actual = [key for key, _ in index.query_ring(c_lat, c_lon, r_inner, r_outer)]
+            expected = _brute_force_query_ring(points, c_lat, c_lon, r_inner, r_outer)
+
+            assert actual == expected
+
+    def test_geodesic_query_ring_matches_brute_force(self) -> None:
+        rng = random.Random(2)
+
+        index: LatLonGridIndex[str] = LatLonGridIndex()
+        points: dict[str, tuple[float, float]] = {}
+        for i in range(1000):
+            key = str(i)
+            lat = rng.uniform(47, 55)
+            lon = rng.uniform(6, 15)
+
+            index.insert(key, lat, lon, key)
+            points[key] = (lat, lon)
+
+        for _ in range(20):
+            c_lat = rng.uniform(47, 55)
+            c_lon = rng.uniform(6, 15)
+            r_outer = rng.uniform(10, 300)
+
+            actual = [key for key, _ in index.query_ring(c_lat, c_lon, 0, r_outer, mode="geodesic")]
+            expected = sorted(
+                (
+                    key
+                    for key, point in points.items()
+                    if geopy.distance.geodesic((c_lat, c_lon), point).km <= r_outer
+                ),
+                key=lambda key: geopy.distance.geodesic((c_lat, c_lon), points[key]).km,
+            )
+
+            assert actual == expected
@@ -1,10 +1,27 @@
-import { convertFormDataRequestToVet, convertVetToFormDataRequest, type FormDataRequest, type Vet } from "../types";
+import { convertFormDataRequestToVet, convertVetToFormDataRequest, type FormDataRequest, type Vet, type VetSubmission } from "../types";
 
-export async function createOrOverwriteVet(vet: Vet, vetToken: string): Promise<boolean> {
+const VetSubmissionPollIntervalInMs = 1000;
+const VetSubmissionMaxWaitInMs = 120000;
+
+/**
+ * Submits the vet and waits until the backend has processed the submission.
+ * Resolves null if the submission could not be sent or its status could not be requested.
+ */
+export async function createOrOverwriteVet(vet: Vet, vetToken: string): Promise<VetSubmission | null> {
+    const submission = await submitVet(vet, vetToken);
+
+    if (submission === null) {
+        return null;
+    }
+
+    return waitForVetSubmission(submission, vetToken);
+}
+
+async function submitVet(vet: Vet, vetToken: string): Promise<VetSubmission | null> {
 
     const request: FormDataRequest = convertVetToFormDataRequest(vet);
-    return new Promise<boolean>((resolve, reject) => {
-        fetch(`${import.meta.env['VITE_API_URL']}/form/create-or-overwrite-vet`, {
+    return new Promise<VetSubmission | null>((resolve, reject) => {
+        fetch(`${import.meta.env['VITE_API_URL']}/form/submit-vet`, {
             method: 'PUT',
             headers: {
                 'Content-Type': 'application/json',
@@ -13,18 +30,69 @@ export async function createOrOverwriteVet(vet: Vet, vetToken: string): Promise<
             body: JSON.stringify(request)
         })
             .then(response => {
-                if (response.status > 399 && response.status < 500) {
-                    resolve(false);
+                if (response.status !== 202) {
+                    return null;
                 } else {
                     return response.json();
                 }
             })
-            .then(_ => {
-                resolve(true);
+            .then((submission: VetSubmission | null) => {
+                resolve(submission);
             })
             .catch(error => {
                 console.error(error);
-                resolve(false);
+                resolve(null);
+            })
+    });
+}
+
+/**
+ * Polls the status of the submission until it succeeded or failed.
+ * Resolves the last known submission if that takes longer than `VetSubmissionMaxWaitInMs`.
+ */
+async function waitForVetSubmission(submission: VetSubmission, vetToken: string): Promise<VetSubmission | null> {
+    const deadline = Date.now() + VetSubmissionMaxWaitInMs;
+
+    while (submission.status === 'queued' || submission.status === 'processing') {
+        if (Date.now() > deadline) {
+            return submission;
+        }
+
+        await new Promise(resolve => setTimeout(resolve, VetSubmissionPollIntervalInMs));
+
+        const polledSubmission = await getVetSubmission(submission.id, vetToken);
+
+        if (polledSubmission === null) {
+            return null;
+        }
+
+        submission = polledSubmission;
+    }
+
+    return submission;
+}
+
+async function getVetSubmission(submissionId: string, vetToken: string): Promise<VetSubmission | null> {
+    return new Promise<VetSubmission | null>((resolve, reject) => {
+        fetch(`${import.meta.env['VITE_API_URL']}/form/vet-submission/${submissionId}`, {
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${vetToken}`,
+            },
+        })
+            .then(response => {
+                if (response.status !== 200) {
+                    return null;
+                } else {
+                    return response.json();
+                }
+            })
+            .then((submission: VetSubmission | null) => {
+                resolve(submission);
+            })
+            .catch(error => {
+                console.error(error);
+                resolve(null);
             })
     });
 }
@@ -59,6 +59,44 @@ export type FormDataRequest = {
     timezone: string
 }
 
+export type VetSubmissionStatus = 'queued' | 'processing' | 'succeeded' | 'failed';
+
+export type VetSubmissionError = {
+    loc: string[],
+    msg: string,
+    type: string
+}
+
+export type VetSubmission = {
+    id: string,
+    vetId: string,
+    status: VetSubmissionStatus,
+    errors: VetSubmissionError[] | null,
+    createdAt: string,
+    updatedAt: string
+}
+
+// Labels of the request fields that the backend reports errors for
+export const VetSubmissionErrorLocationLabels: LabelObject<string> = {
+    location: 'Adresse',
+    openingHours: 'Öffnungszeiten',
+    emergencyTimes: 'Notdienstzeiten'
+};
+
+export function describeVetSubmissionErrors(errors: VetSubmissionError[]): string {
+    const labels = new Set<string>();
+
+    for (const error of errors) {
+        // The first segment of the location is the request body
+        const field = error.loc[1];
+        labels.add(field !== undefined && field in VetSubmissionErrorLocationLabels
+            ? VetSubmissionErrorLocationLabels[field]
+            : error.msg);
+    }
+
+    return [...labels].join(', ');
+}
+
 export type ContactRequestEntry = {
     type: string,
     value: string